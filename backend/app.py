@@ -1,4 +1,4 @@
-from flask import Flask, request, jsonify, session
+from flask import Flask, request, jsonify, session, g, Response, stream_with_context, has_request_context
 from flask_cors import CORS
 import bcrypt
 import os
@@ -7,23 +7,30 @@ from mysql.connector import Error
 from datetime import datetime, timedelta
 import traceback
 import base64
-from routes.analytics import analytics_bp
+import json
+import csv
+import io
+import threading
+from config.database import db, query_budget
+from config.query_guard import CircuitOpenError
+from config.settings import Config
+from routes.analytics import analytics_bp, fetch_dashboard_aggregates
 from routes.chatbot import chatbot_bp
-from services.cache_service import cache
-
-# Configuration de la base de données
-DB_CONFIG = {
-    'host': 'localhost',
-    'database': 'scoutai',
-    'user': 'root',
-    'password': '',
-    'port': 3307,
-    'charset': 'utf8mb4',
-    'autocommit': True,
-    'pool_name': 'scoutai_pool',
-    'pool_size': 10,
-    'pool_reset_session': True
-}
+from routes.admin import admin_bp
+from services.cache_service import EncodedBody, cache
+from services.cache_warmer import warmer
+from services.catalog import position_filter, style_filter, style_patterns, tokens_containing
+from services.chatbot_service import chatbot_service
+from services.data_migrator import STYLES
+from services.player_service import PlayerService
+from services.player_snapshot import DEFAULT_PLAYER_IMAGE, PLAYERS_BASE_QUERY, format_player_row, player_snapshot
+from services.data_version import VERSIONED_TABLES, bump_data_version, data_validators, ensure_data_version_table
+from utils.http_cache import encoded_response, is_not_modified, not_modified_response
+from utils.pagination import (
+    NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, keyset_condition, keyset_order, page_size, parse_sort,
+    row_keys, sort_name, split_page
+)
+from utils.validators import ValidationError
 
 # Création de l'application Flask
 app = Flask(__name__)
@@ -32,7 +39,8 @@ app = Flask(__name__)
 CORS(app, 
      supports_credentials=True, 
      origins=['http://localhost:5173'],
-     allow_headers=['Content-Type', 'Authorization'],
+     allow_headers=['Content-Type', 'Authorization', 'If-None-Match', 'If-Modified-Since'],
+     expose_headers=['ETag', 'Last-Modified', 'X-Total-Count', 'X-Next-Cursor'],
      methods=['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS'])
 
 # Configuration des sessions sécurisées
@@ -45,6 +53,62 @@ app.config['PERMANENT_SESSION_LIFETIME'] = timedelta(days=30)
 # Enregistrer les blueprints
 app.register_blueprint(analytics_bp, url_prefix='/api/analytics')
 app.register_blueprint(chatbot_bp, url_prefix='/api/chatbot')
+app.register_blueprint(admin_bp, url_prefix='/api/admin')
+
+# Tâches de démarrage : lancées par le serveur, jamais à l'import du module (scripts, tests)
+_started = False
+_startup_lock = threading.Lock()
+
+def startup():
+    """Démarre les tâches de fond une seule fois (app.run, lifespan ASGI ou première requête WSGI)"""
+    global _started
+    with _startup_lock:
+        if _started:
+            return
+        _started = True
+    
+    # Copie locale players/styles pour les nœuds de lecture (DB_EMBEDDED_PATH)
+    db.start_embedded_refresh()
+    
+    # Compteurs de version des données (ETag, fraîcheur du snapshot) : table créée si besoin
+    ensure_data_version_table()
+    
+    # Snapshot en colonnes des joueurs pour les filtres et recherches (PLAYER_SNAPSHOT=0 pour désactiver)
+    player_snapshot.start()
+    
+    # Entrées expirées libérées même sans trafic (CACHE_SWEEP_INTERVAL=0 pour désactiver)
+    cache.start_sweeper(Config.CACHE_SWEEP_INTERVAL)
+    
+    # Préchauffage du cache en arrière-plan (CACHE_WARMUP=0 pour désactiver ; relançable via /api/admin/cache/warm)
+    if Config.CACHE_WARMUP:
+        warmer.start()
+
+@app.before_request
+def ensure_started():
+    """Serveur WSGI sans hook de démarrage (gunicorn app:app) : tâches lancées à la première requête"""
+    if not _started:
+        startup()
+
+# Invalidation du cache à chaque écriture passant par la couche d'accès aux données
+def invalidate_cache_on_write(table, query, params):
+    if table == 'data_version':
+        return
+    if table in VERSIONED_TABLES:
+        # Compteur incrémenté avant l'invalidation : une relecture concurrente ne remet pas l'ancienne version en cache
+        bump_data_version(VERSIONED_TABLES[table])
+    if table == 'favorites':
+        if has_request_context() and session.get('user_id'):
+            cache.invalidate_tags([f"favorites:{session['user_id']}"])
+        else:
+            # Écriture hors requête : tous les favoris, dans tous les workers
+            cache.invalidate_tags(['favorites'])
+    elif table == 'player_positions':
+        # Table dérivée de players.position : mêmes entrées dépendantes
+        cache.invalidate_tags(['players'])
+    else:
+        cache.invalidate_tags([table])
+
+db.add_write_listener(invalidate_cache_on_write)
 
 # Route pour vider le cache (admin seulement)
 @app.route("/api/cache/clear", methods=["POST"])
@@ -56,19 +120,73 @@ def clear_cache():
     
     try:
         cache.clear()
-        return jsonify({"message": "Cache vidé avec succès"}), 200
+        return jsonify({"message": "Cache vidé avec succès (tous les workers)"}), 200
     except Exception as e:
         print(f"❌ Erreur clear_cache: {e}")
         return jsonify({"error": "Erreur lors du vidage du cache"}), 500
 
-# Fonction de connexion à la base de données
-def get_db_connection():
+# Statistiques du cache (admin seulement)
+@app.route("/api/cache/stats", methods=["GET"])
+def cache_stats():
+    """Taille, taux de succès et évictions du cache, globalement et par fonction"""
+    admin_error = require_admin()
+    if admin_error:
+        return admin_error
+    
+    stats = cache.stats()
+    stats['namespaces'] = cache.namespace_stats()
+    return jsonify(stats), 200
+
+# Invalidation sélective du cache (admin seulement)
+@app.route("/api/cache/invalidate", methods=["POST"])
+def invalidate_cache():
+    """Invalide par préfixe de clé (ex. app.fetch_filtered_players), par étiquettes ou par préfixe d'étiquette"""
+    admin_error = require_admin()
+    if admin_error:
+        return admin_error
+    
+    data = request.json or {}
+    prefix = data.get('prefix')
+    tags = data.get('tags')
+    tag_prefix = data.get('tag_prefix')
+    if not prefix and not tags and not tag_prefix:
+        return jsonify({"error": "Indiquer prefix, tags ou tag_prefix (ou utiliser /api/cache/clear)"}), 400
+    if tags is not None and (not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags)):
+        return jsonify({"error": "tags doit être une liste de chaînes"}), 400
+    
     try:
-        connection = mysql.connector.connect(**DB_CONFIG)
-        return connection
-    except Error as e:
-        print(f"❌ Erreur de connexion MySQL: {e}")
-        return None
+        removed = 0
+        if prefix:
+            removed += cache.invalidate_prefix(str(prefix))
+        if tags:
+            removed += cache.invalidate_tags(tags)
+        if tag_prefix:
+            removed += cache.invalidate_tag_prefix(str(tag_prefix))
+        return jsonify({"message": "Cache invalidé (tous les workers)", "removed": removed}), 200
+    except Exception as e:
+        print(f"❌ Erreur invalidate_cache: {e}")
+        return jsonify({"error": "Erreur lors de l'invalidation du cache"}), 500
+
+# Base de données indisponible (disjoncteur ouvert) : réponse immédiate
+@app.errorhandler(CircuitOpenError)
+def database_unavailable(e):
+    breaker = db.breaker.stats()
+    response = jsonify({
+        "error": "Base de données temporairement indisponible",
+        "circuit_breaker": breaker['state']
+    })
+    response.headers['Retry-After'] = str(int(breaker['retry_in_seconds'] or 1))
+    return response, 503
+
+# Suivi du temps de détention des connexions par requête
+@app.after_request
+def record_db_hold_time(response):
+    checkouts = g.get('db_checkouts', 0)
+    if checkouts:
+        hold_time = g.get('db_hold_time', 0.0)
+        db.record_request(request.endpoint, hold_time, checkouts)
+        response.headers['Server-Timing'] = f"db;dur={hold_time * 1000:.1f}"
+    return response
 
 # Middleware pour vérifier l'authentification
 def require_auth():
@@ -86,6 +204,48 @@ def require_admin():
         return jsonify({"error": "Permissions administrateur requises"}), 403
     return None
 
+# ===== FORMATAGE DES JOUEURS =====
+
+# Taille des lots lus en streaming (fetchmany)
+STREAM_BATCH_SIZE = 500
+
+PLAYER_EXPORT_FIELDS = ['player_id', 'Player', 'Age', 'Pos', 'Squad', 'style', 'MarketValue',
+                        'Gls', 'Ast', 'xG', 'xAG', 'Tkl', 'PrgP', 'Carries', 'KP', 'image_url']
+
+def stream_json_array(first_batch, batches):
+    """Encode un tableau JSON lot par lot sans matérialiser la liste complète"""
+    yield '['
+    separator = ''
+    for rows in _chain_batches(first_batch, batches):
+        if rows:
+            yield separator + ','.join(
+                json.dumps(format_player_row(player), ensure_ascii=False) for player in rows
+            )
+            separator = ','
+    yield ']'
+
+def stream_csv(first_batch, batches):
+    """Encode un export CSV lot par lot"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=PLAYER_EXPORT_FIELDS)
+    writer.writeheader()
+    for rows in _chain_batches(first_batch, batches):
+        writer.writerows(format_player_row(player) for player in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def _chain_batches(first_batch, batches):
+    yield first_batch
+    try:
+        yield from batches
+    except Exception as e:
+        print(f"❌ Erreur pendant le streaming des joueurs: {e}")
+        traceback.print_exc()
+        raise
+
 # ===== ROUTES D'AUTHENTIFICATION =====
 
 @app.route("/api/auth/register", methods=["POST"])
@@ -100,46 +260,37 @@ def register():
             if not data.get(field):
                 return jsonify({"error": f"Le champ {field} est requis"}), 400
         
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({"error": "Erreur de connexion à la base de données"}), 500
-        
-        cursor = connection.cursor(dictionary=True)
-        
-        # Vérifier si l'utilisateur existe déjà
-        cursor.execute("SELECT user_id FROM users WHERE email = %s", (data['email'],))
-        if cursor.fetchone():
-            cursor.close()
-            connection.close()
-            return jsonify({"error": "Cet email est déjà utilisé"}), 409
-        
-        # Hasher le mot de passe
-        password_hash = bcrypt.hashpw(data['password'].encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
-        
-        # Créer l'utilisateur
-        insert_query = """
-            INSERT INTO users (email, first_name, last_name, role, password_hash)
-            VALUES (%s, %s, %s, %s, %s)
-        """
-        cursor.execute(insert_query, (
-            data['email'],
-            data['firstName'],
-            data['lastName'],
-            data['role'],
-            password_hash
-        ))
-        
-        user_id = cursor.lastrowid
-        
-        # Récupérer les informations de l'utilisateur créé
-        cursor.execute("""
-            SELECT user_id, email, first_name, last_name, role, created_at, avatar_url
-            FROM users WHERE user_id = %s
-        """, (user_id,))
-        
-        user_data = cursor.fetchone()
-        cursor.close()
-        connection.close()
+        with db.cursor(dictionary=True) as cursor:
+            # Vérifier si l'utilisateur existe déjà
+            cursor.execute("SELECT user_id FROM users WHERE email = %s", (data['email'],))
+            if cursor.fetchone():
+                return jsonify({"error": "Cet email est déjà utilisé"}), 409
+            
+            # Hasher le mot de passe
+            password_hash = bcrypt.hashpw(data['password'].encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+            
+            # Créer l'utilisateur
+            insert_query = """
+                INSERT INTO users (email, first_name, last_name, role, password_hash)
+                VALUES (%s, %s, %s, %s, %s)
+            """
+            cursor.execute(insert_query, (
+                data['email'],
+                data['firstName'],
+                data['lastName'],
+                data['role'],
+                password_hash
+            ))
+            
+            user_id = cursor.lastrowid
+            
+            # Récupérer les informations de l'utilisateur créé
+            cursor.execute("""
+                SELECT user_id, email, first_name, last_name, role, created_at, avatar_url
+                FROM users WHERE user_id = %s
+            """, (user_id,))
+            
+            user_data = cursor.fetchone()
         
         if user_data:
             # Créer la session permanente
@@ -190,21 +341,14 @@ def login():
         if not data.get('email') or not data.get('password'):
             return jsonify({"error": "Email et mot de passe requis"}), 400
         
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({"error": "Erreur de connexion à la base de données"}), 500
-        
-        cursor = connection.cursor(dictionary=True)
-        
-        # Récupérer l'utilisateur
-        cursor.execute("""
-            SELECT user_id, email, first_name, last_name, role, password_hash, created_at, avatar_url
-            FROM users WHERE email = %s
-        """, (data['email'],))
-        
-        user_data = cursor.fetchone()
-        cursor.close()
-        connection.close()
+        with db.cursor(dictionary=True) as cursor:
+            # Récupérer l'utilisateur
+            cursor.execute("""
+                SELECT user_id, email, first_name, last_name, role, password_hash, created_at, avatar_url
+                FROM users WHERE email = %s
+            """, (data['email'],))
+            
+            user_data = cursor.fetchone()
         
         if user_data and bcrypt.checkpw(data['password'].encode('utf-8'), user_data['password_hash'].encode('utf-8')):
             # Créer la session permanente
@@ -254,19 +398,13 @@ def get_current_user():
         if 'user_id' not in session or not session.get('authenticated'):
             return jsonify({"error": "Non connecté", "authenticated": False}), 401
         
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({"error": "Erreur de connexion à la base de données"}), 500
-        
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT user_id, email, first_name, last_name, role, created_at, avatar_url
-            FROM users WHERE user_id = %s
-        """, (session['user_id'],))
-        
-        user_data = cursor.fetchone()
-        cursor.close()
-        connection.close()
+        with db.cursor(dictionary=True) as cursor:
+            cursor.execute("""
+                SELECT user_id, email, first_name, last_name, role, created_at, avatar_url
+                FROM users WHERE user_id = %s
+            """, (session['user_id'],))
+            
+            user_data = cursor.fetchone()
         
         if user_data:
             user_info = {
@@ -321,12 +459,6 @@ def update_profile():
         user_id = session['user_id']
         data = request.json
         
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({"error": "Erreur de connexion à la base de données"}), 500
-        
-        cursor = connection.cursor()
-        
         # Construire la requête de mise à jour dynamiquement
         update_fields = []
         params = []
@@ -346,10 +478,8 @@ def update_profile():
         if update_fields:
             params.append(user_id)
             query = f"UPDATE users SET {', '.join(update_fields)} WHERE user_id = %s"
-            cursor.execute(query, params)
-        
-        cursor.close()
-        connection.close()
+            with db.cursor() as cursor:
+                cursor.execute(query, params)
         
         # Retourner les nouvelles informations utilisateur
         return get_current_user()
@@ -374,14 +504,8 @@ def upload_avatar():
         
         user_id = session['user_id']
         
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({"error": "Erreur de connexion à la base de données"}), 500
-        
-        cursor = connection.cursor()
-        cursor.execute("UPDATE users SET avatar_url = %s WHERE user_id = %s", (avatar_data, user_id))
-        cursor.close()
-        connection.close()
+        with db.cursor() as cursor:
+            cursor.execute("UPDATE users SET avatar_url = %s WHERE user_id = %s", (avatar_data, user_id))
         
         return jsonify({"message": "Avatar mis à jour", "avatar_url": avatar_data}), 200
         
@@ -397,35 +521,27 @@ def upload_avatar():
 def test_database():
     """Route de test pour vérifier la base de données"""
     try:
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({"error": "Erreur de connexion à la base de données"}), 500
-        
-        cursor = connection.cursor(dictionary=True)
-        
-        # Vérifier le nombre total de joueurs
-        cursor.execute("SELECT COUNT(*) as total FROM players")
-        total_players = cursor.fetchone()['total']
-        
-        # Vérifier les styles disponibles
-        cursor.execute("SELECT id_style, name FROM styles")
-        styles = cursor.fetchall()
-        
-        # Vérifier quelques joueurs
-        cursor.execute("SELECT player_id, name, position, squad, id_style FROM players LIMIT 5")
-        sample_players = cursor.fetchall()
-        
-        # Vérifier la jointure styles-joueurs
-        cursor.execute("""
-            SELECT p.player_id, p.name, s.name as style_name 
-            FROM players p 
-            LEFT JOIN styles s ON p.id_style = s.id_style 
-            LIMIT 5
-        """)
-        joined_data = cursor.fetchall()
-        
-        cursor.close()
-        connection.close()
+        with db.cursor(dictionary=True, readonly=True) as cursor:
+            # Vérifier le nombre total de joueurs
+            cursor.execute("SELECT COUNT(*) as total FROM players")
+            total_players = cursor.fetchone()['total']
+            
+            # Vérifier les styles disponibles
+            cursor.execute("SELECT id_style, name FROM styles")
+            styles = cursor.fetchall()
+            
+            # Vérifier quelques joueurs
+            cursor.execute("SELECT player_id, name, position, squad, id_style FROM players LIMIT 5")
+            sample_players = cursor.fetchall()
+            
+            # Vérifier la jointure styles-joueurs
+            cursor.execute("""
+                SELECT p.player_id, p.name, s.name as style_name 
+                FROM players p 
+                LEFT JOIN styles s ON p.id_style = s.id_style 
+                LIMIT 5
+            """)
+            joined_data = cursor.fetchall()
         
         return jsonify({
             "total_players": total_players,
@@ -440,222 +556,354 @@ def test_database():
         return jsonify({"error": str(e)}), 500
 
 @app.route("/api/players/all", methods=["GET"])
+@query_budget(0)  # lecture de toute la table : pas de budget ; abandon = KILL QUERY
 def get_all_players():
-    """Récupère tous les joueurs (pour dashboard)"""
+    """Récupère tous les joueurs (pour dashboard) - corps JSON encodé une fois puis servi depuis le cache
+
+    Avec ?limit=, ?cursor= ou ?sort_by= : une page triée (valeur marchande
+    décroissante par défaut, ou p. ex. sort_by=xG:desc,KP:desc), curseur de
+    la page suivante dans l'en-tête X-Next-Cursor.
+    """
+    paginated = any(name in request.args for name in ('limit', 'cursor', 'sort_by'))
     try:
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({"error": "Erreur de connexion à la base de données"}), 500
-        cursor = connection.cursor(dictionary=True)
-        query = """
-            SELECT 
-                p.player_id,
-                p.name as Player,
-                p.age as Age,
-                p.position as Pos,
-                p.squad as Squad,
-                COALESCE(s.name, '') as style,
-                p.market_value as MarketValue,
-                p.goals as Gls,
-                p.assists as Ast,
-                p.xG,
-                p.xAG,
-                p.tackles as Tkl,
-                p.progressive_passes as PrgP,
-                p.carries as Carries,
-                p.key_passes as KP,
-                COALESCE(p.image_url, '') as image_url
-            FROM players p
-            LEFT JOIN styles s ON p.id_style = s.id_style
-        """
-        cursor.execute(query)
-        results = cursor.fetchall()
-        cursor.close()
-        connection.close()
-        formatted_results = []
-        for player in results:
-            formatted_player = {
-                'player_id': int(player['player_id']),
-                'Player': player['Player'],
-                'Age': int(player['Age']) if player['Age'] else 0,
-                'Pos': player['Pos'] or '',
-                'Squad': player['Squad'] or '',
-                'style': player['style'] or '',
-                'MarketValue': float(player['MarketValue']) if player['MarketValue'] else 0,
-                'Gls': int(player['Gls']) if player['Gls'] else 0,
-                'Ast': int(player['Ast']) if player['Ast'] else 0,
-                'xG': float(player['xG']) if player['xG'] else 0,
-                'xAG': float(player['xAG']) if player['xAG'] else 0,
-                'Tkl': int(player['Tkl']) if player['Tkl'] else 0,
-                'PrgP': int(player['PrgP']) if player['PrgP'] else 0,
-                'Carries': int(player['Carries']) if player['Carries'] else 0,
-                'KP': int(player['KP']) if player['KP'] else 0,
-                'image_url': player['image_url'] or "https://images.pexels.com/photos/114296/pexels-photo-114296.jpeg?auto=compress&cs=tinysrgb&w=400"
-            }
-            formatted_results.append(formatted_player)
-        return jsonify(formatted_results), 200
+        page = (page_size(request.args.get('limit')), request.args.get('cursor', ''),
+                sort_name(parse_sort(request.args.get('sort_by')))) if paginated else None
+    except ValidationError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    # Données inchangées depuis la dernière visite : 304 sans interroger la base
+    etag, last_modified = data_validators('players/all', page)
+    if etag and is_not_modified(etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    
+    try:
+        body = fetch_players_page(*page) if paginated else fetch_all_players_body()
+    except ValidationError as e:
+        return jsonify({"error": str(e)}), 400
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"❌ Erreur lors de la récupération de tous les joueurs: {e}")
         traceback.print_exc()
         return jsonify({"error": "Erreur lors de la récupération des joueurs"}), 500
+    
+    return encoded_response(body, etag, last_modified)
+
+@cache.cached_json(ttl=300, tags=['players', 'styles'])
+def fetch_all_players_body():
+    """Corps de /api/players/all, encodé lot par lot (et compressé) une seule fois par version des données"""
+    snapshot = player_snapshot.current()
+    if snapshot is not None:
+        return EncodedBody.from_json(snapshot.records)
+    
+    batches = db.stream_query(PLAYERS_BASE_QUERY, batch_size=STREAM_BATCH_SIZE)
+    first_batch = next(batches, [])
+    return EncodedBody(''.join(stream_json_array(first_batch, batches)).encode('utf-8'))
+
+@cache.cached_json(ttl=300, tags=['players', 'styles'])
+def fetch_players_page(limit, token, sort_by='MarketValue:desc'):
+    """Page de /api/players/all : tri sort_by (valeur marchande décroissante par défaut) après le curseur"""
+    spec = parse_sort(sort_by)
+    after = decode_cursor(token, sort_by, len(spec) + 1)
+    snapshot = player_snapshot.current()
+    if snapshot is not None:
+        players, next_after = snapshot.page(snapshot.all(), spec, limit, after=after)
+        return EncodedBody.from_json(players, total=snapshot.size, next_cursor=cursor_of(next_after, spec))
+    
+    query, params = PLAYERS_BASE_QUERY + " WHERE 1=1", []
+    if after is not None:
+        condition, params = keyset_condition(after, spec)
+        query += condition
+    query += keyset_order(spec) + " LIMIT %s"
+    
+    with db.cursor(dictionary=True, readonly=True) as cursor:
+        cursor.execute(query, params + [limit + 1])
+        rows, next_after = split_page(cursor.fetchall(), limit, lambda player: row_keys(player, spec))
+    
+    return EncodedBody.from_json([format_player_row(player) for player in rows],
+                                 next_cursor=cursor_of(next_after, spec))
+
+def cursor_of(next_after, spec):
+    return encode_cursor(sort_name(spec), next_after) if next_after else None
+
+player_service = PlayerService()
+
+@app.route("/api/players/search", methods=["GET"])
+@query_budget(1000)
+def search_players():
+    """Recherche de joueurs par nom (approchée : accents et fautes de frappe tolérés)
+
+    Page suivante : ?cursor= avec la valeur de l'en-tête X-Next-Cursor.
+    """
+    query = request.args.get('q', '').strip()
+    try:
+        limit = page_size(request.args.get('limit'), default=20, maximum=50)
+        players, next_cursor = player_service.search_players_page(query, limit, request.args.get('cursor'))
+    except ValidationError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    response = jsonify(players)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
+    return response, 200
+
+@app.route("/api/players/autocomplete", methods=["GET"])
+@query_budget(500)
+def autocomplete_players():
+    """Suggestions de joueurs à chaque frappe (préfixe du nom ou du nom de famille)"""
+    prefix = request.args.get('q', '')
+    try:
+        limit = min(max(int(request.args.get('limit', 10)), 1), 20)
+    except ValueError:
+        return jsonify({"error": "Paramètre limit invalide"}), 400
+    
+    return jsonify(player_service.autocomplete_players(prefix, limit)), 200
+
+@app.route("/api/players/<int:player_id>/percentiles", methods=["GET"])
+@query_budget(1000)
+def get_player_percentiles(player_id):
+    """Rangs centiles du joueur parmi chacun de ses postes pour Gls, Ast, xG, xAG, Tkl, PrgP, Carries et KP
+
+    ?position=MF restreint la réponse à un poste élémentaire.
+    """
+    ranks = player_service.get_player_percentiles(player_id, request.args.get('position'))
+    if ranks is None:
+        return jsonify({"error": "Joueur non trouvé"}), 404
+    
+    return jsonify(ranks), 200
+
+@app.route("/api/players/export", methods=["GET"])
+@query_budget(0)
+def export_players():
+    """Export CSV de tous les joueurs, diffusé par lots"""
+    auth_error = require_auth()
+    if auth_error:
+        return auth_error
+    
+    try:
+        batches = db.stream_query(PLAYERS_BASE_QUERY, batch_size=STREAM_BATCH_SIZE)
+        first_batch = next(batches, [])
+    except Exception as e:
+        print(f"❌ Erreur export_players: {e}")
+        traceback.print_exc()
+        return jsonify({"error": "Erreur lors de l'export des joueurs"}), 500
+    
+    return Response(
+        stream_with_context(stream_csv(first_batch, batches)),
+        mimetype='text/csv',
+        headers={'Content-Disposition': 'attachment; filename=scoutai_players.csv'}
+    )
+
+def _to_number(value, cast):
+    try:
+        return cast(value) if value not in (None, '') else None
+    except (TypeError, ValueError):
+        return None
+
+def normalize_filters(data):
+    """Forme canonique des filtres (sert aussi de clé de cache) ; idempotente"""
+    # Compatibilité : accepter minAge/maxAge/budget OU age_min/age_max/budget_max
+    sort_order = 'desc' if str(data.get('sort_order') or 'desc').lower() == 'desc' else 'asc'
+    return {
+        'style': str(data.get('style', '')).strip().lower(),
+        'position': str(data.get('position', '')).strip().upper(),
+        'Squad': str(data.get('Squad', '')).strip(),
+        'playerName': str(data.get('playerName', '')).strip(),
+        'minAge': _to_number(data.get('minAge') or data.get('age_min'), int),
+        'maxAge': _to_number(data.get('maxAge') or data.get('age_max'), int),
+        'budget': _to_number(data.get('budget') or data.get('budget_max'), float),
+        'sort_order': sort_order,
+        # Tri multi-colonnes ('xG:desc,KP:asc') sous forme canonique ; sort_order en est le sens par défaut
+        'sort_by': sort_name(parse_sort(data.get('sort_by'), sort_order)),
+        'limit': page_size(data.get('limit')),
+        'cursor': str(data.get('cursor') or '')
+    }
+
+def build_filter_query(data):
+    """Construit la requête de filtrage ; lève ValidationError si le style manque"""
+    query = PLAYERS_BASE_QUERY + " WHERE 1=1"
+    
+    params = []
+    
+    # Nettoyage des filtres reçus
+    filters = normalize_filters(data)
+    style = filters['style']
+    position = filters['position']
+    squad = filters['Squad']
+    player_name = filters['playerName']
+    min_age = filters['minAge']
+    max_age = filters['maxAge']
+    budget = filters['budget']
+
+    # Application des filtres robustes
+    if style and style != "choisir un style":
+        # Recherche flexible résolue sur le catalogue des styles -> p.id_style IN (...) (idx_style)
+        condition, style_ids = style_filter(style)
+        query += condition
+        params.extend(style_ids)
+    else:
+        raise ValidationError("Le style de jeu est obligatoire pour la recherche")
+
+    if position:
+        # Postes élémentaires contenant la chaîne (MF matche CMF, DMF, etc.), via player_positions
+        condition, tokens = position_filter(position)
+        query += condition
+        params.extend(tokens)
+
+    if squad:
+        query += " AND p.squad LIKE %s"
+        params.append(f"%{squad}%")
+
+    if player_name:
+        query += " AND p.name LIKE %s"
+        params.append(f"%{player_name}%")
+
+    if min_age:
+        query += " AND p.age >= %s"
+        params.append(min_age)
+
+    if max_age:
+        query += " AND p.age <= %s"
+        params.append(max_age)
+
+    if budget:
+        query += " AND p.market_value <= %s"
+        params.append(budget)
+    
+    # Pagination par clé : reprise après la dernière ligne servie, coût constant à toute profondeur
+    spec = parse_sort(filters['sort_by'])
+    after = decode_cursor(filters['cursor'], filters['sort_by'], len(spec) + 1)
+    if after is not None:
+        condition, keyset_params = keyset_condition(after, spec)
+        query += condition
+        params.extend(keyset_params)
+    
+    # Tri et limite (une ligne de plus pour savoir s'il reste une page) :
+    # ORDER BY ... LIMIT n garde seulement le top-n (file de priorité du filesort)
+    query += keyset_order(spec) + " LIMIT %s"
+    params.append(filters['limit'] + 1)
+    
+    return query, params
+
+def filter_mask(snapshot, filters):
+    """Équivalent vectorisé de build_filter_query sur le snapshot des joueurs"""
+    style = filters['style']
+    if not style or style == "choisir un style":
+        raise ValidationError("Le style de jeu est obligatoire pour la recherche")
+    
+    mask = snapshot.like('style', *style_patterns(style))
+    if filters['position']:
+        mask &= snapshot.positions(*tokens_containing(filters['position'], snapshot.position_index))
+    if filters['Squad']:
+        mask &= snapshot.like('Squad', f"%{filters['Squad']}%")
+    if filters['playerName']:
+        # Sous-chaîne comme le LIKE côté SQL (la recherche approchée reste réservée à /api/search)
+        mask &= snapshot.like('Player', f"%{filters['playerName']}%")
+    if filters['minAge'] or filters['maxAge']:
+        mask &= snapshot.range('Age', minimum=filters['minAge'] or None, maximum=filters['maxAge'] or None)
+    if filters['budget']:
+        mask &= snapshot.range('MarketValue', maximum=filters['budget'])
+    return mask
+
+@cache.cached_json(ttl=180, tags=['players', 'styles'])
+def fetch_filtered_players(filters):
+    """Corps JSON des joueurs correspondant aux filtres normalisés (invalidé à chaque écriture sur players/styles)"""
+    # Snapshot en mémoire à jour : masques vectorisés au lieu des LIKE côté MySQL
+    snapshot = player_snapshot.current()
+    if snapshot is not None:
+        mask = filter_mask(snapshot, filters)
+        spec = parse_sort(filters['sort_by'])
+        after = decode_cursor(filters['cursor'], filters['sort_by'], len(spec) + 1)
+        players, next_after = snapshot.page(mask, spec, filters['limit'], after=after)
+        # Nombre total de résultats (avant LIMIT) gratuit avec les bitmaps
+        return EncodedBody.from_json(players, total=snapshot.count(mask),
+                                     next_cursor=cursor_of(next_after, spec))
+    
+    query, params = build_filter_query(filters)
+    spec = parse_sort(filters['sort_by'])
+    
+    with db.cursor(dictionary=True, readonly=True) as cursor:
+        cursor.execute(query, params)
+        results, next_after = split_page(cursor.fetchall(), filters['limit'], lambda player: row_keys(player, spec))
+    
+    return EncodedBody.from_json([format_player_row(player) for player in results],
+                                 next_cursor=cursor_of(next_after, spec))
 
 @app.route("/api/filter_players", methods=["POST"])
-# @cache.cached(ttl=180)  # Cache désactivé pour éviter le bug de résultats obsolètes
+@query_budget(3000)
 def filter_players():
     """Filtre les joueurs selon les critères"""
     try:
-        data = request.json
+        data = request.json or {}
         print(f"📝 Requête de filtrage reçue: {data}")
         
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({"error": "Erreur de connexion à la base de données"}), 500
-        
-        cursor = connection.cursor(dictionary=True)
-        
-        # Vérifier d'abord s'il y a des données dans la base
-        cursor.execute("SELECT COUNT(*) as total FROM players")
-        total_players = cursor.fetchone()['total']
-        print(f"🔍 Total des joueurs dans la base: {total_players}")
-        
-        # Vérifier les styles disponibles
-        cursor.execute("SELECT id_style, name FROM styles")
-        available_styles = cursor.fetchall()
-        print(f"🎯 Styles disponibles: {available_styles}")
-        
-        # Construction de la requête
-        query = """
-            SELECT 
-                p.player_id,
-                p.name as Player,
-                p.age as Age,
-                p.position as Pos,
-                p.squad as Squad,
-                COALESCE(s.name, '') as style,
-                p.market_value as MarketValue,
-                p.goals as Gls,
-                p.assists as Ast,
-                p.xG,
-                p.xAG,
-                p.tackles as Tkl,
-                p.progressive_passes as PrgP,
-                p.carries as Carries,
-                p.key_passes as KP,
-                COALESCE(p.image_url, '') as image_url
-            FROM players p
-            LEFT JOIN styles s ON p.id_style = s.id_style
-            WHERE 1=1
-        """
-        
-        params = []
-        
-        # Nettoyage des filtres reçus
-        style = str(data.get('style', '')).strip().lower()
-        position = str(data.get('position', '')).strip().upper()
-        squad = str(data.get('Squad', '')).strip()
-        player_name = str(data.get('playerName', '')).strip()
-        # Compatibilité : accepter minAge/maxAge/budget OU age_min/age_max/budget_max
-        min_age = data.get('minAge') or data.get('age_min')
-        max_age = data.get('maxAge') or data.get('age_max')
-        budget = data.get('budget') or data.get('budget_max')
-
-        print(f"[DEBUG] Filtres utilisés: style={style}, position={position}, squad={squad}, player_name={player_name}, min_age={min_age}, max_age={max_age}, budget={budget}")
-
-        # Application des filtres robustes
-        if style and style != "choisir un style":
-            # Recherche plus flexible pour le style
-            query += " AND (LOWER(TRIM(s.name)) LIKE %s OR LOWER(TRIM(s.name)) LIKE %s OR LOWER(TRIM(s.name)) LIKE %s)"
-            params.extend([f"%{style}%", f"%{style.replace(' ', '%')}%", f"%{style.replace(' ', '')}%"])
-            print(f"🔍 Style recherché: '{style}' avec requête: {query}")
-        else:
-            return jsonify({"error": "Le style de jeu est obligatoire pour la recherche"}), 400
-
-        if position:
-            # On matche toutes les variantes contenant la chaîne (MF matche CMF, DMF, etc.)
-            query += " AND UPPER(TRIM(p.position)) LIKE %s"
-            params.append(f"%{position}%")
-
-        if squad:
-            query += " AND p.squad LIKE %s"
-            params.append(f"%{squad}%")
-
-        if player_name:
-            query += " AND p.name LIKE %s"
-            params.append(f"%{player_name}%")
-
-        if min_age:
-            try:
-                age_min = int(min_age)
-                query += " AND p.age >= %s"
-                params.append(age_min)
-            except ValueError:
-                pass
-
-        if max_age:
-            try:
-                age_max = int(max_age)
-                query += " AND p.age <= %s"
-                params.append(age_max)
-            except ValueError:
-                pass
-
-        if budget:
-            try:
-                budget_val = float(budget)
-                query += " AND p.market_value <= %s"
-                params.append(budget_val)
-            except ValueError:
-                pass
-        
-        # Tri et limite
-        sort_direction = "DESC" if data.get('sort_order', 'desc').lower() == 'desc' else "ASC"
-        query += f" ORDER BY p.market_value {sort_direction} LIMIT 100"
-        
-        print(f"🔍 Requête SQL finale: {query}")
-        print(f"🔍 Paramètres: {params}")
-        
-        cursor.execute(query, params)
-        results = cursor.fetchall()
-        cursor.close()
-        connection.close()
-        
-        print(f"🔍 Résultats bruts de la base: {len(results)}")
-        if results:
-            print(f"🔍 Premier résultat: {results[0]}")
-        
-        # Formatage des résultats
-        formatted_results = []
-        for player in results:
-            formatted_player = {
-                'player_id': int(player['player_id']),
-                'Player': player['Player'],
-                'Age': int(player['Age']) if player['Age'] else 0,
-                'Pos': player['Pos'] or '',
-                'Squad': player['Squad'] or '',
-                'style': player['style'] or '',
-                'MarketValue': float(player['MarketValue']) if player['MarketValue'] else 0,
-                'Gls': int(player['Gls']) if player['Gls'] else 0,
-                'Ast': int(player['Ast']) if player['Ast'] else 0,
-                'xG': float(player['xG']) if player['xG'] else 0,
-                'xAG': float(player['xAG']) if player['xAG'] else 0,
-                'Tkl': int(player['Tkl']) if player['Tkl'] else 0,
-                'PrgP': int(player['PrgP']) if player['PrgP'] else 0,
-                'Carries': int(player['Carries']) if player['Carries'] else 0,
-                'KP': int(player['KP']) if player['KP'] else 0,
-                'image_url': player['image_url'] or "https://images.pexels.com/photos/114296/pexels-photo-114296.jpeg?auto=compress&cs=tinysrgb&w=400"
-            }
-            formatted_results.append(formatted_player)
+        # Clé de cache = filtres normalisés : deux payloads équivalents partagent l'entrée
+        filters = normalize_filters(data)
+        body = fetch_filtered_players(filters)
         
-        print(f"✅ {len(formatted_results)} joueurs trouvés")
-        return jsonify(formatted_results), 200
+        print(f"✅ {body.count} joueurs trouvés")
+        # POST : jamais de 304 ; l'ETag (version des données + filtres) signale seulement un changement
+        etag, last_modified = data_validators('filter_players', filters)
+        return encoded_response(body, etag, last_modified)
         
+    except ValidationError as e:
+        return jsonify({"error": str(e)}), 400
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"❌ Erreur lors du filtrage: {e}")
         traceback.print_exc()
         return jsonify({"error": "Erreur lors du filtrage des joueurs"}), 500
 
+# ===== PRÉCHAUFFAGE DU CACHE =====
+
+def warm_chatbot_starter(message):
+    """Recherche déclenchée par une question d'exemple du chatbot"""
+    chatbot_service.search_players_flexible(chatbot_service.parse_message(message))
+
+warmer.register('dashboard', fetch_dashboard_aggregates)
+warmer.register('players/all', fetch_all_players_body)
+for style_name in STYLES:
+    warmer.register(
+        f"filter_players:{style_name}",
+        lambda style_name=style_name: fetch_filtered_players(normalize_filters({'style': style_name}))
+    )
+for starter in chatbot_service.get_conversation_starters():
+    warmer.register(f"chatbot:{starter}", lambda starter=starter: warm_chatbot_starter(starter))
+
 # ===== ROUTES DES FAVORIS (PROTÉGÉES) =====
 
+@cache.cached(ttl=300, tags=lambda user_id: [f"favorites:{user_id}", 'favorites', 'players', 'styles'])
+def fetch_user_favorites(user_id):
+    """Favoris d'un utilisateur (invalidé par ses écritures sur favorites et par players/styles)"""
+    return db.fetch_prepared("""
+        SELECT 
+            f.id_favori,
+            f.note,
+            f.created_at,
+            p.player_id,
+            p.name as Player,
+            p.age as Age,
+            p.position as Pos,
+            p.squad as Squad,
+            s.name as style,
+            p.market_value as MarketValue,
+            p.goals as Gls,
+            p.assists as Ast,
+            p.xG,
+            p.xAG,
+            p.tackles as Tkl,
+            p.progressive_passes as PrgP,
+            p.carries as Carries,
+            p.key_passes as KP,
+            p.image_url
+        FROM favorites f
+        JOIN players p ON f.player_id = p.player_id
+        LEFT JOIN styles s ON p.id_style = s.id_style
+        WHERE f.user_id = %s
+        ORDER BY f.created_at DESC
+    """, (user_id,))
+
 @app.route("/api/favorites", methods=["GET"])
 def get_favorites():
     """Récupère les favoris de l'utilisateur"""
@@ -664,44 +912,7 @@ def get_favorites():
         return auth_error
     
     try:
-        user_id = session['user_id']
-        
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({"error": "Erreur de connexion à la base de données"}), 500
-        
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute("""
-            SELECT 
-                f.id_favori,
-                f.note,
-                f.created_at,
-                p.player_id,
-                p.name as Player,
-                p.age as Age,
-                p.position as Pos,
-                p.squad as Squad,
-                s.name as style,
-                p.market_value as MarketValue,
-                p.goals as Gls,
-                p.assists as Ast,
-                p.xG,
-                p.xAG,
-                p.tackles as Tkl,
-                p.progressive_passes as PrgP,
-                p.carries as Carries,
-                p.key_passes as KP,
-                p.image_url
-            FROM favorites f
-            JOIN players p ON f.player_id = p.player_id
-            LEFT JOIN styles s ON p.id_style = s.id_style
-            WHERE f.user_id = %s
-            ORDER BY f.created_at DESC
-        """, (user_id,))
-        
-        results = cursor.fetchall()
-        cursor.close()
-        connection.close()
+        results = fetch_user_favorites(session['user_id'])
         
         favorites = []
         for fav in results:
@@ -723,7 +934,7 @@ def get_favorites():
                     'PrgP': fav['PrgP'],
                     'Carries': fav['Carries'],
                     'KP': fav['KP'],
-                    'image_url': fav['image_url'] or "https://images.pexels.com/photos/114296/pexels-photo-114296.jpeg?auto=compress&cs=tinysrgb&w=400"
+                    'image_url': fav['image_url'] or DEFAULT_PLAYER_IMAGE
                 },
                 'addedAt': fav['created_at'].isoformat() if fav['created_at'] else None,
                 'notes': fav['note']
@@ -752,27 +963,17 @@ def add_favorite():
         if not player_id:
             return jsonify({"error": "ID du joueur requis"}), 400
         
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({"error": "Erreur de connexion à la base de données"}), 500
-        
-        cursor = connection.cursor()
-        
-        # Vérifier si le joueur existe
-        cursor.execute("SELECT player_id FROM players WHERE player_id = %s", (player_id,))
-        if not cursor.fetchone():
-            cursor.close()
-            connection.close()
-            return jsonify({"error": "Joueur non trouvé"}), 404
-        
-        # Ajouter aux favoris
-        cursor.execute("""
-            INSERT INTO favorites (user_id, player_id, note)
-            VALUES (%s, %s, %s)
-        """, (user_id, player_id, note))
-        
-        cursor.close()
-        connection.close()
+        with db.cursor() as cursor:
+            # Vérifier si le joueur existe
+            cursor.execute("SELECT player_id FROM players WHERE player_id = %s", (player_id,))
+            if not cursor.fetchone():
+                return jsonify({"error": "Joueur non trouvé"}), 404
+            
+            # Ajouter aux favoris
+            cursor.execute("""
+                INSERT INTO favorites (user_id, player_id, note)
+                VALUES (%s, %s, %s)
+            """, (user_id, player_id, note))
         
         return jsonify({"message": "Joueur ajouté aux favoris", "success": True}), 201
         
@@ -792,19 +993,13 @@ def remove_favorite(player_id):
     try:
         user_id = session['user_id']
         
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({"error": "Erreur de connexion à la base de données"}), 500
-        
-        cursor = connection.cursor()
-        cursor.execute("""
-            DELETE FROM favorites 
-            WHERE user_id = %s AND player_id = %s
-        """, (user_id, player_id))
-        
-        affected_rows = cursor.rowcount
-        cursor.close()
-        connection.close()
+        with db.cursor() as cursor:
+            cursor.execute("""
+                DELETE FROM favorites 
+                WHERE user_id = %s AND player_id = %s
+            """, (user_id, player_id))
+            
+            affected_rows = cursor.rowcount
         
         if affected_rows > 0:
             return jsonify({"message": "Joueur supprimé des favoris", "success": True}), 200
@@ -824,19 +1019,12 @@ def check_favorite(player_id):
     try:
         user_id = session['user_id']
         
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({"is_favorite": False}), 200
-        
-        cursor = connection.cursor()
-        cursor.execute("""
+        rows = db.fetch_prepared("""
             SELECT id_favori FROM favorites 
             WHERE user_id = %s AND player_id = %s
         """, (user_id, player_id))
         
-        is_favorite = cursor.fetchone() is not None
-        cursor.close()
-        connection.close()
+        is_favorite = len(rows) > 0
         
         return jsonify({"is_favorite": is_favorite}), 200
         
@@ -856,12 +1044,7 @@ def get_comparisons():
     try:
         user_id = session['user_id']
         
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({"error": "Erreur de connexion à la base de données"}), 500
-        
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute("""
+        results = db.fetch_prepared("""
             SELECT 
                 c.id_comparison,
                 c.compared_at,
@@ -881,10 +1064,6 @@ def get_comparisons():
             LIMIT 50
         """, (user_id,))
         
-        results = cursor.fetchall()
-        cursor.close()
-        connection.close()
-        
         comparisons = []
         for comp in results:
             comparison = {
@@ -894,13 +1073,13 @@ def get_comparisons():
                     'player_id': comp['player1_id'],
                     'name': comp['player1_name'],
                     'squad': comp['player1_squad'],
-                    'image_url': comp['player1_image'] or "https://images.pexels.com/photos/114296/pexels-photo-114296.jpeg?auto=compress&cs=tinysrgb&w=400"
+                    'image_url': comp['player1_image'] or DEFAULT_PLAYER_IMAGE
                 },
                 'player2': {
                     'player_id': comp['player2_id'],
                     'name': comp['player2_name'],
                     'squad': comp['player2_squad'],
-                    'image_url': comp['player2_image'] or "https://images.pexels.com/photos/114296/pexels-photo-114296.jpeg?auto=compress&cs=tinysrgb&w=400"
+                    'image_url': comp['player2_image'] or DEFAULT_PLAYER_IMAGE
                 }
             }
             comparisons.append(comparison)
@@ -927,18 +1106,11 @@ def save_comparison():
         if not player1_id or not player2_id:
             return jsonify({"error": "IDs des joueurs requis"}), 400
         
-        connection = get_db_connection()
-        if not connection:
-            return jsonify({"error": "Erreur de connexion à la base de données"}), 500
-        
-        cursor = connection.cursor()
-        cursor.execute("""
-            INSERT INTO comparisons (user_id, id_player_1, id_player_2)
-            VALUES (%s, %s, %s)
-        """, (user_id, player1_id, player2_id))
-        
-        cursor.close()
-        connection.close()
+        with db.cursor() as cursor:
+            cursor.execute("""
+                INSERT INTO comparisons (user_id, id_player_1, id_player_2)
+                VALUES (%s, %s, %s)
+            """, (user_id, player1_id, player2_id))
         
         return jsonify({"message": "Comparaison sauvegardée", "success": True}), 201
         
@@ -980,22 +1152,30 @@ def get_role_permissions(role):
 @app.route("/api/health", methods=["GET"])
 def health_check():
     """Vérification de l'état de l'API"""
+    # Ne bloque jamais : disjoncteur ouvert = réponse immédiate, pool saturé = 1 s maximum
     try:
-        connection = get_db_connection()
-        if connection and connection.is_connected():
-            connection.close()
+        if db.ping(timeout=1.0):
             return jsonify({
                 "status": "healthy",
                 "database": "connected",
                 "message": "API ScoutAI opérationnelle",
+                "circuit_breaker": db.breaker.state,
                 "port": 3307
             }), 200
         else:
             return jsonify({
                 "status": "unhealthy",
                 "database": "disconnected",
-                "message": "Problème de connexion à la base de données"
+                "message": "Problème de connexion à la base de données",
+                "circuit_breaker": db.breaker.state
             }), 503
+    except Error as e:
+        return jsonify({
+            "status": "unhealthy",
+            "database": "disconnected",
+            "message": f"Problème de connexion à la base de données: {str(e)}",
+            "circuit_breaker": db.breaker.state
+        }), 503
     except Exception as e:
         return jsonify({
             "status": "error",
@@ -1008,4 +1188,5 @@ if __name__ == "__main__":
     print("🌐 CORS activé pour: http://localhost:5173")
     print("🔐 Sessions sécurisées activées")
     print("👥 Gestion des rôles activée")
+    startup()
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
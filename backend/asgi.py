@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Point d'entrée ASGI de ScoutAI
+Sert le chatbot et le filtrage des joueurs en asynchrone (pool aiomysql) ;
+toutes les autres routes sont déléguées à l'application Flask via asgiref.
+
+Lancement: uvicorn asgi:application --host 0.0.0.0 --port 5000
+"""
+
+import asyncio
+import json
+import traceback
+from asgiref.wsgi import WsgiToAsgi
+
+from app import app, build_filter_query, cursor_of, format_player_row, normalize_filters, startup
+from config.async_database import async_db
+from routes.chatbot import HELP_RESPONSE
+from services.catalog import fetch_position_tokens, fetch_style_catalog
+from services.chatbot_service import chatbot_service
+from utils.pagination import NEXT_CURSOR_HEADER, parse_sort, row_keys, split_page
+from utils.validators import ValidationError
+
+# Origines autorisées (identiques à la configuration CORS de Flask)
+CORS_ORIGINS = {'http://localhost:5173'}
+
+wsgi_application = WsgiToAsgi(app)
+
+async def read_json(receive):
+    """Lit et décode le corps JSON de la requête"""
+    body = b''
+    more_body = True
+    while more_body:
+        message = await receive()
+        body += message.get('body', b'')
+        more_body = message.get('more_body', False)
+    return json.loads(body) if body else {}
+
+async def send_json(send, scope, payload, status=200, extra_headers=None):
+    """Envoie une réponse JSON avec les en-têtes CORS"""
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    headers = [
+        (b'content-type', b'application/json'),
+        (b'content-length', str(len(body)).encode())
+    ]
+    for name, value in (extra_headers or {}).items():
+        headers.append((name.lower().encode(), value.encode()))
+    origin = dict(scope.get('headers', [])).get(b'origin', b'').decode()
+    if origin in CORS_ORIGINS:
+        headers += [
+            (b'access-control-allow-origin', origin.encode()),
+            (b'access-control-allow-credentials', b'true'),
+            (b'access-control-expose-headers', NEXT_CURSOR_HEADER.encode()),
+            (b'vary', b'Origin')
+        ]
+    await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+async def chat(data):
+    """Équivalent asynchrone de routes.chatbot.chat"""
+    message = str(data.get('message', '')).strip()
+
+    if not message:
+        return {
+            "error": "Message vide",
+            "response": "🤔 Posez-moi une question sur les joueurs que vous recherchez !",
+            "suggestions": chatbot_service.get_conversation_starters()
+        }, 400
+
+    intent = chatbot_service.analyze_intent(message)
+    if intent == 'help':
+        return {
+            "response": HELP_RESPONSE,
+            "suggestions": chatbot_service.get_conversation_starters(),
+            "intent": intent
+        }, 200
+
+    criteria = chatbot_service.parse_message(message)
+    players = await chatbot_service.search_players_async(criteria, async_db)
+    response_text = chatbot_service.generate_response(message, players, criteria)
+
+    return {
+        "response": response_text,
+        "players": players,
+        "criteria": criteria,
+        "intent": intent,
+        "suggestions": chatbot_service.get_conversation_starters() if not players else []
+    }, 200
+
+async def filter_players(data):
+    """Équivalent asynchrone de app.filter_players"""
+    try:
+        filters = normalize_filters(data)
+        # Catalogues des styles et postes (cache, MySQL au premier appel) : hors de la boucle d'événements
+        query, params = await asyncio.to_thread(build_filter_query, filters)
+    except ValidationError as e:
+        return {"error": str(e)}, 400
+
+    results = await async_db.execute_query(query, tuple(params))
+    if results is None:
+        return {"error": "Erreur lors du filtrage des joueurs"}, 500
+    spec = parse_sort(filters['sort_by'])
+    results, next_after = split_page(results, filters['limit'], lambda player: row_keys(player, spec))
+    next_cursor = cursor_of(next_after, spec)
+    headers = {NEXT_CURSOR_HEADER: next_cursor} if next_cursor else {}
+    return [format_player_row(player) for player in results], 200, headers
+
+async def wait_for_disconnect(receive):
+    """Se termine quand le client ferme la connexion"""
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
+
+ASYNC_ROUTES = {
+    ('POST', '/api/chatbot/chat'): chat,
+    ('POST', '/api/filter_players'): filter_players,
+}
+
+async def application(scope, receive, send):
+    """Application ASGI : routes asynchrones natives, le reste via Flask"""
+    if scope['type'] == 'lifespan':
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                # Tâches de démarrage de l'application Flask (création de table, threads de fond)
+                await asyncio.to_thread(startup)
+                # Catalogues chargés avant la première requête (lecture bloquante, dans un thread)
+                await asyncio.to_thread(fetch_style_catalog)
+                await asyncio.to_thread(fetch_position_tokens)
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await async_db.close()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    handler = None
+    if scope['type'] == 'http':
+        handler = ASYNC_ROUTES.get((scope['method'], scope['path']))
+    if handler is None:
+        await wsgi_application(scope, receive, send)
+        return
+
+    try:
+        data = await read_json(receive)
+        # Client déconnecté avant la réponse : on annule le traitement (et ses requêtes SQL)
+        handler_task = asyncio.ensure_future(handler(data))
+        disconnect_task = asyncio.ensure_future(wait_for_disconnect(receive))
+        await asyncio.wait({handler_task, disconnect_task}, return_when=asyncio.FIRST_COMPLETED)
+        if not handler_task.done():
+            handler_task.cancel()
+            print(f"🔌 Client déconnecté, requête annulée: {scope['path']}")
+            return
+        disconnect_task.cancel()
+        payload, status, *extra = handler_task.result()
+    except ValueError:
+        payload, status, extra = {"error": "JSON invalide"}, 400, []
+    except Exception as e:
+        print(f"❌ Erreur route asynchrone {scope['path']}: {e}")
+        traceback.print_exc()
+        payload, status, extra = {"error": "Erreur interne du serveur"}, 500, []
+    await send_json(send, scope, payload, status, extra[0] if extra else None)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark du mode asynchrone (ASGI) face au mode synchrone (Flask)
+Envoie des requêtes concurrentes sur /api/chatbot/chat et /api/filter_players
+et mesure débit, latences et erreurs.
+
+Usage:
+    # Terminal 1 : python app.py                                   (synchrone, port 5000)
+    # Terminal 2 : uvicorn asgi:application --port 5001            (asynchrone)
+    python benchmarks/bench_async_serving.py http://localhost:5000 http://localhost:5001 [concurrence] [requêtes]
+"""
+
+import asyncio
+import json
+import sys
+import time
+from urllib.parse import urlsplit
+
+SCENARIOS = [
+    ("/api/chatbot/chat", {"message": "Je cherche un attaquant rapide de moins de 25 ans"}),
+    ("/api/filter_players", {"style": "jeu de possession", "position": "MF"}),
+]
+
+async def post(host, port, path, payload):
+    """POST HTTP/1.1 minimal ; retourne le code de statut"""
+    body = json.dumps(payload).encode('utf-8')
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(
+            f"POST {path} HTTP/1.1\r\nHost: {host}:{port}\r\n"
+            f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\n"
+            f"Connection: close\r\n\r\n".encode() + body
+        )
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+async def run_scenario(base_url, path, payload, concurrency, total):
+    """Lance `total` requêtes avec au plus `concurrency` en vol"""
+    url = urlsplit(base_url)
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+    errors = 0
+
+    async def one():
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                status = await post(url.hostname, url.port or 80, path, payload)
+                if status >= 500:
+                    errors += 1
+            except OSError:
+                errors += 1
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(total)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    p50 = latencies[len(latencies) // 2]
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    print(f"   {base_url:<28} {total / elapsed:8.1f} req/s | p50 {p50:8.1f} ms | "
+          f"p99 {p99:8.1f} ms | erreurs {errors}")
+
+async def main():
+    if len(sys.argv) < 3:
+        print(__doc__)
+        return
+    sync_url, async_url = sys.argv[1], sys.argv[2]
+    concurrency = int(sys.argv[3]) if len(sys.argv) > 3 else 200
+    total = int(sys.argv[4]) if len(sys.argv) > 4 else 2000
+
+    print(f"🚀 BENCHMARK SYNC vs ASYNC (concurrence {concurrency}, {total} requêtes)")
+    print("=" * 50)
+    for path, payload in SCENARIOS:
+        print(f"\n📊 {path}")
+        await run_scenario(sync_url, path, payload, concurrency, total)
+        await run_scenario(async_url, path, payload, concurrency, total)
+
+if __name__ == "__main__":
+    asyncio.run(main())
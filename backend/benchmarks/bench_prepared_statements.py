@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Benchmark des statements préparés sur les lectures ponctuelles
+Compare les requêtes texte classiques au cache de statements préparés
+sur get_player_by_id, search_players_by_name et is_favorite.
+
+Usage: python benchmarks/bench_prepared_statements.py [iterations]
+"""
+
+import os
+import sys
+import time
+import statistics
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from config.database import db
+from services.player_service import PlayerService
+from services.favorite_service import FavoriteService
+
+def percentile(values, pct):
+    """Percentile simple sur une liste triée"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def run(label, func, iterations):
+    """Mesure la latence d'une fonction sur plusieurs itérations"""
+    func()  # échauffement (préparation du statement, connexion)
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    print(f"   {label:<28} moy {statistics.mean(timings):7.3f} ms | "
+          f"p50 {percentile(timings, 50):7.3f} ms | p95 {percentile(timings, 95):7.3f} ms")
+    return statistics.mean(timings)
+
+def main():
+    iterations = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+
+    sample = db.execute_query("SELECT player_id, name FROM players ORDER BY market_value DESC LIMIT 1")
+    if not sample:
+        print("❌ Aucun joueur en base : lancez d'abord la migration des données")
+        return
+    player_id = sample[0]['player_id']
+    name_query = sample[0]['name'][:4]
+
+    player_service = PlayerService()
+    favorite_service = FavoriteService()
+    scenarios = [
+        ("get_player_by_id", lambda: player_service.get_player_by_id(player_id)),
+        ("search_players_by_name", lambda: player_service.search_players_by_name(name_query)),
+        ("is_favorite", lambda: favorite_service.is_favorite(1, player_id)),
+    ]
+
+    print(f"🚀 BENCHMARK STATEMENTS PRÉPARÉS ({iterations} itérations)")
+    print("=" * 50)
+    for name, func in scenarios:
+        print(f"\n📊 {name}")
+        db.use_prepared = False
+        text_mean = run("requête texte", func, iterations)
+        db.use_prepared = True
+        prepared_mean = run("statement préparé", func, iterations)
+        print(f"   ⚡ Gain: {(1 - prepared_mean / text_mean) * 100:.1f}%")
+
+    print(f"\n📦 Cache: {db.pool_stats().get('prepared_statements')}")
+
+if __name__ == "__main__":
+    main()
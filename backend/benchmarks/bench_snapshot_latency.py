@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark des lectures servies par le snapshot en mémoire des joueurs
+Mesure la latence de chaque scénario sur des joueurs synthétiques (sans
+MySQL) et la compare à l'objectif fixé ; code de sortie 1 si un objectif
+n'est pas tenu.
+
+Usage: python benchmarks/bench_snapshot_latency.py [joueurs] [itérations]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from services.player_snapshot import PlayerSnapshot
+
+FIRST_NAMES = ['Kylian', 'Luka', 'Erling', 'Jude', 'Martin', 'Vinícius', 'Bukayo', 'Florian', 'Jamal', 'Declan',
+               'Rodrigo', 'Joško', 'Théo', 'Rúben', 'Alejandro', 'Mikel', 'Gavi', 'João', 'Kevin', 'Mohamed']
+LAST_NAMES = ['Mbappé', 'Modrić', 'Haaland', 'Bellingham', 'Ødegaard', 'Júnior', 'Saka', 'Wirtz', 'Musiala',
+              'Rice', 'Hernández', 'Gvardiol', 'Dias', 'Garnacho', 'Félix', 'De Bruyne', 'Salah', 'Pedri']
+POSITIONS = ['FW', 'MF', 'DF', 'GK', 'MF,FW', 'DF,MF', 'FW,MF']
+STYLES = ['football total', 'jeu de possession', 'jeu positionnel', 'jeu direct', 'pressing intense', 'defensif']
+
+def synthetic_rows(count, seed=0):
+    """Lignes au format de PLAYERS_BASE_QUERY"""
+    rng = random.Random(seed)
+    def stat(maximum):
+        return None if rng.random() < 0.05 else rng.randint(0, maximum)
+    return [{
+        'player_id': player_id,
+        'Player': f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {player_id}",
+        'Age': rng.randint(16, 40),
+        'Pos': rng.choice(POSITIONS),
+        'Squad': f"Club {rng.randint(1, 500)}",
+        'style': rng.choice(STYLES),
+        'MarketValue': rng.randint(1, 2000) * 100_000,
+        'Gls': stat(30), 'Ast': stat(15), 'xG': stat(25), 'xAG': stat(12),
+        'Tkl': stat(90), 'PrgP': stat(200), 'Carries': stat(150), 'KP': stat(60),
+        'image_url': ''
+    } for player_id in range(1, count + 1)]
+
+def percentile(values, pct):
+    """Percentile simple sur une liste triée"""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+def run(label, func, iterations, target_ms, pct):
+    """Mesure la latence d'un scénario et la compare à l'objectif (sur le percentile pct)"""
+    func()  # échauffement (index construits au premier usage)
+    timings = []
+    for index in range(iterations):
+        start = time.perf_counter()
+        func(index)
+        timings.append((time.perf_counter() - start) * 1000)
+    measured = percentile(timings, pct)
+    ok = measured <= target_ms
+    print(f"   {'✅' if ok else '❌'} {label:<40} p50 {percentile(timings, 50):8.3f} ms | "
+          f"p{pct} {measured:8.3f} ms | objectif p{pct} < {target_ms} ms")
+    return ok
+
+def scenarios(snapshot):
+    """(libellé, fonction(i), objectif en ms, percentile mesuré)"""
+    def filter_page(i=0):
+        # Filtre type /api/filter_players : style + poste + âge + budget, première page
+        mask = snapshot.equals('style', STYLES[i % len(STYLES)]) & snapshot.positions('MF')
+        mask = mask & snapshot.range('Age', maximum=25) & snapshot.range('MarketValue', maximum=50_000_000)
+        return snapshot.page(mask, limit=20)
+
+    # Recherches avec fautes de frappe et sans accents
+    name_queries = ['mbape', 'haalnd', 'modric', 'bellingam', 'odegaard', 'vinicius junior', 'de bruyne']
+
+    def name_search(i=0):
+        return snapshot.name_search(name_queries[i % len(name_queries)], 20)
+
+    # Frappes successives dans la barre de recherche : préfixes de 1 à 8 lettres
+    keystrokes = [name[:length] for name in ('mbappe', 'haaland', 'bellingham', 'gvardiol')
+                  for length in range(1, 9)]
+
+    def autocomplete(i=0):
+        return snapshot.autocomplete(keystrokes[i % len(keystrokes)], 10)
+
+    # Lecture O(1) : aucun parcours du groupe de poste, quelle que soit sa taille
+    player_ids = snapshot.player_ids
+
+    def percentiles(i=0):
+        return snapshot.percentiles(int(player_ids[(i * 7919) % len(player_ids)]))
+
+    return [
+        ("filtre + top 20", filter_page, 1.0, 95),
+        ("recherche approchée top 20", name_search, 10.0, 95),
+        ("autocomplétion top 10", autocomplete, 1.0, 99),
+        ("rangs centiles d'un joueur", percentiles, 0.2, 99),
+    ]
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    iterations = int(sys.argv[2]) if len(sys.argv) > 2 else 500
+
+    print(f"🚀 BENCHMARK SNAPSHOT JOUEURS ({count} joueurs, {iterations} itérations)")
+    print("=" * 50)
+    start = time.perf_counter()
+    snapshot = PlayerSnapshot(synthetic_rows(count), {'version': 'bench'})
+    print(f"📦 Snapshot construit en {(time.perf_counter() - start) * 1000:.0f} ms")
+
+    results = [run(label, func, iterations, target, pct) for label, func, target, pct in scenarios(snapshot)]
+    if not all(results):
+        print("\n❌ Objectif de latence non tenu")
+        sys.exit(1)
+    print("\n✅ Tous les objectifs de latence sont tenus")
+
+if __name__ == "__main__":
+    main()
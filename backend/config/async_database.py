@@ -0,0 +1,136 @@
+# backend/config/async_database.py
+import asyncio
+import time
+from typing import Optional, List, Dict
+from mysql.connector import Error
+from config.database import db
+from config.query_guard import add_execution_time_hint, is_unavailable_error
+from config.settings import Config
+
+try:
+    import aiomysql
+except ImportError:  # dépendance optionnelle : uniquement pour le mode ASGI
+    aiomysql = None
+
+class AsyncDatabaseConnection:
+    """Accès MySQL asynchrone (aiomysql) pour le mode de service ASGI
+
+    Une coroutine en attente de MySQL ne bloque aucun thread : un worker peut
+    garder des centaines de requêtes en vol avec un pool de quelques dizaines
+    de connexions.
+    """
+
+    def __init__(self):
+        self.host = Config.DB_HOST
+        self.database = Config.DB_NAME
+        self.user = Config.DB_USER
+        self.password = Config.DB_PASSWORD
+        self.port = Config.DB_PORT
+        self.pool_min_size = Config.DB_ASYNC_POOL_MIN
+        self.pool_size = Config.DB_ASYNC_POOL_SIZE
+        self.pool_timeout = Config.DB_POOL_TIMEOUT
+        self.statement_timeout_ms = Config.DB_STATEMENT_TIMEOUT_MS
+        self._pool = None
+        self._pool_lock = None
+
+    async def get_pool(self):
+        """Crée le pool aiomysql à la première utilisation (dans la boucle courante)"""
+        if aiomysql is None:
+            raise RuntimeError("Le mode asynchrone nécessite aiomysql: pip install aiomysql")
+        if self._pool is None:
+            if self._pool_lock is None:
+                self._pool_lock = asyncio.Lock()
+            async with self._pool_lock:
+                if self._pool is None:
+                    self._pool = await aiomysql.create_pool(
+                        host=self.host,
+                        port=self.port,
+                        user=self.user,
+                        password=self.password,
+                        db=self.database,
+                        charset='utf8mb4',
+                        autocommit=True,
+                        minsize=self.pool_min_size,
+                        maxsize=self.pool_size,
+                        pool_recycle=3600
+                    )
+                    print(f"✅ Pool MySQL asynchrone initialisé (taille {self.pool_size})")
+        return self._pool
+
+    async def execute_query(self, query: str, params: tuple = None, fetch: bool = True) -> Optional[List[Dict]]:
+        """Exécute une requête SQL sans bloquer la boucle d'événements
+
+        Partage le disjoncteur du mode synchrone ; si la coroutine est annulée
+        (client déconnecté), la requête est interrompue côté serveur.
+        """
+        try:
+            db.breaker.allow()
+        except Error as e:
+            print(f"❌ {e}")
+            return None
+        if self.statement_timeout_ms:
+            query = add_execution_time_hint(query, self.statement_timeout_ms)
+
+        try:
+            pool = await self.get_pool()
+        except RuntimeError as e:
+            # aiomysql absent : aiomysql.Error ne peut même pas être évalué plus bas
+            print(f"❌ {e}")
+            return None
+        try:
+            conn = await asyncio.wait_for(pool.acquire(), timeout=self.pool_timeout)
+        except (asyncio.TimeoutError, aiomysql.Error) as e:
+            print(f"❌ Pool MySQL asynchrone indisponible après {self.pool_timeout:.1f}s: {e}")
+            db.breaker.record_failure(Error(msg=str(e)))
+            return None
+
+        start = time.monotonic()
+        released = False
+        try:
+            async with conn.cursor(aiomysql.DictCursor) as cursor:
+                await cursor.execute(query, params or ())
+                result = await cursor.fetchall() if fetch else True
+            db.breaker.record_success(time.monotonic() - start)
+            return result
+        except asyncio.CancelledError:
+            # La connexion est au milieu d'un échange : on la ferme et on libère le serveur
+            thread_id = conn.thread_id()
+            conn.close()
+            # Rendue fermée : le pool la retire sans la réutiliser (sinon la place resterait occupée)
+            pool.release(conn)
+            released = True
+            asyncio.ensure_future(asyncio.to_thread(db.kill_query, thread_id))
+            raise
+        except aiomysql.Error as e:
+            print(f"❌ Erreur lors de l'exécution de la requête asynchrone: {e}")
+            errno = e.args[0] if e.args and isinstance(e.args[0], int) else None
+            failure = Error(msg=str(e), errno=errno)
+            if isinstance(e, aiomysql.OperationalError) or is_unavailable_error(failure):
+                db.breaker.record_failure(failure)
+            return None
+        finally:
+            if not released:
+                pool.release(conn)
+
+    def pool_stats(self) -> Dict:
+        """Métriques du pool asynchrone"""
+        if self._pool is None:
+            return {'initialized': False}
+        return {
+            'initialized': True,
+            'size': self._pool.size,
+            'idle': self._pool.freesize,
+            'in_use': self._pool.size - self._pool.freesize,
+            'max_size': self._pool.maxsize
+        }
+
+    async def close(self):
+        """Ferme le pool"""
+        if self._pool is not None:
+            self._pool.close()
+            await self._pool.wait_closed()
+            self._pool = None
+            print("🔌 Pool MySQL asynchrone fermé")
+
+# Instance globale
+async_db = AsyncDatabaseConnection()
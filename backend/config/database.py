@@ -1,79 +1,1073 @@
 # backend/config/database.py
 import mysql.connector
 from mysql.connector import Error
-import os
-from typing import Optional
+import re
+import threading
+import time
+import itertools
+import json
+from collections import deque, OrderedDict
+from contextlib import contextmanager, ExitStack
+from functools import wraps
+from typing import Optional, Dict, Iterator, List
 import pandas as pd
+from flask import g, has_request_context, request, session
 from flask_sqlalchemy import SQLAlchemy
+from config.embedded_store import EMBEDDED_TABLES, EmbeddedReadStore
+from config.query_log import QueryLog
+from config.settings import Config
+from config.query_guard import (
+    CircuitBreaker, CircuitOpenError, QueryWatchdog, add_execution_time_hint, is_unavailable_error
+)
 
 db_sqlalchemy = SQLAlchemy()
 
+class PoolTimeoutError(Error):
+    """Aucune connexion disponible dans le délai imparti"""
+    pass
+
+# Classification lecture / écriture des requêtes
+READ_STATEMENT_RE = re.compile(r'^\s*(\(\s*)?(SELECT|WITH|SHOW|EXPLAIN|DESCRIBE|DESC)\b', re.IGNORECASE)
+WRITE_STATEMENT_RE = re.compile(
+    r'^\s*(INSERT|UPDATE|DELETE|REPLACE|CREATE|ALTER|DROP|TRUNCATE|RENAME|LOAD)\b', re.IGNORECASE
+)
+
+def is_read_statement(query: str) -> bool:
+    return bool(READ_STATEMENT_RE.match(query))
+
+WRITE_TABLE_RE = re.compile(
+    r'^\s*(?:INSERT\s+(?:IGNORE\s+)?INTO|REPLACE\s+INTO|UPDATE|DELETE\s+FROM|TRUNCATE(?:\s+TABLE)?)\s+`?(\w+)`?',
+    re.IGNORECASE
+)
+
+def is_write_statement(query: str) -> bool:
+    return bool(WRITE_STATEMENT_RE.match(query))
+
+def written_table(query: str) -> Optional[str]:
+    """Table modifiée par un INSERT / UPDATE / DELETE / REPLACE / TRUNCATE"""
+    match = WRITE_TABLE_RE.match(query)
+    return match.group(1).lower() if match else None
+
+def query_budget(timeout_ms: int):
+    """Budget de temps par requête SQL pour un endpoint (0 = illimité)
+
+    Les SELECT reçoivent l'indice MAX_EXECUTION_TIME ; les autres requêtes
+    sont interrompues par KILL QUERY une fois le budget dépassé.
+    """
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            g.db_budget_ms = timeout_ms
+            return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+# Erreurs MySQL indiquant qu'un statement préparé n'existe plus côté serveur
+UNKNOWN_STMT_HANDLER = 1243
+
+class PreparedStatementCache:
+    """Cache LRU des statements préparés d'une connexion, indexé par texte SQL
+
+    Le cache est vidé dès que l'identifiant de connexion MySQL change
+    (reconnexion) : les statements sont alors préparés à nouveau.
+    """
+
+    def __init__(self, max_size: int, stats: Dict, stats_lock: threading.Lock):
+        self.max_size = max_size
+        self._stats = stats  # compteurs partagés par toutes les connexions du pool
+        self._stats_lock = stats_lock
+        self._cursors = OrderedDict()
+        self._connection_id = None
+
+    def get(self, raw, query: str):
+        """Retourne (curseur préparé, texte SQL) pour la requête"""
+        connection_id = getattr(raw, 'connection_id', None)
+        if connection_id != self._connection_id:
+            self.clear()
+            self._connection_id = connection_id
+
+        entry = self._cursors.get(query)
+        if entry is not None:
+            self._cursors.move_to_end(query)
+            self._count('hits')
+            return entry
+
+        self._count('misses')
+        # Le curseur préparé réutilise son statement tant qu'on lui repasse
+        # le même objet texte : on conserve donc la clé avec le curseur
+        entry = (raw.cursor(prepared=True), query)
+        self._cursors[query] = entry
+        if len(self._cursors) > self.max_size:
+            _, (old_cursor, _) = self._cursors.popitem(last=False)
+            self._count('evictions')
+            self._close_cursor(old_cursor)
+        return entry
+
+    def _count(self, counter: str):
+        with self._stats_lock:
+            self._stats[counter] += 1
+
+    def invalidate(self, query: str):
+        entry = self._cursors.pop(query, None)
+        if entry is not None:
+            self._close_cursor(entry[0])
+
+    def clear(self):
+        for cursor, _ in self._cursors.values():
+            self._close_cursor(cursor)
+        self._cursors.clear()
+
+    def __len__(self):
+        return len(self._cursors)
+
+    @staticmethod
+    def _close_cursor(cursor):
+        try:
+            cursor.close()
+        except Exception:
+            pass
+
+class _PoolSlot:
+    """Connexion physique détenue par le pool"""
+
+    def __init__(self, raw, statements: PreparedStatementCache):
+        self.raw = raw
+        self.statements = statements
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+
+class PooledConnection:
+    """Connexion empruntée au pool ; close() la rend au pool au lieu de la fermer"""
+
+    def __init__(self, pool: 'ConnectionPool', slot: _PoolSlot):
+        self._pool = pool
+        self._slot = slot
+        self.checked_out_at = time.monotonic()
+        # Requête interrompue par KILL QUERY : connexion fermée au lieu d'être rendue
+        self.tainted = False
+
+    def __getattr__(self, name):
+        if self._slot is None:
+            raise Error("Connexion déjà rendue au pool")
+        return getattr(self._slot.raw, name)
+
+    def is_connected(self) -> bool:
+        return self._slot is not None and self._slot.raw.is_connected()
+
+    def execute_prepared(self, query: str, params: tuple = None) -> list:
+        """Exécute une requête via le cache de statements préparés de la connexion"""
+        if self._slot is None:
+            raise Error("Connexion déjà rendue au pool")
+        statements = self._slot.statements
+        for attempt in range(2):
+            cursor, key = statements.get(self._slot.raw, query)
+            try:
+                cursor.execute(key, params or ())
+                if not cursor.with_rows:
+                    return []
+                columns = cursor.column_names
+                return [dict(zip(columns, row)) for row in cursor.fetchall()]
+            except Error as e:
+                statements.invalidate(query)
+                if attempt == 0 and getattr(e, 'errno', None) == UNKNOWN_STMT_HANDLER:
+                    # Statement perdu côté serveur (reconnexion, redémarrage) : on le prépare à nouveau
+                    continue
+                raise
+
+    def close(self):
+        """Rend la connexion au pool (idempotent)"""
+        if self._slot is not None:
+            slot, self._slot = self._slot, None
+            if self.tainted:
+                self._pool.discard(slot)
+            else:
+                self._pool.release(slot)
+
+    def invalidate(self):
+        """Ferme la connexion physique au lieu de la rendre (état protocole incertain)"""
+        if self._slot is not None:
+            slot, self._slot = self._slot, None
+            self._pool.discard(slot)
+
+class ConnectionPool:
+    """Pool de connexions MySQL borné et thread-safe
+
+    - pool_size connexions conservées au repos, max_overflow connexions
+      temporaires supplémentaires sous charge
+    - checkout bloquant avec timeout (PoolTimeoutError au-delà)
+    - ping de vivacité au checkout pour les connexions restées inactives
+      plus de ping_after secondes
+    """
+
+    def __init__(self, factory, pool_size: int = 10, max_overflow: int = 5,
+                 timeout: float = 5.0, ping_after: float = 5.0, statement_cache_size: int = 64):
+        self._factory = factory
+        self.pool_size = pool_size
+        self.max_overflow = max_overflow
+        self.timeout = timeout
+        self.ping_after = ping_after
+        self.statement_cache_size = statement_cache_size
+        self._statement_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        self._statement_stats_lock = threading.Lock()
+
+        self._idle = deque()
+        self._total = 0
+        self._in_use = 0
+        self._cond = threading.Condition()
+
+        # Métriques
+        self._checkouts = 0
+        self._checkout_failures = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._discarded = 0
+
+    def checkout(self, timeout: Optional[float] = None) -> PooledConnection:
+        """Emprunte une connexion au pool"""
+        timeout = self.timeout if timeout is None else timeout
+        start = time.monotonic()
+        deadline = start + timeout
+
+        while True:
+            slot = None
+            create = False
+            with self._cond:
+                while not self._idle and self._total >= self.pool_size + self.max_overflow:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._checkout_failures += 1
+                        raise PoolTimeoutError(
+                            msg=f"Pool épuisé: aucune connexion libre après {timeout:.1f}s"
+                        )
+                    self._cond.wait(remaining)
+
+                if self._idle:
+                    slot = self._idle.pop()
+                else:
+                    self._total += 1
+                    create = True
+                self._in_use += 1
+
+            try:
+                if create:
+                    slot = _PoolSlot(
+                        self._factory(),
+                        PreparedStatementCache(
+                            self.statement_cache_size, self._statement_stats, self._statement_stats_lock
+                        )
+                    )
+                elif not self._is_alive(slot):
+                    self._discard(slot)
+                    continue
+            except Exception:
+                with self._cond:
+                    self._total -= 1
+                    self._in_use -= 1
+                    self._checkout_failures += 1
+                    self._cond.notify()
+                raise
+
+            waited = time.monotonic() - start
+            with self._cond:
+                self._checkouts += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+            return PooledConnection(self, slot)
+
+    def release(self, slot: _PoolSlot):
+        """Remet une connexion dans le pool (ou la ferme si excédentaire)"""
+        slot.last_used = time.monotonic()
+        try:
+            healthy = slot.raw.is_connected()
+            if healthy and slot.raw.in_transaction:
+                slot.raw.rollback()
+        except Exception:
+            healthy = False
+
+        if not healthy:
+            self._discard(slot)
+            return
+
+        with self._cond:
+            self._in_use -= 1
+            if len(self._idle) >= self.pool_size:
+                # Connexion d'overflow : on la ferme
+                self._total -= 1
+                self._discarded += 1
+                overflow = True
+            else:
+                self._idle.append(slot)
+                overflow = False
+            self._cond.notify()
+
+        if overflow:
+            self._close_quietly(slot)
+
+    def _is_alive(self, slot: _PoolSlot) -> bool:
+        """Ping de vivacité si la connexion est restée inactive trop longtemps"""
+        if time.monotonic() - slot.last_used < self.ping_after:
+            return True
+        try:
+            slot.raw.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def discard(self, slot: _PoolSlot):
+        """Retire définitivement une connexion empruntée"""
+        self._discard(slot)
+
+    def _discard(self, slot: _PoolSlot):
+        with self._cond:
+            self._total -= 1
+            self._in_use -= 1
+            self._discarded += 1
+            self._cond.notify()
+        self._close_quietly(slot)
+
+    @staticmethod
+    def _close_quietly(slot: _PoolSlot):
+        try:
+            slot.raw.close()
+        except Exception:
+            pass
+
+    def dispose(self):
+        """Ferme toutes les connexions inactives"""
+        with self._cond:
+            slots = list(self._idle)
+            self._idle.clear()
+            self._total -= len(slots)
+        for slot in slots:
+            self._close_quietly(slot)
+
+    def stats(self) -> Dict:
+        """Métriques du pool"""
+        with self._statement_stats_lock:
+            statement_stats = dict(self._statement_stats)
+        with self._cond:
+            return {
+                'pool_size': self.pool_size,
+                'max_overflow': self.max_overflow,
+                'timeout': self.timeout,
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'total': self._total,
+                'checkouts': self._checkouts,
+                'checkout_failures': self._checkout_failures,
+                'discarded': self._discarded,
+                'wait_time_total_ms': round(self._wait_total * 1000, 3),
+                'wait_time_avg_ms': round(self._wait_total * 1000 / self._checkouts, 3) if self._checkouts else 0,
+                'wait_time_max_ms': round(self._wait_max * 1000, 3),
+                'prepared_statements': dict(
+                    statement_stats,
+                    cached=sum(len(slot.statements) for slot in self._idle),
+                    cache_size=self.statement_cache_size
+                )
+            }
+
+class CursorProxy:
+    """Curseur MySQL dont les exécutions sont vues par la couche d'accès aux données
+
+    La latence d'une requête (exécution + lecture du résultat) et son nombre
+    de lignes sont journalisés à l'exécution suivante ou à la fermeture.
+    """
+
+    def __init__(self, cursor, owner: 'DatabaseConnection', conn: Optional['PooledConnection'] = None):
+        self._cursor = cursor
+        self._owner = owner
+        self._conn = conn
+        self._pending = None
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def execute(self, operation, params=None, **kwargs):
+        self.finish()
+        operation = self._owner._before_statement(operation)
+        start = time.monotonic()
+        with self._owner._guard(operation, self._conn):
+            result = self._cursor.execute(operation, params or (), **kwargs)
+        self._pending = [operation, params, time.monotonic() - start]
+        self._owner._after_statement(operation, params)
+        return result
+
+    def executemany(self, operation, seq_params):
+        self.finish()
+        operation = self._owner._before_statement(operation)
+        start = time.monotonic()
+        with self._owner._guard(operation, self._conn):
+            result = self._cursor.executemany(operation, seq_params)
+        self._pending = [operation, None, time.monotonic() - start]
+        self._owner._after_statement(operation, None)
+        return result
+
+    def _timed_fetch(self, method, *args):
+        start = time.monotonic()
+        rows = getattr(self._cursor, method)(*args)
+        if self._pending is not None:
+            self._pending[2] += time.monotonic() - start
+        return rows
+
+    def fetchone(self):
+        return self._timed_fetch('fetchone')
+
+    def fetchmany(self, size=1):
+        return self._timed_fetch('fetchmany', size)
+
+    def fetchall(self):
+        return self._timed_fetch('fetchall')
+
+    def finish(self):
+        """Journalise la dernière requête exécutée"""
+        if self._pending is not None:
+            operation, params, elapsed = self._pending
+            self._pending = None
+            self._owner._log_statement(operation, params, elapsed, self._cursor.rowcount)
+
+    def close(self):
+        self.finish()
+        return self._cursor.close()
+
+class RoutingCursor:
+    """Curseur en lecture routé requête par requête
+
+    Les lectures qui ne touchent que players/styles sont servies par la copie
+    locale ; une connexion MySQL n'est empruntée qu'au premier besoin.
+    """
+
+    def __init__(self, owner: 'DatabaseConnection', dictionary: bool):
+        self._owner = owner
+        self._dictionary = dictionary
+        self._stack = ExitStack()
+        self._mysql = None
+        self._current = None
+
+    def _mysql_cursor(self) -> CursorProxy:
+        if self._mysql is None:
+            conn = self._stack.enter_context(self._owner.connection(readonly=True))
+            self._mysql = CursorProxy(conn.cursor(dictionary=self._dictionary), self._owner, conn)
+        return self._mysql
+
+    def __getattr__(self, name):
+        return getattr(self._current or self._mysql_cursor(), name)
+
+    def __iter__(self):
+        return iter(self._current or self._mysql_cursor())
+
+    def execute(self, operation, params=None, **kwargs):
+        if self._owner._use_embedded(operation):
+            start = time.monotonic()
+            cursor = self._owner.embedded.execute(operation, params, self._dictionary)
+            if cursor is not None:
+                self._owner._log_statement(operation, params, time.monotonic() - start, backend='sqlite')
+                self._current = cursor
+                return
+        self._current = self._mysql_cursor()
+        self._current.execute(operation, params, **kwargs)
+
+    def close(self):
+        try:
+            if self._mysql is not None:
+                self._mysql.close()
+        except Error:
+            pass
+        finally:
+            self._stack.close()
+
+class ReplicaNode:
+    """Réplique en lecture avec son propre pool et son retard de réplication"""
+
+    def __init__(self, host: str, port: int, pool: ConnectionPool):
+        self.host = host
+        self.port = port
+        self.pool = pool
+        self.lag = None
+        self.healthy = True
+        self.checked_at = 0.0
+        self.reads = 0
+        self.failures = 0
+        self._check_lock = threading.Lock()
+
+    def refresh_lag(self, max_lag: float):
+        """Mesure le retard de réplication (SHOW REPLICA STATUS)
+
+        Une instance qui n'est pas configurée en réplique (aucune ligne de statut)
+        est considérée à jour : cela permet de tester le routage avec deux
+        instances MySQL locales indépendantes.
+        """
+        try:
+            conn = self.pool.checkout(timeout=1)
+            try:
+                cursor = conn.cursor(dictionary=True)
+                try:
+                    try:
+                        cursor.execute("SHOW REPLICA STATUS")
+                    except Error:
+                        # MySQL < 8.0.22
+                        cursor.execute("SHOW SLAVE STATUS")
+                    status = cursor.fetchone()
+                finally:
+                    cursor.close()
+            finally:
+                conn.close()
+
+            if status is None:
+                self.lag = 0
+            else:
+                self.lag = status.get('Seconds_Behind_Source', status.get('Seconds_Behind_Master'))
+            self.healthy = self.lag is not None and self.lag <= max_lag
+        except Error as e:
+            print(f"⚠️  Réplique {self.host}:{self.port} indisponible: {e}")
+            self.lag = None
+            self.healthy = False
+        self.checked_at = time.monotonic()
+
+    def stats(self) -> Dict:
+        return {
+            'host': self.host,
+            'port': self.port,
+            'healthy': self.healthy,
+            'lag_seconds': self.lag,
+            'reads': self.reads,
+            'failures': self.failures,
+            'pool': self.pool.stats()
+        }
+
+class ReplicaRouter:
+    """Répartit les lectures en round-robin sur les répliques dont le retard est acceptable"""
+
+    def __init__(self, replicas: List[ReplicaNode], max_lag: float, check_interval: float):
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self._counter = itertools.count()
+
+    def choose(self) -> Optional[ReplicaNode]:
+        if not self.replicas:
+            return None
+        start = next(self._counter)
+        for i in range(len(self.replicas)):
+            node = self.replicas[(start + i) % len(self.replicas)]
+            if self._is_usable(node):
+                return node
+        return None
+
+    def _is_usable(self, node: ReplicaNode) -> bool:
+        if time.monotonic() - node.checked_at >= self.check_interval:
+            # Un seul thread mesure le retard ; les autres gardent la dernière valeur
+            if node._check_lock.acquire(blocking=False):
+                try:
+                    node.refresh_lag(self.max_lag)
+                finally:
+                    node._check_lock.release()
+        return node.healthy
+
 class DatabaseConnection:
     def __init__(self):
-        self.host = os.getenv('DB_HOST', 'localhost')
-        self.database = os.getenv('DB_NAME', 'scoutai')
-        self.user = os.getenv('DB_USER', 'root')
-        self.password = os.getenv('DB_PASSWORD', '')
-        self.port = int(os.getenv('DB_PORT', 3307))  
-        self._connection = None
-    
+        self.host = Config.DB_HOST
+        self.database = Config.DB_NAME
+        self.user = Config.DB_USER
+        self.password = Config.DB_PASSWORD
+        self.port = Config.DB_PORT
+        self.pool_size = Config.DB_POOL_SIZE
+        self.pool_max_overflow = Config.DB_POOL_MAX_OVERFLOW
+        self.pool_timeout = Config.DB_POOL_TIMEOUT
+        self.pool_ping_after = Config.DB_POOL_PING_AFTER
+        self.statement_cache_size = Config.DB_STMT_CACHE_SIZE
+        self.use_prepared = Config.DB_PREPARED_STATEMENTS
+        # Répliques en lecture : DB_REPLICAS="hote:port,hote:port"
+        self.replica_hosts = self._parse_hosts(Config.DB_REPLICAS)
+        self.replica_max_lag = Config.DB_REPLICA_MAX_LAG
+        self.replica_check_interval = Config.DB_REPLICA_CHECK_INTERVAL
+        self.sticky_seconds = Config.DB_STICKY_SECONDS
+        self._pool = None
+        self._router = None
+        self._pool_lock = threading.Lock()
+        self._primary_reads = 0
+        self._reads_lock = threading.Lock()  # compteurs de routage des lectures
+        self._hold_stats = {}
+        self._hold_lock = threading.Lock()
+        # Copie locale SQLite des tables players/styles (désactivée si DB_EMBEDDED_PATH est vide)
+        self.embedded = EmbeddedReadStore(
+            Config.DB_EMBEDDED_PATH,
+            refresh_interval=Config.DB_EMBEDDED_REFRESH,
+            max_age=Config.DB_EMBEDDED_MAX_AGE
+        )
+        # Budget par requête SQL pendant une requête HTTP (surchargé par @query_budget)
+        self.statement_timeout_ms = Config.DB_STATEMENT_TIMEOUT_MS
+        self.breaker = CircuitBreaker(
+            failure_threshold=Config.DB_BREAKER_FAILURES,
+            slow_call_ms=Config.DB_BREAKER_SLOW_MS,
+            reset_timeout=Config.DB_BREAKER_RESET
+        )
+        self.watchdog = QueryWatchdog(self.kill_query)
+        self._write_listeners = []
+        self.query_log = QueryLog(
+            self._explain,
+            slow_threshold_ms=Config.DB_SLOW_QUERY_MS,
+            capacity=Config.DB_SLOW_QUERY_BUFFER,
+            explain_interval=Config.DB_EXPLAIN_INTERVAL
+        )
+
+    @staticmethod
+    def _parse_hosts(value: str) -> List[tuple]:
+        hosts = []
+        for item in value.split(','):
+            item = item.strip()
+            if not item:
+                continue
+            host, _, port = item.partition(':')
+            hosts.append((host, int(port) if port else 3306))
+        return hosts
+
+    def _create_connection(self, host: Optional[str] = None, port: Optional[int] = None):
+        """Ouvre une nouvelle connexion physique"""
+        return mysql.connector.connect(
+            host=host or self.host,
+            database=self.database,
+            user=self.user,
+            password=self.password,
+            port=port or self.port,
+            charset='utf8mb4',
+            autocommit=True
+        )
+
+    def _create_pool(self, host: str, port: int) -> ConnectionPool:
+        return ConnectionPool(
+            lambda: self._create_connection(host, port),
+            pool_size=self.pool_size,
+            max_overflow=self.pool_max_overflow,
+            timeout=self.pool_timeout,
+            ping_after=self.pool_ping_after,
+            statement_cache_size=self.statement_cache_size
+        )
+
+    @property
+    def pool(self) -> ConnectionPool:
+        """Pool du primaire (écritures et lectures non routées)"""
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = self._create_pool(self.host, self.port)
+                    print(f"✅ Pool MySQL initialisé (taille {self.pool_size}, overflow {self.pool_max_overflow})")
+        return self._pool
+
+    @property
+    def router(self) -> ReplicaRouter:
+        if self._router is None:
+            with self._pool_lock:
+                if self._router is None:
+                    replicas = [
+                        ReplicaNode(host, port, self._create_pool(host, port))
+                        for host, port in self.replica_hosts
+                    ]
+                    self._router = ReplicaRouter(replicas, self.replica_max_lag, self.replica_check_interval)
+                    if replicas:
+                        print(f"✅ {len(replicas)} réplique(s) MySQL configurée(s) pour les lectures")
+        return self._router
+
+    def _reads_need_primary(self) -> bool:
+        """Lecture de ses propres écritures : après une écriture, les lectures restent sur le primaire"""
+        if not has_request_context():
+            return False
+        if g.get('db_sticky_primary'):
+            return True
+        last_write = session.get('_db_last_write')
+        return bool(last_write) and time.time() - last_write < self.sticky_seconds
+
+    def _mark_write(self):
+        if has_request_context():
+            g.db_sticky_primary = True
+            if self.replica_hosts:
+                session['_db_last_write'] = time.time()
+
+    def _before_statement(self, query: str) -> str:
+        """Suivi des écritures ; retourne la requête à envoyer (avec son budget de temps)"""
+        if is_write_statement(query):
+            self._mark_write()
+        timeout_ms = self._statement_timeout_ms()
+        if timeout_ms:
+            query = add_execution_time_hint(query, timeout_ms)
+        return query
+
+    def add_write_listener(self, listener):
+        """Enregistre listener(table, query, params), appelé après chaque écriture réussie"""
+        self._write_listeners.append(listener)
+
+    def _after_statement(self, query: str, params):
+        """Notifie les écritures réussies (copie locale, invalidation du cache)"""
+        table = written_table(query)
+        if table is None:
+            return
+        if self.embedded.enabled and table in EMBEDDED_TABLES:
+            self.embedded.request_refresh()
+        for listener in self._write_listeners:
+            try:
+                listener(table, query, params)
+            except Exception as e:
+                print(f"⚠️  Erreur d'un listener d'écriture ({table}): {e}")
+
+    def _statement_timeout_ms(self) -> Optional[int]:
+        """Budget de la requête SQL courante (aucun hors requête HTTP : scripts, migrations)"""
+        if not has_request_context():
+            return None
+        return g.get('db_budget_ms', self.statement_timeout_ms) or None
+
+    @contextmanager
+    def _guard(self, query: str, conn: Optional[PooledConnection] = None):
+        """Comptabilise l'exécution pour le disjoncteur ; KILL QUERY au-delà du budget
+        pour les requêtes que l'indice MAX_EXECUTION_TIME ne couvre pas"""
+        token = None
+        timeout_ms = self._statement_timeout_ms()
+        if timeout_ms and conn is not None and 'MAX_EXECUTION_TIME' not in query:
+            token = self.watchdog.watch(self._kill_target(conn), timeout_ms)
+        start = time.monotonic()
+        try:
+            yield
+        except Error as e:
+            if is_unavailable_error(e):
+                self.breaker.record_failure(e)
+            else:
+                # Erreur SQL applicative : la base a répondu
+                self.breaker.record_success(time.monotonic() - start)
+            raise
+        else:
+            self.breaker.record_success(time.monotonic() - start)
+        finally:
+            if token is not None and self.watchdog.done(token):
+                conn.tainted = True
+
+    def _log_statement(self, query: str, params, elapsed: float, rows: Optional[int] = None,
+                       backend: str = 'mysql'):
+        endpoint = request.endpoint if has_request_context() else None
+        self.query_log.record(query, params, elapsed, rows, endpoint=endpoint, backend=backend)
+
+    def _explain(self, query: str, params) -> Optional[Dict]:
+        """Plan EXPLAIN FORMAT=JSON d'une requête lente (exécuté hors requête HTTP)"""
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                try:
+                    cursor.execute("EXPLAIN FORMAT=JSON " + query.lstrip(), params or ())
+                    row = cursor.fetchone()
+                finally:
+                    cursor.close()
+            return json.loads(row[0]) if row else None
+        except (Error, ValueError) as e:
+            return {'error': str(e)}
+
+    def query_report(self, limit: int = 50) -> Dict:
+        """Requêtes par empreinte et requêtes lentes récentes"""
+        return self.query_log.report(limit)
+
+    @staticmethod
+    def _kill_target(conn: PooledConnection) -> tuple:
+        """(identifiant MySQL, hôte, port) de la connexion : primaire ou réplique"""
+        return (conn.connection_id, conn.server_host, conn.server_port)
+
+    def kill_query(self, connection_id: int, host: Optional[str] = None, port: Optional[int] = None):
+        """Interrompt la requête en cours d'une connexion (via une connexion dédiée, hors pool)"""
+        try:
+            conn = self._create_connection(host, port)
+            try:
+                cursor = conn.cursor()
+                cursor.execute("KILL QUERY %s", (int(connection_id),))
+                cursor.close()
+            finally:
+                conn.close()
+            print(f"⏱️  Requête interrompue sur la connexion MySQL {connection_id}")
+        except Error as e:
+            print(f"❌ Impossible d'interrompre la requête {connection_id}: {e}")
+
+    def _use_embedded(self, query: str) -> bool:
+        """Lecture servie par la copie locale (sauf lecture de ses propres écritures,
+        à moins que la base soit indisponible)"""
+        if not self.embedded.handles(query):
+            return False
+        return self.breaker.is_open() or not self._reads_need_primary()
+
+    def _checkout(self, readonly: bool, timeout: Optional[float] = None) -> PooledConnection:
+        """Emprunte une connexion sur une réplique saine (lecture) ou sur le primaire
+
+        Lève CircuitOpenError sans attendre si le disjoncteur est ouvert.
+        """
+        self.breaker.allow()
+        if readonly and self.replica_hosts and not self._reads_need_primary():
+            node = self.router.choose()
+            if node is not None:
+                try:
+                    conn = node.pool.checkout()
+                    with self._reads_lock:
+                        node.reads += 1
+                    return conn
+                except Error as e:
+                    print(f"⚠️  Réplique {node.host}:{node.port} en échec, repli sur le primaire: {e}")
+                    with self._reads_lock:
+                        node.failures += 1
+                    node.healthy = False
+                    node.checked_at = time.monotonic()
+        if readonly:
+            with self._reads_lock:
+                self._primary_reads += 1
+        try:
+            return self.pool.checkout(timeout)
+        except Error as e:
+            # Pool épuisé : la base répond, seules les connexions manquent
+            if is_unavailable_error(e):
+                self.breaker.record_failure(e)
+            raise
+
     def connect(self):
-        """Établit la connexion à la base de données"""
-        try:
-            if self._connection is None or not self._connection.is_connected():
-                self._connection = mysql.connector.connect(
-                    host=self.host,
-                    database=self.database,
-                    user=self.user,
-                    password=self.password,
-                    port=self.port,
-                    charset='utf8mb4',
-                    autocommit=True
-                )
-                print("✅ Connexion MySQL établie")
-            return self._connection
+        """Emprunte une connexion au pool ; l'appelant doit appeler close() pour la rendre
+
+        Préférer connection() / cursor() qui garantissent la restitution.
+        """
+        try:
+            return self.pool.checkout()
         except Error as e:
             print(f"❌ Erreur de connexion MySQL: {e}")
             return None
-    
+
+    @contextmanager
+    def connection(self, readonly: bool = False):
+        """Emprunte une connexion et la rend au pool quoi qu'il arrive
+
+        readonly=True autorise le routage vers une réplique en lecture.
+        """
+        conn = self._checkout(readonly)
+        try:
+            yield conn
+        finally:
+            held = time.monotonic() - conn.checked_out_at
+            conn.close()
+            self._record_hold(held)
+
+    @contextmanager
+    def cursor(self, dictionary: bool = False, readonly: bool = False):
+        """Curseur sur une connexion empruntée ; curseur et connexion sont toujours libérés"""
+        if readonly and self.embedded.enabled:
+            cursor = RoutingCursor(self, dictionary)
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+            return
+        with self.connection(readonly=readonly) as conn:
+            cursor = CursorProxy(conn.cursor(dictionary=dictionary), self, conn)
+            try:
+                yield cursor
+            finally:
+                try:
+                    cursor.close()
+                except Error:
+                    pass
+
+    def _record_hold(self, held: float):
+        """Comptabilise la durée de détention d'une connexion pour la requête HTTP courante"""
+        if not has_request_context():
+            return
+        g.db_hold_time = g.get('db_hold_time', 0.0) + held
+        g.db_checkouts = g.get('db_checkouts', 0) + 1
+
+    def record_request(self, endpoint: Optional[str], hold_time: float, checkouts: int):
+        """Agrège le temps de détention des connexions par endpoint"""
+        key = endpoint or 'unknown'
+        with self._hold_lock:
+            entry = self._hold_stats.setdefault(key, {
+                'requests': 0, 'checkouts': 0, 'hold_time_total_ms': 0.0, 'hold_time_max_ms': 0.0
+            })
+            held_ms = hold_time * 1000
+            entry['requests'] += 1
+            entry['checkouts'] += checkouts
+            entry['hold_time_total_ms'] += held_ms
+            entry['hold_time_max_ms'] = max(entry['hold_time_max_ms'], held_ms)
+
+    def hold_stats(self) -> Dict:
+        """Durée de détention des connexions par endpoint"""
+        with self._hold_lock:
+            return {
+                endpoint: dict(
+                    entry,
+                    hold_time_total_ms=round(entry['hold_time_total_ms'], 3),
+                    hold_time_max_ms=round(entry['hold_time_max_ms'], 3),
+                    hold_time_avg_ms=round(entry['hold_time_total_ms'] / entry['requests'], 3)
+                )
+                for endpoint, entry in self._hold_stats.items()
+            }
+
     def disconnect(self):
-        """Ferme la connexion à la base de données"""
-        if self._connection and self._connection.is_connected():
-            self._connection.close()
-            print("🔌 Connexion MySQL fermée")
-    
-    def execute_query(self, query: str, params: tuple = None, fetch: bool = True):
-        """Exécute une requête SQL"""
-        try:
-            connection = self.connect()
-            if connection:
-                cursor = connection.cursor(dictionary=True)
+        """Ferme les connexions inactives du pool"""
+        if self._pool is not None:
+            self._pool.dispose()
+            print("🔌 Connexions MySQL fermées")
+
+    def pool_stats(self) -> Dict:
+        """Métriques du pool de connexions"""
+        if self._pool is None:
+            return {'initialized': False}
+        return dict(self._pool.stats(), initialized=True)
+
+    def replication_stats(self) -> Dict:
+        """État du routage lecture / écriture"""
+        replicas = self.router.replicas
+        with self._reads_lock:
+            return {
+                'replicas': [node.stats() for node in replicas],
+                'max_lag_seconds': self.replica_max_lag,
+                'sticky_seconds': self.sticky_seconds,
+                'primary_reads': self._primary_reads
+            }
+
+    def ping(self, timeout: float = 1.0) -> bool:
+        """Vérification rapide de la base : n'attend jamais le pool plus de `timeout` secondes"""
+        conn = self._checkout(readonly=False, timeout=timeout)
+        start = time.monotonic()
+        try:
+            connected = conn.is_connected()
+        finally:
+            conn.close()
+        if connected:
+            self.breaker.record_success(time.monotonic() - start)
+        return connected
+
+    def breaker_stats(self) -> Dict:
+        """État du disjoncteur et des budgets de temps"""
+        return dict(
+            self.breaker.stats(),
+            statement_timeout_ms=self.statement_timeout_ms,
+            watchdog=self.watchdog.stats()
+        )
+
+    def start_embedded_refresh(self):
+        """Démarre le rafraîchissement périodique de la copie locale (si configurée)"""
+        self.embedded.start(self)
+
+    def embedded_stats(self) -> Dict:
+        """État de la copie locale players/styles"""
+        return self.embedded.stats()
+
+    def fetch_prepared(self, query: str, params: tuple = None) -> list:
+        """Exécute une lecture en statement préparé (mis en cache par connexion)
+
+        Retourne une liste de dictionnaires ; les erreurs sont propagées.
+        """
+        if self._use_embedded(query):
+            start = time.monotonic()
+            rows = self.embedded.fetch_all(query, params)
+            if rows is not None:
+                self._log_statement(query, params, time.monotonic() - start, len(rows), backend='sqlite')
+                return rows
+        query = self._before_statement(query)
+        with self.connection(readonly=True) as conn, self._guard(query):
+            start = time.monotonic()
+            if self.use_prepared:
+                rows = conn.execute_prepared(query, params)
+            else:
+                cursor = conn.cursor(dictionary=True)
+                try:
+                    cursor.execute(query, params or ())
+                    rows = cursor.fetchall()
+                finally:
+                    cursor.close()
+            self._log_statement(query, params, time.monotonic() - start, len(rows))
+            return rows
+
+    def stream_query(self, query: str, params: tuple = None, batch_size: int = 500,
+                     dictionary: bool = True) -> Iterator[List]:
+        """Lit un résultat par lots via un curseur non bufferisé (fetchmany)
+
+        La mémoire reste bornée à un lot ; la connexion est détenue jusqu'à
+        épuisement ou fermeture du générateur. Un générateur abandonné en cours
+        de lecture ferme la connexion plutôt que de lire le reste du résultat ;
+        KILL QUERY n'est envoyé que si le budget de temps est dépassé.
+        """
+        if self._use_embedded(query):
+            start = time.monotonic()
+            cursor = self.embedded.execute(query, params, dictionary)
+            if cursor is not None:
+                self._log_statement(query, params, time.monotonic() - start, backend='sqlite')
+                yield from self.embedded.stream(cursor, batch_size)
+                return
+        with self.connection(readonly=True) as conn:
+            cursor = CursorProxy(conn.cursor(dictionary=dictionary, buffered=False), self)
+            start = time.monotonic()
+            exhausted = False
+            failed = False
+            try:
                 cursor.execute(query, params or ())
-                
-                if fetch:
-                    result = cursor.fetchall()
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        exhausted = True
+                        break
+                    yield rows
+            except Error:
+                # Erreur SQL : la requête est déjà terminée côté serveur
+                failed = True
+                raise
+            finally:
+                if exhausted:
                     cursor.close()
-                    return result
                 else:
-                    connection.commit()
-                    cursor.close()
-                    return True
-            return None
+                    cursor.finish()
+                    timeout_ms = self._statement_timeout_ms()
+                    if not failed and timeout_ms and (time.monotonic() - start) * 1000 >= timeout_ms:
+                        # Budget dépassé : le serveur arrête de produire le résultat
+                        self.kill_query(*self._kill_target(conn))
+                    conn.invalidate()
+
+    def iter_rows(self, query: str, params: tuple = None, batch_size: int = 500,
+                  dictionary: bool = True) -> Iterator:
+        """Itère ligne à ligne sur stream_query"""
+        for rows in self.stream_query(query, params, batch_size, dictionary):
+            yield from rows
+
+    def execute_query(self, query: str, params: tuple = None, fetch: bool = True, prepared: bool = False,
+                      primary: bool = False):
+        """Exécute une requête SQL
+
+        primary=True lit sur le primaire (ni réplique ni copie locale), par exemple
+        juste après une écriture faite hors requête HTTP.
+        """
+        try:
+            if prepared and fetch and not primary:
+                return self.fetch_prepared(query, params)
+            readonly = fetch and is_read_statement(query) and not primary
+            with self.cursor(dictionary=True, readonly=readonly) as cursor:
+                cursor.execute(query, params or ())
+
+                if fetch:
+                    return cursor.fetchall()
+                return True
         except Error as e:
             print(f"❌ Erreur lors de l'exécution de la requête: {e}")
             return None
-    
+
+    def execute_insert(self, query: str, params: tuple = None) -> Optional[int]:
+        """Exécute un INSERT et retourne l'identifiant généré"""
+        try:
+            with self.cursor() as cursor:
+                cursor.execute(query, params or ())
+                return cursor.lastrowid
+        except Error as e:
+            print(f"❌ Erreur lors de l'insertion: {e}")
+            return None
+
     def execute_many(self, query: str, data: list):
         """Exécute une requête avec plusieurs ensembles de données"""
         try:
-            connection = self.connect()
-            if connection:
-                cursor = connection.cursor()
-                cursor.executemany(query, data)
-                connection.commit()
-                cursor.close()
-                return True
-            return False
+            with self.connection() as connection:
+                cursor = CursorProxy(connection.cursor(), self, connection)
+                try:
+                    cursor.executemany(query, data)
+                    connection.commit()
+                    return True
+                finally:
+                    cursor.close()
         except Error as e:
             print(f"❌ Erreur lors de l'insertion multiple: {e}")
             return False
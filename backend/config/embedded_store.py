@@ -0,0 +1,261 @@
+# backend/config/embedded_store.py
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterator, List, Optional
+from mysql.connector import Error, FieldType
+
+# Tables de référence recopiées localement ; tout le reste reste sur MySQL
+EMBEDDED_TABLES = ('players', 'styles', 'player_positions')
+
+EMBEDDED_INDEXES = {
+    'players': ['player_id', 'id_style', 'market_value', 'position', 'squad', 'name'],
+    'styles': ['id_style', 'name'],
+    'player_positions': ['position', 'player_id'],
+}
+
+TABLE_REF_RE = re.compile(r'\b(?:FROM|JOIN)\s+`?(\w+)`?', re.IGNORECASE)
+SELECT_RE = re.compile(r'^\s*(\(\s*)?(SELECT|WITH)\b', re.IGNORECASE)
+LOCKING_READ_RE = re.compile(r'\b(FOR\s+UPDATE|LOCK\s+IN\s+SHARE\s+MODE)\b', re.IGNORECASE)
+PLACEHOLDER_RE = re.compile(r'%([s%])')
+
+# Types MySQL -> affinité SQLite
+INTEGER_TYPES = {'TINY', 'SHORT', 'LONG', 'LONGLONG', 'INT24', 'YEAR', 'BIT'}
+REAL_TYPES = {'DECIMAL', 'NEWDECIMAL', 'FLOAT', 'DOUBLE'}
+TIMESTAMP_TYPES = {'DATETIME', 'TIMESTAMP'}
+
+sqlite3.register_adapter(Decimal, float)
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(' '))
+sqlite3.register_adapter(date, lambda value: value.isoformat())
+sqlite3.register_converter('TIMESTAMP', lambda value: datetime.fromisoformat(value.decode()))
+sqlite3.register_converter('DATE', lambda value: date.fromisoformat(value.decode()))
+
+def _dict_row(cursor, row):
+    return {column[0]: value for column, value in zip(cursor.description, row)}
+
+def _column_type(type_code) -> str:
+    name = FieldType.get_info(type_code)
+    if name in INTEGER_TYPES:
+        return 'INTEGER'
+    if name in REAL_TYPES:
+        return 'REAL'
+    if name in TIMESTAMP_TYPES:
+        return 'TIMESTAMP'
+    if name == 'DATE':
+        return 'DATE'
+    # Comparaisons insensibles à la casse, comme les collations *_ci de MySQL
+    return 'TEXT COLLATE NOCASE'
+
+class EmbeddedReadStore:
+    """Copie SQLite locale des tables players, styles et player_positions
+
+    Les lectures qui ne touchent que ces tables sont servies depuis un fichier
+    local, sans aller-retour réseau vers MySQL. Le fichier est reconstruit
+    périodiquement depuis MySQL puis remplacé atomiquement : les workers d'un
+    même nœud partagent la même copie et détectent son remplacement.
+    """
+
+    def __init__(self, path: str = '', refresh_interval: float = 300, max_age: float = 900,
+                 min_refresh_interval: float = 5):
+        self.path = path
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age
+        self.min_refresh_interval = min_refresh_interval
+        self._local = threading.local()
+        self._unsupported = set()
+        self._wake = threading.Event()
+        self._refresh_lock = threading.Lock()
+        self._thread = None
+        self.reads = 0
+        self.fallbacks = 0
+        self.refreshes = 0
+        self.refresh_failures = 0
+        self.last_refresh_ms = None
+        self.last_error = None
+        self.row_counts = {}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _file_state(self) -> Optional[os.stat_result]:
+        try:
+            return os.stat(self.path)
+        except OSError:
+            return None
+
+    def age(self) -> Optional[float]:
+        """Âge de la copie locale en secondes (None si absente)"""
+        state = self._file_state()
+        return None if state is None else max(0.0, time.time() - state.st_mtime)
+
+    def handles(self, query: str) -> bool:
+        """La requête est une lecture qui ne référence que des tables recopiées"""
+        if not self.enabled or query in self._unsupported:
+            return False
+        if not SELECT_RE.match(query) or LOCKING_READ_RE.search(query):
+            return False
+        tables = {name.lower() for name in TABLE_REF_RE.findall(query)}
+        return bool(tables) and tables.issubset(EMBEDDED_TABLES)
+
+    def _reader(self) -> Optional[sqlite3.Connection]:
+        """Connexion en lecture seule propre au thread, rouverte si le fichier a été remplacé"""
+        state = self._file_state()
+        if state is None or time.time() - state.st_mtime > self.max_age:
+            return None
+        identity = (state.st_ino, state.st_mtime_ns)
+        local = self._local
+        if getattr(local, 'identity', None) != identity:
+            if getattr(local, 'conn', None) is not None:
+                local.conn.close()
+            local.conn = sqlite3.connect(
+                f"file:{self.path}?mode=ro", uri=True, detect_types=sqlite3.PARSE_DECLTYPES
+            )
+            local.identity = identity
+        return local.conn
+
+    @staticmethod
+    def translate(query: str) -> str:
+        """Paramètres au format MySQL (%s) -> SQLite (?)"""
+        return PLACEHOLDER_RE.sub(lambda m: '?' if m.group(1) == 's' else '%', query)
+
+    def execute(self, query: str, params=None, dictionary: bool = False) -> Optional[sqlite3.Cursor]:
+        """Exécute la lecture localement ; None si la copie est indisponible ou la requête non supportée"""
+        try:
+            conn = self._reader()
+            if conn is None:
+                return None
+            cursor = conn.cursor()
+            if dictionary:
+                cursor.row_factory = _dict_row
+            cursor.execute(self.translate(query), tuple(params or ()))
+        except sqlite3.Error as e:
+            # Fonction ou syntaxe propre à MySQL : la requête restera servie par MySQL
+            print(f"⚠️  Requête non supportée par la copie locale, repli sur MySQL: {e}")
+            self._unsupported.add(query)
+            self.fallbacks += 1
+            return None
+        self.reads += 1
+        return cursor
+
+    def fetch_all(self, query: str, params=None) -> Optional[List[Dict]]:
+        cursor = self.execute(query, params, dictionary=True)
+        return None if cursor is None else cursor.fetchall()
+
+    def stream(self, cursor: sqlite3.Cursor, batch_size: int) -> Iterator[List]:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                return
+            yield rows
+
+    def refresh(self, source) -> bool:
+        """Reconstruit la copie depuis MySQL (source : DatabaseConnection) puis la publie"""
+        if not self.enabled:
+            return False
+        with self._refresh_lock:
+            start = time.monotonic()
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            row_counts = {}
+            try:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                target = sqlite3.connect(tmp_path)
+                try:
+                    for table in EMBEDDED_TABLES:
+                        row_counts[table] = self._copy_table(source, target, table)
+                    target.execute("ANALYZE")
+                    target.commit()
+                finally:
+                    target.close()
+                os.replace(tmp_path, self.path)
+            except (Error, sqlite3.Error, OSError) as e:
+                self.refresh_failures += 1
+                self.last_error = str(e)
+                print(f"❌ Erreur lors du rafraîchissement de la copie locale: {e}")
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                return False
+
+            self.refreshes += 1
+            self.row_counts = row_counts
+            self.last_error = None
+            self.last_refresh_ms = round((time.monotonic() - start) * 1000, 1)
+            self._unsupported.clear()
+            print(f"✅ Copie locale rafraîchie ({row_counts}) en {self.last_refresh_ms} ms")
+            return True
+
+    @staticmethod
+    def _copy_table(source, target: sqlite3.Connection, table: str, batch_size: int = 1000) -> int:
+        with source.connection(readonly=True) as conn:
+            cursor = conn.cursor(buffered=False)
+            try:
+                cursor.execute(f"SELECT * FROM {table}")
+                columns = [(column[0], _column_type(column[1])) for column in cursor.description]
+                target.execute(
+                    f"CREATE TABLE {table} ("
+                    + ", ".join(f'"{name}" {column_type}' for name, column_type in columns) + ")"
+                )
+                insert = (
+                    f"INSERT INTO {table} VALUES (" + ", ".join('?' * len(columns)) + ")"
+                )
+                copied = 0
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    target.executemany(insert, rows)
+                    copied += len(rows)
+            finally:
+                cursor.close()
+
+        names = {name for name, _ in columns}
+        for column in EMBEDDED_INDEXES.get(table, []):
+            if column in names:
+                target.execute(f'CREATE INDEX idx_{table}_{column} ON {table} ("{column}")')
+        return copied
+
+    def request_refresh(self):
+        """Demande un rafraîchissement anticipé (écriture sur une table recopiée)"""
+        self._wake.set()
+
+    def start(self, source):
+        """Lance le rafraîchissement périodique en tâche de fond"""
+        if not self.enabled or self.refresh_interval <= 0 or self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, args=(source,), name='embedded-store-refresh', daemon=True
+        )
+        self._thread.start()
+        print(f"🔄 Copie locale {self.path} rafraîchie toutes les {self.refresh_interval:.0f}s")
+
+    def _run(self, source):
+        while True:
+            self.refresh(source)
+            if self._wake.wait(self.refresh_interval):
+                # Regroupe les écritures rapprochées en un seul rafraîchissement
+                time.sleep(self.min_refresh_interval)
+                self._wake.clear()
+
+    def stats(self) -> Dict:
+        age = self.age()
+        return {
+            'enabled': self.enabled,
+            'path': self.path,
+            'available': age is not None and age <= self.max_age,
+            'age_seconds': None if age is None else round(age, 1),
+            'max_age_seconds': self.max_age,
+            'refresh_interval_seconds': self.refresh_interval,
+            'row_counts': self.row_counts,
+            'reads': self.reads,
+            'fallbacks': self.fallbacks,
+            'unsupported_queries': len(self._unsupported),
+            'refreshes': self.refreshes,
+            'refresh_failures': self.refresh_failures,
+            'last_refresh_ms': self.last_refresh_ms,
+            'last_error': self.last_error
+        }
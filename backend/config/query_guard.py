@@ -0,0 +1,227 @@
+# backend/config/query_guard.py
+import heapq
+import itertools
+import re
+import threading
+import time
+from typing import Dict, Optional
+from mysql.connector import Error
+from mysql.connector.errors import InterfaceError, OperationalError
+
+# MAX_EXECUTION_TIME dépassé / requête interrompue par KILL QUERY
+QUERY_TIMEOUT_ERRNO = 3024
+QUERY_INTERRUPTED_ERRNO = 1317
+
+# Erreurs révélant une base indisponible ou saturée (les erreurs SQL applicatives n'en font pas partie)
+UNAVAILABLE_ERRNOS = {
+    QUERY_TIMEOUT_ERRNO, QUERY_INTERRUPTED_ERRNO,
+    1040,  # too many connections
+    1205,  # lock wait timeout
+    2003, 2006, 2013, 2055  # connexion impossible / perdue
+}
+
+SELECT_HINT_RE = re.compile(r'^(\s*)SELECT\b', re.IGNORECASE)
+
+class CircuitOpenError(Error):
+    """Le disjoncteur est ouvert : la base n'est pas sollicitée"""
+    pass
+
+def is_timeout_error(error: Error) -> bool:
+    return getattr(error, 'errno', None) in (QUERY_TIMEOUT_ERRNO, QUERY_INTERRUPTED_ERRNO)
+
+def is_unavailable_error(error: Error) -> bool:
+    """L'erreur doit compter comme un échec pour le disjoncteur"""
+    if isinstance(error, CircuitOpenError):
+        return False
+    if getattr(error, 'errno', None) in UNAVAILABLE_ERRNOS:
+        return True
+    return isinstance(error, (OperationalError, InterfaceError))
+
+def add_execution_time_hint(query: str, timeout_ms: int) -> str:
+    """Ajoute l'indice MAX_EXECUTION_TIME à un SELECT (sans effet sur les autres requêtes)"""
+    return SELECT_HINT_RE.sub(
+        lambda m: f"{m.group(1)}SELECT /*+ MAX_EXECUTION_TIME({int(timeout_ms)}) */", query, count=1
+    )
+
+class CircuitBreaker:
+    """Disjoncteur de la couche d'accès aux données
+
+    closed    : les requêtes passent ; échecs et requêtes trop lentes sont comptés
+    open      : échec immédiat (CircuitOpenError) pendant reset_timeout secondes
+    half_open : une seule requête d'essai ; son succès referme le circuit
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, slow_call_ms: float = 2000, reset_timeout: float = 10):
+        self.failure_threshold = failure_threshold
+        self.slow_call_ms = slow_call_ms
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+        self._trial_started = 0.0
+        self.rejected = 0
+        self.failures = 0
+        self.slow_calls = 0
+        self.timeouts = 0
+        self.successes = 0
+        self.times_opened = 0
+        self.last_failure = None
+
+    def allow(self):
+        """Lève CircuitOpenError si la base ne doit pas être sollicitée"""
+        with self._lock:
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                self._trial_in_flight = False
+            if self.state == self.CLOSED:
+                return
+            if self.state == self.HALF_OPEN and (
+                not self._trial_in_flight or time.monotonic() - self._trial_started >= self.reset_timeout
+            ):
+                # Requête d'essai (renouvelée si la précédente n'a jamais rendu de verdict)
+                self._trial_in_flight = True
+                self._trial_started = time.monotonic()
+                return
+            self.rejected += 1
+        raise CircuitOpenError(msg="Base de données indisponible (disjoncteur ouvert)")
+
+    def is_open(self) -> bool:
+        return self.state != self.CLOSED
+
+    def record_success(self, elapsed: float):
+        with self._lock:
+            if elapsed * 1000 >= self.slow_call_ms:
+                self.slow_calls += 1
+                self._failed(f"requête lente ({elapsed * 1000:.0f} ms)")
+                return
+            self.successes += 1
+            self._consecutive_failures = 0
+            if self.state != self.CLOSED:
+                print("✅ Disjoncteur base de données refermé")
+            self.state = self.CLOSED
+            self._trial_in_flight = False
+
+    def record_failure(self, error: Error):
+        with self._lock:
+            self.failures += 1
+            if is_timeout_error(error):
+                self.timeouts += 1
+            self._failed(str(error))
+
+    def _failed(self, reason: str):
+        self.last_failure = reason
+        self._consecutive_failures += 1
+        if self.state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+                print(f"⚠️  Disjoncteur base de données ouvert: {reason}")
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+            self._trial_in_flight = False
+
+    def reset(self):
+        """Referme le circuit manuellement"""
+        with self._lock:
+            self.state = self.CLOSED
+            self._consecutive_failures = 0
+            self._trial_in_flight = False
+
+    def stats(self) -> Dict:
+        with self._lock:
+            retry_in = None
+            if self.state == self.OPEN:
+                retry_in = round(max(0.0, self.reset_timeout - (time.monotonic() - self._opened_at)), 1)
+            return {
+                'state': self.state,
+                'consecutive_failures': self._consecutive_failures,
+                'failure_threshold': self.failure_threshold,
+                'slow_call_ms': self.slow_call_ms,
+                'reset_timeout_seconds': self.reset_timeout,
+                'retry_in_seconds': retry_in,
+                'successes': self.successes,
+                'failures': self.failures,
+                'slow_calls': self.slow_calls,
+                'timeouts': self.timeouts,
+                'rejected': self.rejected,
+                'times_opened': self.times_opened,
+                'last_failure': self.last_failure
+            }
+
+class QueryWatchdog:
+    """Interrompt par KILL QUERY les requêtes qui dépassent leur budget
+
+    Couvre ce que l'indice MAX_EXECUTION_TIME ne couvre pas (écritures,
+    SHOW...) ainsi que l'annulation explicite d'une requête en cours.
+    """
+
+    def __init__(self, kill):
+        self._kill = kill
+        self._heap = []
+        self._active = set()
+        self._killing = set()
+        self._killed = set()
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+        self.kills = 0
+
+    def watch(self, target: tuple, timeout_ms: float) -> int:
+        """Surveille une requête (target : arguments de kill) ; retourne un jeton à passer à done()"""
+        token = next(self._counter)
+        with self._cond:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='db-query-watchdog', daemon=True)
+                self._thread.start()
+            heapq.heappush(self._heap, (time.monotonic() + timeout_ms / 1000, token, target))
+            self._active.add(token)
+            self._cond.notify_all()
+        return token
+
+    def done(self, token: int) -> bool:
+        """Fin de la requête ; True si elle a été interrompue (connexion à ne pas réutiliser)
+
+        Attend la fin d'un KILL en cours : une fois done() retourné, le KILL ne
+        peut plus tomber sur la requête suivante de la même connexion.
+        """
+        with self._cond:
+            self._active.discard(token)
+            while token in self._killing:
+                self._cond.wait()
+            if token in self._killed:
+                self._killed.discard(token)
+                return True
+            return False
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                deadline, token, target = self._heap[0]
+                remaining = deadline - time.monotonic()
+                if remaining > 0:
+                    self._cond.wait(remaining)
+                    continue
+                heapq.heappop(self._heap)
+                if token not in self._active:
+                    continue
+                self._active.discard(token)
+                self._killing.add(token)
+                self.kills += 1
+            try:
+                self._kill(*target)
+            finally:
+                with self._cond:
+                    self._killing.discard(token)
+                    self._killed.add(token)
+                    self._cond.notify_all()
+
+    def stats(self) -> Dict:
+        with self._cond:
+            return {'watched': len(self._active), 'kills': self.kills}
@@ -0,0 +1,158 @@
+# backend/config/query_log.py
+import queue
+import re
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+# Normalisation des requêtes : même empreinte pour des requêtes qui ne diffèrent que par leurs valeurs
+COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+STRING_RE = re.compile(r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"")
+NUMBER_RE = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDER_RE = re.compile(r'%s|\?')
+IN_LIST_RE = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+VALUES_LIST_RE = re.compile(r'\bVALUES\s*\(.*\)', re.IGNORECASE | re.DOTALL)
+WHITESPACE_RE = re.compile(r'\s+')
+EXPLAINABLE_RE = re.compile(r'^\s*(\(\s*)?(SELECT|WITH|UPDATE|DELETE)\b', re.IGNORECASE)
+
+MAX_PARAM_LENGTH = 100
+
+def fingerprint(query: str) -> str:
+    """Empreinte normalisée d'une requête (valeurs, listes IN et espaces neutralisés)"""
+    text = COMMENT_RE.sub(' ', query)
+    text = STRING_RE.sub('?', text)
+    text = NUMBER_RE.sub('?', text)
+    text = PLACEHOLDER_RE.sub('?', text)
+    text = IN_LIST_RE.sub('IN (...)', text)
+    text = VALUES_LIST_RE.sub('VALUES (...)', text)
+    return WHITESPACE_RE.sub(' ', text).strip().lower()
+
+def _summarize_params(params) -> Optional[List[str]]:
+    if params is None:
+        return None
+    return [repr(value)[:MAX_PARAM_LENGTH] for value in params]
+
+class QueryLog:
+    """Journal des requêtes SQL : latence et lignes par empreinte, requêtes lentes avec leur plan
+
+    Les requêtes au-delà du seuil sont conservées dans un tampon circulaire
+    borné ; leur plan EXPLAIN FORMAT=JSON est capturé en tâche de fond (au plus
+    une fois par empreinte et par intervalle) pour ne pas ralentir la requête.
+    """
+
+    def __init__(self, explain, slow_threshold_ms: float = 200, capacity: int = 100,
+                 explain_interval: float = 60, max_fingerprints: int = 1000):
+        self._explain = explain
+        self.slow_threshold_ms = slow_threshold_ms
+        self.max_fingerprints = max_fingerprints
+        self.explain_interval = explain_interval
+        self._lock = threading.Lock()
+        self._slow = deque(maxlen=capacity)
+        self._stats = {}
+        self._plans = {}
+        self._explain_queue = queue.Queue(maxsize=capacity)
+        self._thread = None
+        self.dropped_fingerprints = 0
+
+    def record(self, query: str, params, elapsed: float, rows: Optional[int] = None,
+               endpoint: Optional[str] = None, backend: str = 'mysql'):
+        """Enregistre une exécution (elapsed en secondes ; rows = lignes lues ou affectées)"""
+        elapsed_ms = elapsed * 1000
+        key = fingerprint(query)
+        if rows is not None and rows < 0:
+            rows = None
+
+        with self._lock:
+            entry = self._stats.get(key)
+            if entry is None:
+                if len(self._stats) >= self.max_fingerprints:
+                    self.dropped_fingerprints += 1
+                    return
+                entry = self._stats[key] = {
+                    'fingerprint': key, 'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+                    'rows_total': 0, 'slow_calls': 0, 'backends': {}, 'endpoints': {}
+                }
+            entry['calls'] += 1
+            entry['total_ms'] += elapsed_ms
+            entry['max_ms'] = max(entry['max_ms'], elapsed_ms)
+            entry['rows_total'] += rows or 0
+            entry['backends'][backend] = entry['backends'].get(backend, 0) + 1
+            if endpoint:
+                entry['endpoints'][endpoint] = entry['endpoints'].get(endpoint, 0) + 1
+
+            if elapsed_ms < self.slow_threshold_ms:
+                return
+            entry['slow_calls'] += 1
+            self._slow.append({
+                'fingerprint': key,
+                'query': WHITESPACE_RE.sub(' ', query).strip(),
+                'params': _summarize_params(params),
+                'elapsed_ms': round(elapsed_ms, 3),
+                'rows': rows,
+                'endpoint': endpoint,
+                'backend': backend,
+                'at': time.time()
+            })
+            plan = self._plans.get(key)
+            needs_plan = backend == 'mysql' and EXPLAINABLE_RE.match(query) and (
+                plan is None or time.time() - plan['captured_at'] >= self.explain_interval
+            )
+            if needs_plan:
+                # Réserve l'empreinte pour éviter des EXPLAIN concurrents
+                self._plans[key] = dict(plan or {'plan': None}, captured_at=time.time())
+
+        if needs_plan:
+            self._schedule_explain(key, query, params)
+
+    def _schedule_explain(self, key: str, query: str, params):
+        if self._thread is None:
+            with self._lock:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='db-explain', daemon=True)
+                    self._thread.start()
+        try:
+            self._explain_queue.put_nowait((key, query, tuple(params) if params else None))
+        except queue.Full:
+            pass
+
+    def _run(self):
+        while True:
+            key, query, params = self._explain_queue.get()
+            plan = self._explain(query, params)
+            with self._lock:
+                self._plans[key] = {'plan': plan, 'captured_at': time.time()}
+
+    def reset(self):
+        with self._lock:
+            self._slow.clear()
+            self._stats.clear()
+            self._plans.clear()
+            self.dropped_fingerprints = 0
+
+    def report(self, limit: int = 50) -> Dict:
+        """Empreintes triées par temps cumulé et requêtes lentes récentes avec leur plan"""
+        with self._lock:
+            fingerprints = sorted(self._stats.values(), key=lambda e: e['total_ms'], reverse=True)[:limit]
+            slow = list(self._slow)[::-1][:limit]
+            plans = {key: plan['plan'] for key, plan in self._plans.items()}
+
+        return {
+            'slow_threshold_ms': self.slow_threshold_ms,
+            'buffer_capacity': self._slow.maxlen,
+            'dropped_fingerprints': self.dropped_fingerprints,
+            'fingerprints': [
+                dict(
+                    entry,
+                    total_ms=round(entry['total_ms'], 3),
+                    max_ms=round(entry['max_ms'], 3),
+                    avg_ms=round(entry['total_ms'] / entry['calls'], 3),
+                    avg_rows=round(entry['rows_total'] / entry['calls'], 1),
+                    backends=dict(entry['backends']),
+                    endpoints=dict(entry['endpoints']),
+                    plan=plans.get(entry['fingerprint'])
+                )
+                for entry in fingerprints
+            ],
+            'slow_queries': [dict(entry, plan=plans.get(entry['fingerprint'])) for entry in slow]
+        }
@@ -12,6 +12,38 @@ class Config:
     DB_USER = os.environ.get('DB_USER', 'root')
     DB_PASSWORD = os.environ.get('DB_PASSWORD', '')
     
+    # Pool de connexions
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_POOL_MAX_OVERFLOW = int(os.environ.get('DB_POOL_MAX_OVERFLOW', 5))
+    DB_POOL_TIMEOUT = float(os.environ.get('DB_POOL_TIMEOUT', 5))  # secondes
+    DB_POOL_PING_AFTER = float(os.environ.get('DB_POOL_PING_AFTER', 5))  # secondes d'inactivité
+    DB_ASYNC_POOL_MIN = int(os.environ.get('DB_ASYNC_POOL_MIN', 1))  # pool aiomysql (mode ASGI)
+    DB_ASYNC_POOL_SIZE = int(os.environ.get('DB_ASYNC_POOL_SIZE', 50))
+    DB_STMT_CACHE_SIZE = int(os.environ.get('DB_STMT_CACHE_SIZE', 64))  # requêtes préparées par connexion
+    DB_PREPARED_STATEMENTS = os.environ.get('DB_PREPARED_STATEMENTS', '1') != '0'
+    
+    # Répliques en lecture ("hote:port,hote:port")
+    DB_REPLICAS = os.environ.get('DB_REPLICAS', '')
+    DB_REPLICA_MAX_LAG = float(os.environ.get('DB_REPLICA_MAX_LAG', 5))  # secondes
+    DB_REPLICA_CHECK_INTERVAL = float(os.environ.get('DB_REPLICA_CHECK_INTERVAL', 2))  # secondes
+    DB_STICKY_SECONDS = float(os.environ.get('DB_STICKY_SECONDS', DB_REPLICA_MAX_LAG))
+    
+    # Budgets de temps et disjoncteur
+    DB_STATEMENT_TIMEOUT_MS = int(os.environ.get('DB_STATEMENT_TIMEOUT_MS', 5000))  # 0 = illimité
+    DB_BREAKER_FAILURES = int(os.environ.get('DB_BREAKER_FAILURES', 5))  # échecs consécutifs avant ouverture
+    DB_BREAKER_SLOW_MS = float(os.environ.get('DB_BREAKER_SLOW_MS', 2000))  # requête lente = échec
+    DB_BREAKER_RESET = float(os.environ.get('DB_BREAKER_RESET', 10))  # secondes avant requête d'essai
+    
+    # Journal des requêtes lentes
+    DB_SLOW_QUERY_MS = float(os.environ.get('DB_SLOW_QUERY_MS', 200))
+    DB_SLOW_QUERY_BUFFER = int(os.environ.get('DB_SLOW_QUERY_BUFFER', 100))  # requêtes lentes conservées
+    DB_EXPLAIN_INTERVAL = float(os.environ.get('DB_EXPLAIN_INTERVAL', 60))  # secondes entre deux EXPLAIN d'une empreinte
+    
+    # Copie locale SQLite de players/styles (vide = désactivée)
+    DB_EMBEDDED_PATH = os.environ.get('DB_EMBEDDED_PATH', '')
+    DB_EMBEDDED_REFRESH = float(os.environ.get('DB_EMBEDDED_REFRESH', 300))  # secondes (0 = lecture seule)
+    DB_EMBEDDED_MAX_AGE = float(os.environ.get('DB_EMBEDDED_MAX_AGE', 900))  # au-delà : retour à MySQL
+    
     # Sessions
     SESSION_COOKIE_SECURE = False
     SESSION_COOKIE_HTTPONLY = True
@@ -23,6 +55,17 @@ class Config:
     
     # Cache
     CACHE_DEFAULT_TTL = 300  # 5 minutes
+    CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 1000))
+    CACHE_MAX_BYTES = int(os.environ.get('CACHE_MAX_BYTES', 64 * 1024 * 1024))  # taille approximative
+    CACHE_BACKEND = os.environ.get('CACHE_BACKEND', '')  # '' (par processus), 'memory' ou 'redis'
+    CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    CACHE_L1_TTL = float(os.environ.get('CACHE_L1_TTL', 30))  # durée max en L1 avec un backend partagé
+    CACHE_SWEEP_INTERVAL = float(os.environ.get('CACHE_SWEEP_INTERVAL', 60))  # balayage des entrées expirées (0 = désactivé)
+    CACHE_WAIT_TIMEOUT = float(os.environ.get('CACHE_WAIT_TIMEOUT', 10))  # attente max d'un calcul en cours (single-flight)
+    CACHE_WARMUP = os.environ.get('CACHE_WARMUP', '1') == '1'  # préchauffage au démarrage
+    CACHE_WARMUP_CONCURRENCY = int(os.environ.get('CACHE_WARMUP_CONCURRENCY', 3))
+    CACHE_WARMUP_MAX_CONCURRENCY = int(os.environ.get('CACHE_WARMUP_MAX_CONCURRENCY', 8))  # plafond de ?concurrency=
+    PLAYER_SNAPSHOT = os.environ.get('PLAYER_SNAPSHOT', '1') == '1'  # snapshot NumPy des joueurs
     
     # Upload
     MAX_CONTENT_LENGTH = 16 * 1024 * 1024  # 16MB
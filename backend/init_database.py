@@ -7,6 +7,7 @@ Crée les tables nécessaires pour l'application
 import mysql.connector
 from mysql.connector import Error
 import os
+from migrate_data import bump_data_version, sync_player_positions
 
 # Configuration de la base de données
 DB_CONFIG = {
@@ -101,6 +102,33 @@ def create_tables():
         """)
         print("✅ Table 'players' créée")
         
+        # Postes élémentaires des joueurs ('MF,FW' -> MF et FW) : filtres par égalité indexée
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS player_positions (
+                player_id INT NOT NULL,
+                position VARCHAR(10) NOT NULL,
+                PRIMARY KEY (position, player_id),
+                FOREIGN KEY (player_id) REFERENCES players(player_id) ON DELETE CASCADE,
+                INDEX idx_player_id (player_id)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """)
+        print("✅ Table 'player_positions' créée")
+        
+        # Compteurs de version des données (ETag, snapshot) : incrémentés à chaque écriture
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS data_version (
+                name VARCHAR(32) PRIMARY KEY,
+                version BIGINT UNSIGNED NOT NULL DEFAULT 0,
+                updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
+            ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+        """)
+        cursor.execute("INSERT IGNORE INTO data_version (name) VALUES ('players'), ('styles')")
+        print("✅ Table 'data_version' créée")
+        
+        # Bases antérieures à player_positions : postes remplis depuis players.position (idempotent)
+        if sync_player_positions(cursor):
+            bump_data_version(cursor, 'players')
+        
         # Table des utilisateurs
         cursor.execute("""
             CREATE TABLE IF NOT EXISTS users (
@@ -175,7 +203,7 @@ def verify_tables():
         cursor.execute("SHOW TABLES")
         tables = [table[0] for table in cursor.fetchall()]
         
-        expected_tables = ['styles', 'players', 'users', 'favorites', 'comparisons']
+        expected_tables = ['styles', 'players', 'player_positions', 'data_version', 'users', 'favorites', 'comparisons']
         
         print("\n📊 TABLES CRÉÉES:")
         for table in expected_tables:
@@ -1,6 +1,6 @@
 from functools import wraps
 from flask import session, jsonify, request
-from typing import Optional, Callable
+from typing import Optional, Callable, List
 
 def require_auth(f: Callable) -> Callable:
     """Décorateur pour vérifier l'authentification"""
@@ -50,6 +50,7 @@ def migrate_styles():
         # Insérer les styles
         query = "INSERT INTO styles (name) VALUES (%s) ON DUPLICATE KEY UPDATE name = VALUES(name)"
         cursor.executemany(query, [(style,) for style in styles])
+        bump_data_version(cursor, 'styles')
         
         connection.commit()
         cursor.close()
@@ -62,6 +63,41 @@ def migrate_styles():
     finally:
         connection.close()
 
+def bump_data_version(cursor, name):
+    """Incrémente le compteur de version lu par l'application (ETag, snapshot des joueurs)"""
+    try:
+        cursor.execute(
+            "INSERT INTO data_version (name, version) VALUES (%s, 1) "
+            "ON DUPLICATE KEY UPDATE version = version + 1",
+            (name,)
+        )
+    except Error as e:
+        print(f"⚠️  Version des données non incrémentée ({name}): {e}")
+
+def position_tokens(position):
+    """'MF,FW' -> ['MF', 'FW'] (postes élémentaires, comme services/player_snapshot.py)"""
+    return [token.strip().upper() for token in (position or '').split(',') if token.strip()]
+
+def sync_player_positions(cursor):
+    """Met player_positions en accord avec players.position (ajouts puis suppressions ciblés)
+
+    Exécuté sur le curseur de l'import, avant son commit : joueurs et postes
+    sont validés dans la même transaction. Retourne True si des postes ont changé.
+    """
+    cursor.execute("SELECT player_id, position FROM players")
+    expected = {(player_id, token) for player_id, position in cursor.fetchall() for token in position_tokens(position)}
+    cursor.execute("SELECT player_id, position FROM player_positions")
+    existing = set(cursor.fetchall())
+    added = sorted(expected - existing)
+    removed = sorted(existing - expected)
+    
+    if added:
+        cursor.executemany("INSERT IGNORE INTO player_positions (player_id, position) VALUES (%s, %s)", added)
+    if removed:
+        cursor.executemany("DELETE FROM player_positions WHERE player_id = %s AND position = %s", removed)
+    print(f"✅ Postes synchronisés ({len(added)} ajoutés, {len(removed)} supprimés)")
+    return bool(added or removed)
+
 def get_style_id(style_name, connection):
     """Récupère l'ID d'un style par son nom"""
     if not style_name:
@@ -188,6 +224,10 @@ def migrate_players():
             total_inserted += len(batch)
             print(f"📈 {total_inserted}/{len(players_data)} joueurs migrés...")
         
+        # Postes puis version dans une seule transaction : une version plus récente n'est jamais associée à des postes périmés
+        sync_player_positions(cursor)
+        bump_data_version(cursor, 'players')
+        connection.commit()
         cursor.close()
         print(f"✅ Migration terminée: {total_inserted} joueurs migrés avec succès")
         return True
@@ -60,6 +60,11 @@ def add_indexes():
             "CREATE INDEX IF NOT EXISTS idx_players_goals ON players(goals)",
             "CREATE INDEX IF NOT EXISTS idx_players_assists ON players(assists)",
             "CREATE INDEX IF NOT EXISTS idx_players_xg ON players(xG)",
+            "CREATE INDEX IF NOT EXISTS idx_players_xag ON players(xAG)",
+            "CREATE INDEX IF NOT EXISTS idx_players_tackles ON players(tackles)",
+            "CREATE INDEX IF NOT EXISTS idx_players_progressive_passes ON players(progressive_passes)",
+            "CREATE INDEX IF NOT EXISTS idx_players_carries ON players(carries)",
+            "CREATE INDEX IF NOT EXISTS idx_players_key_passes ON players(key_passes)",
             
             # Index sur le style pour le filtrage
             "CREATE INDEX IF NOT EXISTS idx_players_style ON players(id_style)",
@@ -95,7 +100,7 @@ def analyze_tables():
     try:
         cursor = connection.cursor()
         
-        tables = ['players', 'styles', 'users', 'favorites', 'comparisons']
+        tables = ['players', 'styles', 'player_positions', 'users', 'favorites', 'comparisons']
         
         print("📊 Analyse des tables...")
         
@@ -0,0 +1,110 @@
+from flask import Blueprint, jsonify, request
+from config.database import db
+from config.settings import Config
+from middleware.auth import require_admin
+from services.cache_warmer import warmer
+from services.player_snapshot import player_snapshot
+
+admin_bp = Blueprint('admin', __name__)
+
+@admin_bp.route('/db/pool', methods=['GET'])
+@require_admin
+def get_pool_stats():
+    """Métriques du pool de connexions MySQL"""
+    return jsonify({
+        "pool": db.pool_stats(),
+        "hold_time_by_endpoint": db.hold_stats()
+    }), 200
+
+
+@admin_bp.route('/db/replicas', methods=['GET'])
+@require_admin
+def get_replication_stats():
+    """État des répliques en lecture et du routage lecture / écriture"""
+    return jsonify(db.replication_stats()), 200
+
+
+@admin_bp.route('/db/queries', methods=['GET'])
+@require_admin
+def get_query_report():
+    """Requêtes SQL regroupées par empreinte et requêtes lentes avec leur plan EXPLAIN"""
+    limit = request.args.get('limit', 50, type=int)
+    return jsonify(db.query_report(limit)), 200
+
+
+@admin_bp.route('/db/queries/reset', methods=['POST'])
+@require_admin
+def reset_query_report():
+    """Remet à zéro le journal des requêtes"""
+    db.query_log.reset()
+    return jsonify({"message": "Journal des requêtes réinitialisé"}), 200
+
+
+@admin_bp.route('/db/breaker', methods=['GET'])
+@require_admin
+def get_breaker_stats():
+    """État du disjoncteur base de données et des budgets de temps par requête"""
+    return jsonify(db.breaker_stats()), 200
+
+
+@admin_bp.route('/db/breaker/reset', methods=['POST'])
+@require_admin
+def reset_breaker():
+    """Referme manuellement le disjoncteur"""
+    db.breaker.reset()
+    return jsonify(db.breaker_stats()), 200
+
+
+@admin_bp.route('/db/embedded', methods=['GET'])
+@require_admin
+def get_embedded_stats():
+    """État de la copie locale des tables players/styles"""
+    return jsonify(db.embedded_stats()), 200
+
+
+@admin_bp.route('/db/embedded/refresh', methods=['POST'])
+@require_admin
+def refresh_embedded_store():
+    """Reconstruit immédiatement la copie locale depuis MySQL"""
+    if not db.embedded.enabled:
+        return jsonify({"error": "Copie locale désactivée (DB_EMBEDDED_PATH)"}), 400
+    if not db.embedded.refresh(db):
+        return jsonify({"error": "Échec du rafraîchissement", "details": db.embedded.last_error}), 500
+    return jsonify(db.embedded_stats()), 200
+
+
+@admin_bp.route('/cache/warm', methods=['GET'])
+@require_admin
+def get_cache_warmup():
+    """Progression du dernier préchauffage du cache"""
+    return jsonify(warmer.status()), 200
+
+
+@admin_bp.route('/cache/warm', methods=['POST'])
+@require_admin
+def start_cache_warmup():
+    """Relance le préchauffage du cache en arrière-plan (?concurrency=N, plafonné par CACHE_WARMUP_MAX_CONCURRENCY)"""
+    concurrency = request.args.get('concurrency', type=int)
+    if concurrency is not None and not 1 <= concurrency <= Config.CACHE_WARMUP_MAX_CONCURRENCY:
+        return jsonify({
+            "error": f"concurrency doit être compris entre 1 et {Config.CACHE_WARMUP_MAX_CONCURRENCY}"
+        }), 400
+    if not warmer.start(concurrency):
+        return jsonify({"message": "Préchauffage déjà en cours", "progress": warmer.status()}), 409
+    return jsonify({"message": "Préchauffage lancé", "progress": warmer.status()}), 202
+
+
+@admin_bp.route('/players/snapshot', methods=['GET'])
+@require_admin
+def get_player_snapshot_stats():
+    """État du snapshot en mémoire des joueurs (lignes, version, requêtes servies / renvoyées à MySQL)"""
+    return jsonify(player_snapshot.stats()), 200
+
+
+@admin_bp.route('/players/snapshot/rebuild', methods=['POST'])
+@require_admin
+def rebuild_player_snapshot():
+    """Met à jour immédiatement le snapshot des joueurs (?full=1 pour un rechargement complet)"""
+    if not player_snapshot.rebuild(full=request.args.get('full') == '1'):
+        return jsonify({"error": "Rechargement du snapshot impossible", "snapshot": player_snapshot.stats()}), 503
+    return jsonify({"message": "Snapshot rechargé", "snapshot": player_snapshot.stats()}), 200
@@ -1,5 +1,9 @@
 from flask import Blueprint, jsonify, request, session
-from config.database import db
+from config.database import db, query_budget
+from config.query_guard import CircuitOpenError
+from services.cache_service import cache
+from services.data_version import data_validators
+from utils.http_cache import add_validators, is_not_modified, not_modified_response
 import mysql.connector
 from datetime import datetime, timedelta
 
@@ -11,35 +15,15 @@ def require_auth():
         return jsonify({"error": "Authentification requise"}), 401
     return None
 
-@analytics_bp.route('/dashboard/stats', methods=['GET'])
-def get_dashboard_stats():
-    """Récupère les statistiques pour le dashboard"""
-    auth_error = require_auth()
-    if auth_error:
-        return auth_error
-    
-    try:
-        connection = db.connect()
-        if not connection:
-            return jsonify({"error": "Erreur de connexion à la base de données"}), 500
-        
-        cursor = connection.cursor(dictionary=True)
-        
-        # Statistiques générales
-        stats = {}
-        
+@cache.cached(ttl=300, tags=['players', 'styles'], stale_ttl=600)
+def fetch_dashboard_aggregates():
+    """Agrégats globaux du dashboard (communs à tous les utilisateurs)"""
+    stats = {}
+    with db.cursor(dictionary=True, readonly=True) as cursor:
         # Nombre total de joueurs
         cursor.execute("SELECT COUNT(*) as total FROM players")
         stats['totalPlayers'] = cursor.fetchone()['total']
         
-        # Nombre de favoris de l'utilisateur
-        cursor.execute("SELECT COUNT(*) as total FROM favorites WHERE user_id = %s", (session['user_id'],))
-        stats['userFavorites'] = cursor.fetchone()['total']
-        
-        # Nombre de comparaisons de l'utilisateur
-        cursor.execute("SELECT COUNT(*) as total FROM comparisons WHERE user_id = %s", (session['user_id'],))
-        stats['userComparisons'] = cursor.fetchone()['total']
-        
         # Valeur moyenne du marché
         cursor.execute("SELECT AVG(market_value) as avg_value FROM players WHERE market_value > 0")
         result = cursor.fetchone()
@@ -75,12 +59,44 @@ def get_dashboard_stats():
             LIMIT 10
         """)
         stats['topValuePlayers'] = cursor.fetchall()
-        
-        cursor.close()
-        connection.close()
-        
-        return jsonify(stats), 200
-        
+    
+    return stats
+
+@analytics_bp.route('/dashboard/stats', methods=['GET'])
+@query_budget(2000)
+def get_dashboard_stats():
+    """Récupère les statistiques pour le dashboard"""
+    auth_error = require_auth()
+    if auth_error:
+        return auth_error
+    
+    try:
+        user_stats = {}
+        with db.cursor(dictionary=True, readonly=True) as cursor:
+            # Nombre de favoris de l'utilisateur
+            cursor.execute("SELECT COUNT(*) as total FROM favorites WHERE user_id = %s", (session['user_id'],))
+            user_stats['userFavorites'] = cursor.fetchone()['total']
+            
+            # Nombre de comparaisons de l'utilisateur
+            cursor.execute("SELECT COUNT(*) as total FROM comparisons WHERE user_id = %s", (session['user_id'],))
+            user_stats['userComparisons'] = cursor.fetchone()['total']
+        
+        # Réponse propre à l'utilisateur : ses compteurs entrent dans l'ETag, pas de Last-Modified
+        etag, _ = data_validators('dashboard/stats', user_stats)
+        if etag and is_not_modified(etag):
+            return not_modified_response(etag, private=True)
+        
+        # Agrégats globaux en cache (un seul calcul à l'expiration, même sous forte charge)
+        stats = dict(fetch_dashboard_aggregates())
+        stats.update(user_stats)
+        
+        response = jsonify(stats)
+        if etag:
+            add_validators(response, etag, private=True)
+        return response, 200
+        
+    except CircuitOpenError:
+        raise
     except Exception as e:
         print(f"❌ Erreur get_dashboard_stats: {e}")
         return jsonify({"error": "Erreur lors de la récupération des statistiques"}), 500
@@ -88,26 +104,23 @@ def get_dashboard_stats():
 @analytics_bp.route('/player/<int:player_id>/performance', methods=['GET'])
 def get_player_performance(player_id):
     """Récupère les données de performance d'un joueur"""
+    etag, last_modified = data_validators('player/performance', player_id)
+    if etag and is_not_modified(etag, last_modified):
+        return not_modified_response(etag, last_modified)
+    
     try:
-        connection = db.connect()
-        if not connection:
-            return jsonify({"error": "Erreur de connexion à la base de données"}), 500
-        
-        cursor = connection.cursor(dictionary=True)
-        
-        # Récupérer les données du joueur
-        cursor.execute("""
-            SELECT p.*, s.name as style_name
-            FROM players p
-            LEFT JOIN styles s ON p.id_style = s.id_style
-            WHERE p.player_id = %s
-        """, (player_id,))
-        
-        player_data = cursor.fetchone()
+        with db.cursor(dictionary=True, readonly=True) as cursor:
+            # Récupérer les données du joueur
+            cursor.execute("""
+                SELECT p.*, s.name as style_name
+                FROM players p
+                LEFT JOIN styles s ON p.id_style = s.id_style
+                WHERE p.player_id = %s
+            """, (player_id,))
+            
+            player_data = cursor.fetchone()
         
         if not player_data:
-            cursor.close()
-            connection.close()
             return jsonify({"error": "Joueur non trouvé"}), 404
         
         # Générer des données de performance historiques simulées
@@ -130,13 +143,13 @@ def get_player_performance(player_id):
                 'tackles': round((player_data['tackles'] or 0) * (i + 1) / 12, 1)
             })
         
-        cursor.close()
-        connection.close()
-        
-        return jsonify({
+        response = jsonify({
             'player': player_data,
             'performance': performance_data
-        }), 200
+        })
+        if etag:
+            add_validators(response, etag, last_modified)
+        return response, 200
         
     except Exception as e:
         print(f"❌ Erreur get_player_performance: {e}")
@@ -1,9 +1,12 @@
 from flask import Blueprint, request, jsonify, session
 from services.chatbot_service import chatbot_service
+from config.database import query_budget
 import traceback
 
 chatbot_bp = Blueprint('chatbot', __name__)
 
+HELP_RESPONSE = "🤖 **Je suis votre assistant ScoutAI !**\n\nJe peux vous aider à :\n• Rechercher des joueurs selon vos critères\n• Analyser les profils et statistiques\n• Recommander des talents\n\n💡 **Exemples de questions :**\n• \"Je cherche un attaquant rapide de moins de 25 ans\"\n• \"Trouve-moi un milieu créatif avec de bonnes passes\"\n• \"Quel défenseur pour moins de 20M€ ?\""
+
 def require_auth():
     """Middleware pour vérifier l'authentification"""
     if 'user_id' not in session or not session.get('authenticated'):
@@ -11,6 +14,7 @@ def require_auth():
     return None
 
 @chatbot_bp.route('/chat', methods=['POST'])
+@query_budget(3000)
 def chat():
     """Endpoint principal du chatbot"""
     try:
@@ -32,7 +36,7 @@ def chat():
         
         if intent == 'help':
             return jsonify({
-                "response": "🤖 **Je suis votre assistant ScoutAI !**\n\nJe peux vous aider à :\n• Rechercher des joueurs selon vos critères\n• Analyser les profils et statistiques\n• Recommander des talents\n\n💡 **Exemples de questions :**\n• \"Je cherche un attaquant rapide de moins de 25 ans\"\n• \"Trouve-moi un milieu créatif avec de bonnes passes\"\n• \"Quel défenseur pour moins de 20M€ ?\"",
+                "response": HELP_RESPONSE,
                 "suggestions": chatbot_service.get_conversation_starters(),
                 "intent": intent
             }), 200
@@ -33,20 +33,14 @@ class AuthService:
             print(f"📝 Exécution de la requête: {query}")
             print(f"📊 Paramètres: {email}, {first_name}, {last_name}, {role}")
             
-            success = db.execute_query(query, (email, first_name, last_name, role, password_hash), fetch=False)
-            print(f"✅ Résultat de l'insertion: {success}")
-            
-            if success:
-                # Récupérer l'ID de l'utilisateur créé
-                result = db.execute_query("SELECT LAST_INSERT_ID() as user_id")
-                print(f"🔍 Résultat LAST_INSERT_ID: {result}")
-                
-                if result and len(result) > 0:
-                    user_id = result[0]['user_id']
-                    print(f"✅ Utilisateur créé avec ID: {user_id}")
-                    return user_id
-                else:
-                    print("❌ Impossible de récupérer l'ID de l'utilisateur")
+            # Le pool peut servir une autre connexion à la requête suivante :
+            # LAST_INSERT_ID() doit être lu sur la connexion de l'INSERT
+            user_id = db.execute_insert(query, (email, first_name, last_name, role, password_hash))
+            print(f"✅ Résultat de l'insertion: {user_id}")
+            
+            if user_id:
+                print(f"✅ Utilisateur créé avec ID: {user_id}")
+                return user_id
             else:
                 print("❌ Échec de l'insertion")
             
@@ -0,0 +1,164 @@
+# backend/services/bitmap_index.py
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+
+# Nombre de bits à 1 pour chaque octet (cardinalité d'un bitmap dense)
+POPCOUNT = np.array([bin(value).count('1') for value in range(256)], dtype=np.int64)
+
+class Bitmap:
+    """Ensemble de numéros de ligne compressé
+
+    Conteneur choisi selon la densité, comme dans les bitmaps « roaring » :
+    tableau trié de uint32 quand l'ensemble est clairsemé (moins d'une ligne
+    sur 32), bits empaquetés sinon. La cardinalité est toujours connue, donc
+    le nombre de résultats d'une intersection est gratuit.
+    """
+
+    # ndarray & Bitmap : numpy laisse la main à Bitmap.__rand__
+    __array_ufunc__ = None
+
+    def __init__(self, rows: np.ndarray, size: int):
+        self.size = size
+        self.cardinality = len(rows)
+        if self.cardinality * 32 < size:
+            self._rows = np.asarray(rows, dtype=np.uint32)
+            self._bits = None
+        else:
+            mask = np.zeros(size, dtype=bool)
+            mask[rows] = True
+            self._rows = None
+            self._bits = np.packbits(mask)
+
+    @classmethod
+    def from_mask(cls, mask: np.ndarray) -> 'Bitmap':
+        return cls(np.flatnonzero(mask), len(mask))
+
+    @classmethod
+    def _from_bits(cls, bits: np.ndarray, size: int) -> 'Bitmap':
+        cardinality = int(POPCOUNT[bits].sum())
+        if cardinality * 32 < size:
+            return cls(np.flatnonzero(np.unpackbits(bits, count=size)), size)
+        bitmap = cls.__new__(cls)
+        bitmap.size = size
+        bitmap.cardinality = cardinality
+        bitmap._rows = None
+        bitmap._bits = bits
+        return bitmap
+
+    @classmethod
+    def full(cls, size: int) -> 'Bitmap':
+        return cls(np.arange(size), size)
+
+    def rows(self) -> np.ndarray:
+        """Numéros de ligne, triés"""
+        if self._rows is not None:
+            return self._rows.astype(np.int64)
+        return np.flatnonzero(np.unpackbits(self._bits, count=self.size))
+
+    def to_mask(self) -> np.ndarray:
+        if self._bits is not None:
+            return np.unpackbits(self._bits, count=self.size).astype(bool)
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self._rows] = True
+        return mask
+
+    def contains(self, rows: np.ndarray) -> np.ndarray:
+        """Appartenance de chaque ligne de rows (tableau booléen)"""
+        if self._rows is not None:
+            return np.isin(rows, self._rows, assume_unique=True)
+        rows = np.asarray(rows, dtype=np.int64)
+        return ((self._bits[rows >> 3] >> (7 - (rows & 7))) & 1).astype(bool)
+
+    def __len__(self) -> int:
+        return self.cardinality
+
+    def __and__(self, other):
+        if isinstance(other, np.ndarray):
+            # Masque issu d'un filtre numérique : on sort du monde des bitmaps
+            return self.to_mask() & other
+        if self._bits is not None and other._bits is not None:
+            return Bitmap._from_bits(np.bitwise_and(self._bits, other._bits), self.size)
+        # Au moins un côté clairsemé : tester ses lignes dans l'autre
+        small, large = (self, other) if self.cardinality <= other.cardinality else (other, self)
+        rows = small.rows()
+        return Bitmap(rows[large.contains(rows)], self.size)
+
+    __rand__ = __and__
+
+    def __or__(self, other: 'Bitmap') -> 'Bitmap':
+        # Bitmaps immuables : un côté vide laisse l'autre tel quel (ni tri ni copie)
+        if not other.cardinality:
+            return self
+        if not self.cardinality:
+            return other
+        if self._bits is not None or other._bits is not None:
+            # Au moins un côté dense : OU bit à bit plutôt qu'un tri de toutes ses lignes
+            return Bitmap._from_bits(np.bitwise_or(self._packed(), other._packed()), self.size)
+        return Bitmap(np.union1d(self.rows(), other.rows()), self.size)
+
+    def _packed(self) -> np.ndarray:
+        if self._bits is not None:
+            return self._bits
+        return np.packbits(self.to_mask())
+
+    @property
+    def nbytes(self) -> int:
+        return (self._rows if self._rows is not None else self._bits).nbytes
+
+class BitmapIndex:
+    """Index secondaire : un bitmap par valeur distincte d'une colonne catégorielle"""
+
+    def __init__(self, bitmaps: Dict[str, Bitmap], size: int):
+        self.bitmaps = bitmaps
+        self.size = size
+
+    @classmethod
+    def build(cls, codes: np.ndarray, categories: List[str]) -> 'BitmapIndex':
+        """Construit tous les bitmaps en un tri des codes (au lieu d'un parcours par valeur)"""
+        size = len(codes)
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(categories) + 1))
+        bitmaps = {}
+        for code, value in enumerate(categories):
+            rows = order[bounds[code]:bounds[code + 1]]
+            if len(rows):
+                bitmaps[value] = Bitmap(rows, size)
+        return cls(bitmaps, size)
+
+    def updated(self, codes: np.ndarray, categories: List[str], changed: Iterable[str]) -> 'BitmapIndex':
+        """Nouvel index où seules les valeurs modifiées sont recalculées (les autres bitmaps sont partagés)"""
+        size = len(codes)
+        codes_by_value = {value: code for code, value in enumerate(categories)}
+        bitmaps = {}
+        for value, bitmap in self.bitmaps.items():
+            if bitmap.size == size:
+                bitmaps[value] = bitmap
+            else:
+                # Lignes ajoutées : les bitmaps existants s'étendent (lignes nouvelles à 0)
+                bitmaps[value] = Bitmap(bitmap.rows(), size)
+        for value in changed:
+            rows = np.flatnonzero(codes == codes_by_value[value])
+            if len(rows):
+                bitmaps[value] = Bitmap(rows, size)
+            else:
+                bitmaps.pop(value, None)
+        return BitmapIndex(bitmaps, size)
+
+    def get(self, value: str) -> Bitmap:
+        return self.bitmaps.get(value) or Bitmap(np.zeros(0, dtype=np.int64), self.size)
+
+    def union(self, values: Iterable[str]) -> Bitmap:
+        result: Optional[Bitmap] = None
+        for value in values:
+            bitmap = self.bitmaps.get(value)
+            if bitmap is not None:
+                result = bitmap if result is None else result | bitmap
+        return result if result is not None else Bitmap(np.zeros(0, dtype=np.int64), self.size)
+
+    def stats(self) -> Dict:
+        return {
+            'keys': len(self.bitmaps),
+            'bytes': sum(bitmap.nbytes for bitmap in self.bitmaps.values()),
+            'sparse': sum(1 for bitmap in self.bitmaps.values() if bitmap._rows is not None),
+            'dense': sum(1 for bitmap in self.bitmaps.values() if bitmap._bits is not None)
+        }
@@ -0,0 +1,267 @@
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, Iterable, Optional
+
+try:
+    import redis
+except ImportError:  # dépendance optionnelle : uniquement pour CACHE_BACKEND=redis
+    redis = None
+
+def _escape_glob(text: str) -> str:
+    """Échappe les caractères spéciaux des motifs SCAN MATCH"""
+    return ''.join('\\' + char if char in '*?[]\\' else char for char in text)
+
+class CacheBackend(ABC):
+    """Interface d'un cache partagé (L2) entre les workers
+
+    Les valeurs sont des octets déjà sérialisés par CacheService. Les
+    versions d'étiquettes et la diffusion des invalidations (publish /
+    subscribe) vivent aussi dans le backend pour être communes à tous les
+    processus.
+    """
+
+    name = 'abstract'
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        pass
+
+    @abstractmethod
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        pass
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        pass
+
+    @abstractmethod
+    def delete_prefix(self, prefix: str) -> None:
+        pass
+
+    @abstractmethod
+    def clear(self) -> None:
+        pass
+
+    @abstractmethod
+    def get_tag_versions(self, tags: Iterable[str]) -> Optional[Dict[str, int]]:
+        """Versions courantes des étiquettes (None si le backend est injoignable)"""
+
+    @abstractmethod
+    def bump_tags(self, tags: Iterable[str]) -> Optional[Dict[str, int]]:
+        """Incrémente les étiquettes ; retourne les nouvelles versions (None en cas d'échec)"""
+
+    @abstractmethod
+    def publish(self, message: Dict) -> None:
+        pass
+
+    @abstractmethod
+    def subscribe(self, callback: Callable[[Dict], None]) -> None:
+        """Appelle callback(message) pour chaque message publié, y compris par ce processus"""
+
+    def stats(self) -> Dict:
+        return {'backend': self.name}
+
+class InMemoryBackend(CacheBackend):
+    """Stand-in local du backend Redis : même sémantique, dans le processus
+
+    Plusieurs CacheService partageant une instance se comportent comme des
+    workers partageant un Redis (utile en développement et pour les tests).
+    """
+
+    name = 'memory'
+
+    def __init__(self):
+        self._values = {}
+        self._tags = {}
+        self._subscribers = []
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if time.time() > expires_at:
+                del self._values[key]
+                return None
+            return value
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock:
+            self._values[key] = (value, time.time() + ttl)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._values.pop(key, None)
+
+    def delete_prefix(self, prefix: str) -> None:
+        with self._lock:
+            for key in [key for key in self._values if key.startswith(prefix)]:
+                del self._values[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values.clear()
+
+    def get_tag_versions(self, tags: Iterable[str]) -> Optional[Dict[str, int]]:
+        with self._lock:
+            return {tag: self._tags.get(tag, 0) for tag in tags}
+
+    def bump_tags(self, tags: Iterable[str]) -> Optional[Dict[str, int]]:
+        tags = list(tags)
+        with self._lock:
+            for tag in tags:
+                self._tags[tag] = self._tags.get(tag, 0) + 1
+            return {tag: self._tags[tag] for tag in tags}
+
+    def publish(self, message: Dict) -> None:
+        # Même aller-retour JSON que Redis pour garder la même sémantique
+        payload = json.loads(json.dumps(message))
+        for callback in list(self._subscribers):
+            callback(payload)
+
+    def subscribe(self, callback: Callable[[Dict], None]) -> None:
+        self._subscribers.append(callback)
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {'backend': self.name, 'keys': len(self._values), 'tags': len(self._tags)}
+
+class RedisBackend(CacheBackend):
+    """Backend partagé parlant le protocole Redis (Redis, Valkey, KeyDB...)
+
+    Toutes les clés sont préfixées ; les invalidations sont diffusées sur un
+    canal pub/sub. Une panne du serveur dégrade en cache L1 seul au lieu de
+    faire échouer les requêtes.
+    """
+
+    name = 'redis'
+
+    def __init__(self, url: str, prefix: str = 'scoutai:cache:', socket_timeout: float = 0.5):
+        if redis is None:
+            raise RuntimeError("Le cache partagé nécessite redis: pip install redis")
+        self.url = url
+        self.prefix = prefix
+        self.channel = f"{prefix}invalidations"
+        self._client = redis.Redis.from_url(url, socket_timeout=socket_timeout, socket_connect_timeout=socket_timeout)
+        self._thread = None
+        self.errors = 0
+
+    def _key(self, key: str) -> str:
+        return f"{self.prefix}v:{key}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}tag:{tag}"
+
+    def _failed(self, operation: str, error: Exception):
+        self.errors += 1
+        print(f"⚠️  Cache Redis indisponible ({operation}): {error}")
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self._client.get(self._key(key))
+        except redis.RedisError as e:
+            self._failed('get', e)
+            return None
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        try:
+            self._client.set(self._key(key), value, px=max(1, int(ttl * 1000)))
+        except redis.RedisError as e:
+            self._failed('set', e)
+
+    def delete(self, key: str) -> None:
+        try:
+            self._client.delete(self._key(key))
+        except redis.RedisError as e:
+            self._failed('delete', e)
+
+    def delete_prefix(self, prefix: str) -> None:
+        self._unlink_matching(f"{self._key(_escape_glob(prefix))}*", 'delete_prefix')
+
+    def clear(self) -> None:
+        """Supprime les valeurs (pas les versions d'étiquettes, qui doivent rester monotones)"""
+        self._unlink_matching(f"{self.prefix}v:*", 'clear')
+
+    def _unlink_matching(self, pattern: str, operation: str) -> None:
+        try:
+            batch = []
+            for key in self._client.scan_iter(match=pattern, count=500):
+                batch.append(key)
+                if len(batch) >= 500:
+                    self._client.unlink(*batch)
+                    batch = []
+            if batch:
+                self._client.unlink(*batch)
+        except redis.RedisError as e:
+            self._failed(operation, e)
+
+    def get_tag_versions(self, tags: Iterable[str]) -> Optional[Dict[str, int]]:
+        tags = list(tags)
+        if not tags:
+            return {}
+        try:
+            values = self._client.mget([self._tag_key(tag) for tag in tags])
+        except redis.RedisError as e:
+            self._failed('mget', e)
+            return None
+        return {tag: int(value) if value else 0 for tag, value in zip(tags, values)}
+
+    def bump_tags(self, tags: Iterable[str]) -> Optional[Dict[str, int]]:
+        tags = list(tags)
+        try:
+            pipe = self._client.pipeline(transaction=False)
+            for tag in tags:
+                pipe.incr(self._tag_key(tag))
+            return dict(zip(tags, pipe.execute()))
+        except redis.RedisError as e:
+            self._failed('incr', e)
+            return None
+
+    def publish(self, message: Dict) -> None:
+        try:
+            self._client.publish(self.channel, json.dumps(message))
+        except redis.RedisError as e:
+            self._failed('publish', e)
+
+    def subscribe(self, callback: Callable[[Dict], None]) -> None:
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._listen, args=(callback,), name='cache-invalidations', daemon=True
+        )
+        self._thread.start()
+
+    def _listen(self, callback: Callable[[Dict], None]):
+        """Écoute le canal d'invalidation ; se réabonne après une coupure"""
+        # Connexion dédiée sans délai de lecture : le canal peut rester muet longtemps
+        client = redis.Redis.from_url(self.url, health_check_interval=30)
+        while True:
+            try:
+                pubsub = client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self.channel)
+                # Des invalidations ont pu être manquées pendant la coupure
+                callback({'type': 'resync'})
+                for message in pubsub.listen():
+                    if message.get('type') == 'message':
+                        callback(json.loads(message['data']))
+            except (redis.RedisError, ValueError) as e:
+                self._failed('subscribe', e)
+                time.sleep(1)
+
+    def stats(self) -> Dict:
+        return {'backend': self.name, 'url': self.url, 'prefix': self.prefix, 'errors': self.errors}
+
+def create_backend(name: str, url: str = '') -> Optional[CacheBackend]:
+    """Backend désigné par CACHE_BACKEND ('' = cache par processus uniquement), url = CACHE_REDIS_URL"""
+    name = (name or '').strip().lower()
+    if name in ('', 'none', 'local'):
+        return None
+    if name == 'memory':
+        return InMemoryBackend()
+    if name == 'redis':
+        return RedisBackend(url)
+    raise ValueError(f"Backend de cache inconnu: {name}")
@@ -1,71 +1,731 @@
+import base64
+import gzip
+import hashlib
+import heapq
 import json
+import sys
+import threading
 import time
-from typing import Any, Optional
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Optional, Union
 from functools import wraps
+from config.settings import Config
+from services.cache_backends import CacheBackend, create_backend
+
+def estimate_size(value: Any, _depth: int = 0) -> int:
+    """Taille approximative en octets d'une valeur (listes/dicts de joueurs, chaînes...)"""
+    size = sys.getsizeof(value)
+    if _depth >= 4:
+        return size
+    if isinstance(value, dict):
+        size += sum(estimate_size(k, _depth + 1) + estimate_size(v, _depth + 1) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, _depth + 1) for item in value)
+    return size
+
+def _json_default(value: Any):
+    """Représentation stable des valeurs non JSON (dates, décimaux, ensembles, objets)"""
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return sorted(value, key=repr)
+    if hasattr(value, '__float__'):
+        return str(value)
+    # Instances de service (self) : seule la classe compte, jamais l'adresse mémoire
+    return f"<{type(value).__module__}.{type(value).__qualname__}>"
+
+def make_key(namespace: str, *parts: Any) -> str:
+    """Clé de cache déterministe, identique d'un processus à l'autre (contrairement à hash())"""
+    canonical = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=_json_default)
+    return f"{namespace}:{hashlib.sha1(canonical.encode('utf-8')).hexdigest()}"
+
+# Corps plus petits : la compression ne vaut pas son coût
+GZIP_MIN_SIZE = 1024
+
+class EncodedBody:
+    """Corps de réponse déjà encodé (et compressé) : un succès de cache n'est plus qu'une copie d'octets"""
+
+    def __init__(self, body: bytes, content_type: str = 'application/json', compress: bool = True,
+                 count: Optional[int] = None, total: Optional[int] = None, next_cursor: Optional[str] = None):
+        self.body = body
+        self.content_type = content_type
+        self.etag = hashlib.sha1(body).hexdigest()[:32]
+        # mtime=0 : même contenu, mêmes octets compressés
+        self.gzipped = gzip.compress(body, 6, mtime=0) if compress and len(body) >= GZIP_MIN_SIZE else None
+        self.count = count
+        self.total = total  # nombre total de résultats avant LIMIT, si connu
+        self.next_cursor = next_cursor  # curseur de la page suivante (pagination par clé)
+
+    @classmethod
+    def from_json(cls, value: Any, compress: bool = True, total: Optional[int] = None,
+                  next_cursor: Optional[str] = None) -> 'EncodedBody':
+        body = json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+        return cls(body, compress=compress, count=len(value) if isinstance(value, list) else None,
+                   total=total, next_cursor=next_cursor)
+
+    def __sizeof__(self) -> int:
+        # Pris en compte par estimate_size (sys.getsizeof) pour la limite en octets du cache
+        return object.__sizeof__(self) + len(self.body) + len(self.gzipped or b'')
+
+    @classmethod
+    def restore(cls, body: bytes, gzipped: Optional[bytes], content_type: str, count: Optional[int],
+                total: Optional[int], next_cursor: Optional[str]) -> 'EncodedBody':
+        """Corps relu du L2 : ni ré-encodage ni recompression"""
+        encoded = cls.__new__(cls)
+        encoded.body = body
+        encoded.content_type = content_type
+        encoded.etag = hashlib.sha1(body).hexdigest()[:32]
+        encoded.gzipped = gzipped
+        encoded.count = count
+        encoded.total = total
+        encoded.next_cursor = next_cursor
+        return encoded
+
+# Sérialisation du L2 en JSON (jamais pickle : le contenu d'un Redis partagé
+# ne doit pas pouvoir exécuter de code) ; types non JSON étiquetés par TYPE_FIELD
+TYPE_FIELD = '$t'
+
+def _b64(data: Optional[bytes]) -> Optional[str]:
+    return base64.b64encode(data).decode('ascii') if data is not None else None
+
+def _unb64(text: Optional[str]) -> Optional[bytes]:
+    return base64.b64decode(text) if text is not None else None
+
+def encode_value(value: Any) -> Any:
+    """Valeur de cache -> structure JSON ; TypeError pour un type non pris en charge"""
+    if value is None or isinstance(value, (str, bool, int, float)):
+        return value
+    if isinstance(value, list):
+        return [encode_value(item) for item in value]
+    if isinstance(value, dict):
+        if TYPE_FIELD not in value and all(isinstance(key, str) for key in value):
+            return {key: encode_value(item) for key, item in value.items()}
+        return {TYPE_FIELD: 'dict', 'v': [[encode_value(key), encode_value(item)] for key, item in value.items()]}
+    if isinstance(value, tuple):
+        return {TYPE_FIELD: 'tuple', 'v': [encode_value(item) for item in value]}
+    if isinstance(value, datetime):
+        return {TYPE_FIELD: 'datetime', 'v': value.isoformat()}
+    if isinstance(value, date):
+        return {TYPE_FIELD: 'date', 'v': value.isoformat()}
+    if isinstance(value, Decimal):
+        return {TYPE_FIELD: 'decimal', 'v': str(value)}
+    if isinstance(value, bytes):
+        return {TYPE_FIELD: 'bytes', 'v': _b64(value)}
+    if isinstance(value, EncodedBody):
+        return {TYPE_FIELD: 'body', 'v': {
+            'body': _b64(value.body), 'gzipped': _b64(value.gzipped), 'content_type': value.content_type,
+            'count': value.count, 'total': value.total, 'next_cursor': value.next_cursor
+        }}
+    raise TypeError(f"type non sérialisable dans le cache partagé: {type(value).__name__}")
+
+def decode_value(value: Any) -> Any:
+    """Inverse de encode_value"""
+    if isinstance(value, list):
+        return [decode_value(item) for item in value]
+    if not isinstance(value, dict):
+        return value
+    kind = value.get(TYPE_FIELD)
+    if kind is None:
+        return {key: decode_value(item) for key, item in value.items()}
+    data = value['v']
+    if kind == 'dict':
+        return {decode_value(key): decode_value(item) for key, item in data}
+    if kind == 'tuple':
+        return tuple(decode_value(item) for item in data)
+    if kind == 'datetime':
+        return datetime.fromisoformat(data)
+    if kind == 'date':
+        return date.fromisoformat(data)
+    if kind == 'decimal':
+        return Decimal(data)
+    if kind == 'bytes':
+        return _unb64(data)
+    if kind == 'body':
+        return EncodedBody.restore(_unb64(data['body']), _unb64(data['gzipped']), data['content_type'],
+                                   data['count'], data['total'], data['next_cursor'])
+    raise ValueError(f"type de cache inconnu: {kind}")
+
+# Tranches de la distribution d'âge des entrées (secondes)
+AGE_BUCKETS = ((10, '<10s'), (60, '<1min'), (300, '<5min'), (900, '<15min'), (3600, '<1h'))
+
+def namespace_of(key: str) -> str:
+    """Espace de noms d'une clé produite par make_key (module.fonction)"""
+    return key.rsplit(':', 1)[0] if ':' in key else key
+
+def _age_bucket(age: float) -> str:
+    for limit, label in AGE_BUCKETS:
+        if age < limit:
+            return label
+    return '>=1h'
+
+# Compteurs tenus pour chaque fonction décorée par cached()
+FUNCTION_COUNTERS = ('hits', 'misses', 'coalesced', 'stale', 'wait_timeouts', 'errors')
+
+class _Flight:
+    """Calcul en cours pour une clé : les appelants concurrents attendent son résultat"""
 
-class CacheService:
-    """Service de cache en mémoire pour améliorer les performances"""
-    
     def __init__(self):
-        self._cache = {}
-        self._timestamps = {}
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+class CacheService:
+    """Service de cache en mémoire pour améliorer les performances
+
+    Cache LRU borné en nombre d'entrées et en taille approximative.
+    Chaque lecture, écriture et appel à stats() retire d'abord toutes les
+    entrées expirées via un tas d'expiration (pas seulement la clé relue) ;
+    une écriture ne compte donc jamais des entrées périmées contre les
+    limites. start_sweeper() ajoute un balayage périodique pour libérer la
+    mémoire d'un processus inactif.
+
+    Les entrées peuvent être étiquetées par les données dont elles dépendent
+    (players, styles, favorites:<user_id>...) : invalider une étiquette
+    supprime toutes les entrées correspondantes.
+
+    Avec un backend partagé (Redis), ce cache devient un petit L1 par
+    processus devant un L2 commun à tous les workers : les versions
+    d'étiquettes vivent dans le L2 et les invalidations / vidages sont
+    diffusés à tous les workers.
+    """
+
+    def __init__(self, max_entries: int = 1000, max_bytes: int = 64 * 1024 * 1024,
+                 backend: Optional[CacheBackend] = None, l1_ttl: Optional[float] = None,
+                 wait_timeout: float = 10):
+        self._cache = OrderedDict()  # clé -> valeur, ordre LRU (plus récent en fin)
+        self._timestamps = {}  # clé -> date d'expiration
+        self._sizes = {}  # clé -> taille estimée
+        self._created = {}  # clé -> date de stockage (distribution d'âge)
+        self._expiry_heap = []  # (date d'expiration, clé) ; entrées périmées ignorées
+        self._entry_tags = {}  # clé -> {étiquette: version au moment du calcul}
+        self._tag_keys = {}  # étiquette -> clés qui en dépendent
+        self._tag_versions = {}  # étiquette -> version courante (miroir du L2 s'il existe)
         self._default_ttl = 300  # 5 minutes par défaut
-    
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.backend = backend
+        self.l1_ttl = l1_ttl  # durée max d'une entrée en L1 (filet si une invalidation est perdue)
+        self._subscribed = False
+        self.wait_timeout = wait_timeout
+        self._flights = {}  # clé -> _Flight en cours
+        self._functions = {}  # fonction décorée -> compteurs
+        self._namespace_evictions = {}  # espace de noms -> évictions LRU
+        self._totals = {'coalesced': 0, 'stale': 0, 'wait_timeouts': 0}
+        self._bytes = 0
+        self._lock = threading.RLock()
+        self._sweeper = None
+        self.hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+        self.expirations = 0
+        self.rejected = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
     def get(self, key: str) -> Optional[Any]:
-        """Récupère une valeur du cache"""
-        if key not in self._cache:
+        """Récupère une valeur du cache (L1 puis L2)"""
+        found, value = self._l1_get(key)
+        if found:
+            with self._lock:
+                self.hits += 1
+            return value
+
+        if self.backend is not None:
+            value = self._l2_get(key)
+            if value is not None:
+                with self._lock:
+                    self.l2_hits += 1
+                return value
+
+        with self._lock:
+            self.misses += 1
+        return None
+
+    def _l1_get(self, key: str):
+        with self._lock:
+            self._purge_expired()
+            if key not in self._cache:
+                return False, None
+
+            # Vérifier l'expiration
+            if self._is_expired(key):
+                self._remove(key)
+                self.expirations += 1
+                return False, None
+
+            if not self._tags_current(self._entry_tags.get(key)):
+                self._remove(key)
+                return False, None
+
+            self._cache.move_to_end(key)
+            return True, self._cache[key]
+
+    def _l2_get(self, key: str) -> Optional[Any]:
+        self._ensure_subscribed()
+        raw = self.backend.get(key)
+        if raw is None:
             return None
-        
-        # Vérifier l'expiration
-        if self._is_expired(key):
-            self.delete(key)
+        try:
+            payload = json.loads(raw)
+            value, tags, expires_at = decode_value(payload['v']), payload['t'], payload['e']
+        except Exception as e:
+            print(f"⚠️  Entrée de cache illisible ({key}): {e}")
             return None
-        
-        return self._cache[key]
-    
-    def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
-        """Stocke une valeur dans le cache"""
-        self._cache[key] = value
-        self._timestamps[key] = time.time() + (ttl or self._default_ttl)
-    
+
+        remaining = expires_at - time.time()
+        if remaining <= 0:
+            return None
+        if tags and self.tag_versions(tags) != tags:
+            return None
+        self._l1_set(key, value, remaining, tags)
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[int] = None,
+            tags: Union[Iterable[str], Dict[str, int], None] = None) -> None:
+        """Stocke une valeur dans le cache
+
+        tags : étiquettes dont dépend la valeur, ou l'instantané tag_versions()
+        pris avant de la calculer (une invalidation survenue entre-temps
+        empêche alors de stocker une valeur déjà périmée).
+        """
+        ttl = ttl or self._default_ttl
+        if tags is not None and not isinstance(tags, dict):
+            tags = self.tag_versions(tags)
+        with self._lock:
+            if tags and not self._tags_current(tags):
+                return
+        self._l1_set(key, value, ttl, tags)
+
+        if self.backend is not None:
+            self._ensure_subscribed()
+            try:
+                payload = json.dumps({'v': encode_value(value), 't': tags or None, 'e': time.time() + ttl},
+                                     separators=(',', ':')).encode('utf-8')
+            except (TypeError, ValueError) as e:
+                # Valeur gardée en L1 seulement
+                print(f"⚠️  Entrée non partagée ({key}): {e}")
+                return
+            self.backend.set(key, payload, ttl)
+
+    def _l1_set(self, key: str, value: Any, ttl: float, tags: Optional[Dict[str, int]]) -> None:
+        if self.l1_ttl:
+            ttl = min(ttl, self.l1_ttl)
+        size = estimate_size(value)
+        with self._lock:
+            self._purge_expired()
+            self._remove(key)
+            if size > self.max_bytes:
+                # Une valeur plus grosse que tout le cache n'est pas conservée
+                self.rejected += 1
+                return
+            if tags and not self._tags_current(tags):
+                return
+
+            expires_at = time.time() + ttl
+            self._cache[key] = value
+            self._timestamps[key] = expires_at
+            self._sizes[key] = size
+            self._created[key] = time.time()
+            self._bytes += size
+            heapq.heappush(self._expiry_heap, (expires_at, key))
+            if tags:
+                self._entry_tags[key] = tags
+                for tag in tags:
+                    self._tag_keys.setdefault(tag, set()).add(key)
+            self._evict()
+
+    def tag_versions(self, tags: Iterable[str]) -> Dict[str, int]:
+        """Instantané des versions des étiquettes (lues dans le L2 s'il existe)"""
+        tags = list(tags)
+        shared = self.backend.get_tag_versions(tags) if self.backend is not None else None
+        with self._lock:
+            if shared:
+                for tag, version in shared.items():
+                    if version > self._tag_versions.get(tag, 0):
+                        self._tag_versions[tag] = version
+            return {tag: self._tag_versions.get(tag, 0) for tag in tags}
+
+    def _tags_current(self, tags: Optional[Dict[str, int]]) -> bool:
+        if not tags:
+            return True
+        return all(self._tag_versions.get(tag, 0) == version for tag, version in tags.items())
+
+    def invalidate_tags(self, tags: Iterable[str], broadcast: bool = True) -> int:
+        """Invalide les étiquettes (dans tous les workers) ; retourne le nombre d'entrées L1 supprimées"""
+        tags = list(tags)
+        versions = self.backend.bump_tags(tags) if self.backend is not None else None
+        if versions is None:
+            with self._lock:
+                versions = {tag: self._tag_versions.get(tag, 0) + 1 for tag in tags}
+        removed = self._apply_tag_versions(versions)
+        if self.backend is not None and broadcast:
+            self.backend.publish({'type': 'tags', 'versions': versions})
+        return removed
+
+    def _apply_tag_versions(self, versions: Dict[str, int]) -> int:
+        removed = 0
+        with self._lock:
+            for tag, version in versions.items():
+                if version > self._tag_versions.get(tag, 0):
+                    self._tag_versions[tag] = version
+                for key in list(self._tag_keys.get(tag, ())):
+                    self._remove(key)
+                    removed += 1
+        return removed
+
+    def invalidate_tag_prefix(self, prefix: str, broadcast: bool = True) -> int:
+        """Invalide toutes les étiquettes commençant par prefix (ex. 'favorites:')"""
+        with self._lock:
+            tags = [tag for tag in self._tag_keys if tag.startswith(prefix)]
+        removed = self.invalidate_tags(tags, broadcast=False) if tags else 0
+        if self.backend is not None and broadcast:
+            # Chaque worker invalide les étiquettes qu'il connaît
+            self.backend.publish({'type': 'tag_prefix', 'prefix': prefix})
+        return removed
+
     def delete(self, key: str) -> None:
-        """Supprime une valeur du cache"""
-        self._cache.pop(key, None)
-        self._timestamps.pop(key, None)
-    
+        """Supprime une valeur du cache (dans tous les workers)"""
+        with self._lock:
+            self._remove(key)
+        if self.backend is not None:
+            self.backend.delete(key)
+            self.backend.publish({'type': 'keys', 'keys': [key]})
+
     def clear(self) -> None:
-        """Vide tout le cache"""
-        self._cache.clear()
-        self._timestamps.clear()
-    
+        """Vide tout le cache (dans tous les workers)"""
+        self._l1_clear()
+        if self.backend is not None:
+            self.backend.clear()
+            self.backend.publish({'type': 'clear'})
+
+    def invalidate_prefix(self, prefix: str, broadcast: bool = True) -> int:
+        """Supprime les entrées dont la clé commence par prefix (ex. 'app.fetch_filtered_players')"""
+        if not prefix:
+            raise ValueError("Préfixe de clé vide : utiliser clear()")
+        with self._lock:
+            keys = [key for key in self._cache if key.startswith(prefix)]
+            for key in keys:
+                self._remove(key)
+        if self.backend is not None and broadcast:
+            self.backend.delete_prefix(prefix)
+            self.backend.publish({'type': 'key_prefix', 'prefix': prefix})
+        return len(keys)
+
+    def _l1_clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            self._timestamps.clear()
+            self._sizes.clear()
+            self._created.clear()
+            self._expiry_heap.clear()
+            self._entry_tags.clear()
+            self._tag_keys.clear()
+            self._bytes = 0
+
+    def _ensure_subscribed(self) -> None:
+        """Abonnement paresseux (après un éventuel fork des workers)"""
+        if not self._subscribed:
+            with self._lock:
+                if not self._subscribed:
+                    self.backend.subscribe(self._on_message)
+                    self._subscribed = True
+
+    def _on_message(self, message: Dict) -> None:
+        """Invalidation diffusée par un autre worker (ou par celui-ci)"""
+        kind = message.get('type')
+        if kind in ('clear', 'resync'):
+            self._l1_clear()
+        elif kind == 'keys':
+            with self._lock:
+                for key in message.get('keys', []):
+                    self._remove(key)
+        elif kind == 'tags':
+            self._apply_tag_versions({tag: int(v) for tag, v in message.get('versions', {}).items()})
+        elif kind == 'key_prefix':
+            self.invalidate_prefix(message.get('prefix', ''), broadcast=False)
+        elif kind == 'tag_prefix':
+            self.invalidate_tag_prefix(message.get('prefix', ''), broadcast=False)
+
+    def _remove(self, key: str) -> None:
+        if key in self._cache:
+            del self._cache[key]
+            self._timestamps.pop(key, None)
+            self._created.pop(key, None)
+            self._bytes -= self._sizes.pop(key, 0)
+            for tag in self._entry_tags.pop(key, ()):
+                keys = self._tag_keys.get(tag)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._tag_keys[tag]
+
+    def _evict(self) -> None:
+        """Retire les entrées les moins récemment utilisées au-delà des limites"""
+        while self._cache and (len(self._cache) > self.max_entries or self._bytes > self.max_bytes):
+            key = next(iter(self._cache))
+            namespace = namespace_of(key)
+            self._namespace_evictions[namespace] = self._namespace_evictions.get(namespace, 0) + 1
+            self.evicted_bytes += self._sizes.get(key, 0)
+            self._remove(key)
+            self.evictions += 1
+
+    def purge_expired(self) -> int:
+        """Retire toutes les entrées expirées du L1 ; retourne leur nombre"""
+        with self._lock:
+            before = self.expirations
+            self._purge_expired()
+            return self.expirations - before
+
+    def start_sweeper(self, interval: float) -> None:
+        """Balaie les entrées expirées toutes les `interval` secondes (0 = désactivé)"""
+        if interval <= 0 or self._sweeper is not None:
+            return
+
+        def run():
+            while True:
+                time.sleep(interval)
+                self.purge_expired()
+
+        self._sweeper = threading.Thread(target=run, name='cache-sweeper', daemon=True)
+        self._sweeper.start()
+
+    def _purge_expired(self) -> None:
+        """Retire les entrées expirées en tête du tas d'expiration (appelé sous self._lock
+        par get, set, stats, namespace_stats et le balayage périodique)"""
+        now = time.time()
+        heap = self._expiry_heap
+        while heap and heap[0][0] <= now:
+            expires_at, key = heapq.heappop(heap)
+            # L'entrée du tas est périmée si la clé a été supprimée ou réécrite depuis
+            if self._timestamps.get(key) == expires_at:
+                self._remove(key)
+                self.expirations += 1
+        # Le tas garde les traces des clés réécrites : on le reconstruit s'il grossit trop
+        if len(heap) > 2 * len(self._cache) + 64:
+            self._expiry_heap = [(expires_at, key) for key, expires_at in self._timestamps.items()]
+            heapq.heapify(self._expiry_heap)
+
     def _is_expired(self, key: str) -> bool:
         """Vérifie si une clé a expiré"""
         if key not in self._timestamps:
             return True
         return time.time() > self._timestamps[key]
-    
-    def cached(self, ttl: Optional[int] = None):
-        """Décorateur pour mettre en cache les résultats de fonction"""
+
+    def namespace_stats(self) -> Dict[str, Dict]:
+        """Par espace de noms : entrées, mémoire, évictions, âge des entrées et compteurs d'appels"""
+        functions = self.function_stats()
+        now = time.time()
+        with self._lock:
+            self._purge_expired()
+            namespaces = {}
+
+            def entry_for(namespace):
+                if namespace not in namespaces:
+                    namespaces[namespace] = {
+                        'entries': 0, 'bytes': 0, 'oldest_seconds': 0.0,
+                        'age_distribution': dict.fromkeys([label for _, label in AGE_BUCKETS] + ['>=1h'], 0)
+                    }
+                return namespaces[namespace]
+
+            for key in self._cache:
+                entry = entry_for(namespace_of(key))
+                age = now - self._created.get(key, now)
+                entry['entries'] += 1
+                entry['bytes'] += self._sizes.get(key, 0)
+                entry['oldest_seconds'] = round(max(entry['oldest_seconds'], age), 1)
+                entry['age_distribution'][_age_bucket(age)] += 1
+            # Fonctions sans entrée en cache : compteurs d'appels et évictions quand même
+            for namespace in set(self._namespace_evictions) | set(functions):
+                entry_for(namespace)
+            for namespace, entry in namespaces.items():
+                entry['evictions'] = self._namespace_evictions.get(namespace, 0)
+                entry['calls'] = functions.get(namespace)
+            return namespaces
+
+    def stats(self) -> dict:
+        """Compteurs pour dimensionner le cache"""
+        with self._lock:
+            self._purge_expired()
+            lookups = self.hits + self.l2_hits + self.misses
+            return {
+                'entries': len(self._cache),
+                'max_entries': self.max_entries,
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'l2_hits': self.l2_hits,
+                'misses': self.misses,
+                'hit_ratio': round((self.hits + self.l2_hits) / lookups, 3) if lookups else None,
+                'evictions': self.evictions,
+                'evicted_bytes': self.evicted_bytes,
+                'expirations': self.expirations,
+                'rejected': self.rejected,
+                'tags': len(self._tag_keys),
+                'coalesced': self._totals['coalesced'],
+                'stale_served': self._totals['stale'],
+                'wait_timeouts': self._totals['wait_timeouts'],
+                'refreshes': self.refreshes,
+                'refresh_errors': self.refresh_errors,
+                'in_flight': len(self._flights),
+                'l1_ttl': self.l1_ttl,
+                'shared': self.backend.stats() if self.backend is not None else None
+            }
+
+    def cached(self, ttl: Optional[int] = None, tags=None, stale_ttl: Optional[int] = None,
+               wait_timeout: Optional[float] = None):
+        """Décorateur pour mettre en cache les résultats de fonction
+
+        tags : liste d'étiquettes, ou fonction (mêmes arguments) qui la retourne
+        stale_ttl : après expiration, la valeur reste servie pendant stale_ttl
+            secondes tandis qu'un rafraîchissement tourne en arrière-plan
+        wait_timeout : attente maximale du calcul lancé par un autre appelant
+            (au-delà, l'appelant calcule lui-même)
+
+        Un seul appelant par clé et par processus calcule la valeur manquante ;
+        les appelants concurrents attendent son résultat.
+        """
         def decorator(func):
+            namespace = f"{func.__module__}.{func.__qualname__}"
+            ttl_value = ttl or self._default_ttl
+            timeout = self.wait_timeout if wait_timeout is None else wait_timeout
+
+            def compute(cache_key, args, kwargs):
+                # Versions des étiquettes relevées avant le calcul
+                entry_tags = tags(*args, **kwargs) if callable(tags) else tags
+                versions = self.tag_versions(entry_tags) if entry_tags else None
+
+                result = func(*args, **kwargs)
+                if result is not None:
+                    stored = (result, time.time() + ttl_value) if stale_ttl else result
+                    self.set(cache_key, stored, ttl_value + (stale_ttl or 0), tags=versions)
+                return result
+
             @wraps(func)
             def wrapper(*args, **kwargs):
-                # Créer une clé unique basée sur la fonction et ses arguments
-                cache_key = f"{func.__name__}:{hash(str(args) + str(sorted(kwargs.items())))}"
-                
+                # Clé stable basée sur la fonction et ses arguments normalisés
+                cache_key = make_key(namespace, args, kwargs)
+
                 # Essayer de récupérer du cache
                 cached_result = self.get(cache_key)
                 if cached_result is not None:
-                    print(f"🚀 Cache hit pour {func.__name__}")
-                    return cached_result
-                
-                # Exécuter la fonction et mettre en cache
-                result = func(*args, **kwargs)
-                self.set(cache_key, result, ttl)
-                print(f"💾 Cache miss pour {func.__name__} - résultat mis en cache")
-                
-                return result
+                    if not stale_ttl:
+                        self._count(namespace, 'hits')
+                        return cached_result
+                    result, fresh_until = cached_result
+                    if time.time() < fresh_until:
+                        self._count(namespace, 'hits')
+                        return result
+                    # Valeur expirée : servie telle quelle, rafraîchie en arrière-plan
+                    self._count(namespace, 'stale')
+                    self._refresh_async(cache_key, lambda: compute(cache_key, args, kwargs))
+                    return result
+
+                self._count(namespace, 'misses')
+                return self._single_flight(
+                    namespace, cache_key, lambda: compute(cache_key, args, kwargs), timeout
+                )
             return wrapper
         return decorator
 
-# Instance globale
-cache = CacheService()
\ No newline at end of file
+    def cached_json(self, ttl: Optional[int] = None, tags=None, stale_ttl: Optional[int] = None,
+                    compress: bool = True):
+        """Comme cached(), mais conserve le corps JSON déjà encodé (EncodedBody)
+
+        La fonction retourne une valeur JSON ou directement un EncodedBody.
+        """
+        def decorator(func):
+            @wraps(func)
+            def encode(*args, **kwargs):
+                result = func(*args, **kwargs)
+                if result is None or isinstance(result, EncodedBody):
+                    return result
+                return EncodedBody.from_json(result, compress)
+            return self.cached(ttl=ttl, tags=tags, stale_ttl=stale_ttl)(encode)
+        return decorator
+
+    def _single_flight(self, namespace: str, key: str, compute, timeout: float):
+        """Exécute compute() une seule fois pour tous les appelants concurrents d'une clé"""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            if flight.event.wait(timeout):
+                self._count(namespace, 'coalesced')
+                if flight.error is not None:
+                    raise flight.error
+                return flight.result
+            # Calcul trop long : on n'attend pas davantage
+            self._count(namespace, 'wait_timeouts')
+            return compute()
+
+        try:
+            flight.result = compute()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            self._count(namespace, 'errors')
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.event.set()
+
+    def _refresh_async(self, key: str, compute) -> None:
+        """Rafraîchit une valeur périmée en arrière-plan (un seul rafraîchissement par clé)"""
+        with self._lock:
+            if key in self._flights:
+                return
+            flight = self._flights[key] = _Flight()
+
+        def run():
+            try:
+                flight.result = compute()
+                self.refreshes += 1
+            except Exception as e:
+                flight.error = e
+                self.refresh_errors += 1
+                print(f"⚠️  Échec du rafraîchissement du cache ({key}): {e}")
+            finally:
+                with self._lock:
+                    self._flights.pop(key, None)
+                flight.event.set()
+
+        threading.Thread(target=run, name='cache-refresh', daemon=True).start()
+
+    def _count(self, namespace: str, counter: str) -> None:
+        with self._lock:
+            counters = self._functions.get(namespace)
+            if counters is None:
+                counters = self._functions[namespace] = dict.fromkeys(FUNCTION_COUNTERS, 0)
+            counters[counter] += 1
+            if counter in self._totals:
+                self._totals[counter] += 1
+
+    def function_stats(self) -> Dict[str, Dict]:
+        """Compteurs par fonction décorée (hits, misses, coalesced, stale...)"""
+        with self._lock:
+            result = {}
+            for namespace, counters in self._functions.items():
+                calls = counters['hits'] + counters['stale'] + counters['misses']
+                served = counters['hits'] + counters['stale'] + counters['coalesced']
+                result[namespace] = dict(
+                    counters, hit_ratio=round(served / calls, 3) if calls else None
+                )
+            return result
+
+# Instance globale : CACHE_BACKEND=redis pour un L2 partagé entre les workers
+_backend = create_backend(Config.CACHE_BACKEND, Config.CACHE_REDIS_URL)
+cache = CacheService(
+    max_entries=Config.CACHE_MAX_ENTRIES,
+    max_bytes=Config.CACHE_MAX_BYTES,
+    backend=_backend,
+    l1_ttl=Config.CACHE_L1_TTL if _backend else None,
+    wait_timeout=Config.CACHE_WAIT_TIMEOUT
+)
\ No newline at end of file
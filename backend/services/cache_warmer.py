@@ -0,0 +1,96 @@
+# backend/services/cache_warmer.py
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional, Tuple
+from config.settings import Config
+
+class CacheWarmer:
+    """Préchauffage du cache : exécute les lectures les plus fréquentes avant les utilisateurs
+
+    Les tâches (libellé, fonction décorée par cache.cached) sont enregistrées
+    par l'application ; un passage les exécute avec une concurrence bornée
+    pour ne pas accaparer le pool de connexions, et publie sa progression.
+    """
+
+    def __init__(self, max_workers: int = 3):
+        self.max_workers = max_workers
+        self._tasks: List[Tuple[str, Callable[[], object]]] = []
+        self._lock = threading.Lock()
+        self._thread = None
+        self._progress = {'state': 'idle', 'total': 0, 'done': 0, 'failed': 0, 'runs': 0}
+
+    def register(self, label: str, task: Callable[[], object]) -> None:
+        """Ajoute une tâche de préchauffage"""
+        self._tasks.append((label, task))
+
+    def start(self, max_workers: Optional[int] = None) -> bool:
+        """Lance un passage en arrière-plan ; False si un passage est déjà en cours"""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return False
+            self._thread = threading.Thread(
+                target=self.run, args=(max_workers,), name='cache-warmup', daemon=True
+            )
+            self._thread.start()
+            return True
+
+    def run(self, max_workers: Optional[int] = None) -> Dict:
+        """Exécute toutes les tâches (bloquant) et retourne la progression finale"""
+        tasks = list(self._tasks)
+        workers = max(1, min(max_workers or self.max_workers, len(tasks) or 1))
+        with self._lock:
+            self._progress = {
+                'state': 'running', 'total': len(tasks), 'done': 0, 'failed': 0,
+                'runs': self._progress['runs'] + 1, 'max_workers': workers,
+                'started_at': time.time(), 'finished_at': None, 'elapsed_ms': None,
+                'tasks': {label: 'pending' for label, _ in tasks}, 'errors': {}
+            }
+        print(f"🔥 Préchauffage du cache: {len(tasks)} tâches ({workers} en parallèle)")
+
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='cache-warmup') as executor:
+            futures = {executor.submit(self._run_task, task): label for label, task in tasks}
+            for future in as_completed(futures):
+                label = futures[future]
+                error, elapsed_ms = future.result()
+                with self._lock:
+                    self._progress['done'] += 1
+                    if error is None:
+                        self._progress['tasks'][label] = f"ok ({elapsed_ms} ms)"
+                    else:
+                        self._progress['failed'] += 1
+                        self._progress['tasks'][label] = 'failed'
+                        self._progress['errors'][label] = error
+                    done, total = self._progress['done'], self._progress['total']
+                if error is not None:
+                    print(f"⚠️  Préchauffage {label} échoué: {error}")
+                print(f"🔥 Préchauffage du cache: {done}/{total} ({label})")
+
+        with self._lock:
+            self._progress['state'] = 'finished'
+            self._progress['finished_at'] = time.time()
+            self._progress['elapsed_ms'] = round((time.time() - self._progress['started_at']) * 1000, 1)
+            failed = self._progress['failed']
+        print(f"✅ Cache préchauffé ({len(tasks) - failed}/{len(tasks)} tâches)")
+        return self.status()
+
+    @staticmethod
+    def _run_task(task: Callable[[], object]) -> Tuple[Optional[str], float]:
+        start = time.monotonic()
+        try:
+            task()
+            return None, round((time.monotonic() - start) * 1000, 1)
+        except Exception as e:
+            return str(e), round((time.monotonic() - start) * 1000, 1)
+
+    def status(self) -> Dict:
+        with self._lock:
+            progress = dict(self._progress)
+            for key in ('tasks', 'errors'):
+                if key in progress:
+                    progress[key] = dict(progress[key])
+            progress['registered'] = [label for label, _ in self._tasks]
+            return progress
+
+# Instance globale
+warmer = CacheWarmer(max_workers=Config.CACHE_WARMUP_CONCURRENCY)
@@ -0,0 +1,72 @@
+# backend/services/catalog.py
+from typing import Dict, Iterable, List, Optional, Tuple
+from config.database import db
+from services.cache_service import cache
+from services.player_snapshot import fold, like_regex
+
+@cache.cached(ttl=3600, tags=['styles'])
+def fetch_style_catalog() -> Optional[Dict[str, int]]:
+    """Catalogue des styles {nom: id_style} : relu uniquement quand la table styles change"""
+    rows = db.execute_query("SELECT id_style, name FROM styles")
+    if rows is None:
+        return None
+    return {row['name']: int(row['id_style']) for row in rows}
+
+@cache.cached(ttl=3600, tags=['players'])
+def fetch_position_tokens() -> Optional[List[str]]:
+    """Postes élémentaires présents dans player_positions (FW, MF, DF, GK...)
+
+    None si la table est absente ou encore vide (migration pas encore
+    passée) : rien n'est mis en cache et les filtres retombent sur LIKE.
+    """
+    rows = db.execute_query("SELECT DISTINCT position FROM player_positions")
+    if not rows:
+        return None
+    return sorted(row['position'] for row in rows)
+
+def style_patterns(style: str) -> List[str]:
+    """Motifs du filtre de style : '%x y%', '%x%y%' (espaces libres) et '%xy%' (sans espaces)"""
+    return [f"%{style}%", f"%{style.replace(' ', '%')}%", f"%{style.replace(' ', '')}%"]
+
+def matching_style_ids(style: str) -> List[int]:
+    """id_style des styles dont le nom correspond au filtre (évalué sur le catalogue, pas par ligne)"""
+    regexes = [like_regex(pattern) for pattern in style_patterns(style)]
+    catalog = fetch_style_catalog() or {}
+    return sorted(
+        style_id for name, style_id in catalog.items()
+        if any(regex.fullmatch(fold(name.strip())) for regex in regexes)
+    )
+
+def style_id(name: str) -> Optional[int]:
+    """id_style d'un nom exact (casse, accents et espaces finaux ignorés, comme la collation)"""
+    expected = fold(name).rstrip()
+    for candidate, candidate_id in (fetch_style_catalog() or {}).items():
+        if fold(candidate).rstrip() == expected:
+            return candidate_id
+    return None
+
+def tokens_containing(position: str, tokens: Iterable[str]) -> List[str]:
+    """Postes élémentaires contenant le texte demandé ('MF' -> MF ; 'F' -> FW, DF, MF)"""
+    position = position.strip().upper()
+    return sorted(token for token in tokens if position in token)
+
+def in_clause(values: List) -> str:
+    """'IN (%s, %s...)' pour une liste non vide ; condition toujours fausse sinon"""
+    if not values:
+        return "IN (NULL)"
+    return "IN (" + ", ".join(['%s'] * len(values)) + ")"
+
+def style_filter(style: str) -> Tuple[str, list]:
+    """Filtre de style SQL : égalité indexée sur id_style au lieu de LIKE sur styles.name"""
+    style_ids = matching_style_ids(style)
+    return f" AND p.id_style {in_clause(style_ids)}", style_ids
+
+def position_filter(position: str) -> Tuple[str, list]:
+    """Filtre de poste SQL : recherche par clé primaire (position, player_id) de player_positions"""
+    known = fetch_position_tokens()
+    if known is None:
+        # player_positions absente ou vide : ancien filtre sur players.position
+        return " AND p.position LIKE %s", [f"%{position.strip()}%"]
+    tokens = tokens_containing(position, known)
+    return (f" AND p.player_id IN (SELECT pp.player_id FROM player_positions pp"
+            f" WHERE pp.position {in_clause(tokens)})", tokens)
@@ -1,7 +1,11 @@
+import asyncio
 import re
 import json
 from typing import Dict, List, Optional, Tuple
 from config.database import db
+from services.cache_service import cache
+from services.catalog import position_filter, style_id, tokens_containing
+from services.player_snapshot import player_snapshot
 
 class ChatbotService:
     """Service de chatbot intelligent pour ScoutAI"""
@@ -124,148 +128,207 @@ class ChatbotService:
         
         return criteria
 
+    def build_search_query(self, criteria: Dict) -> Tuple[str, tuple]:
+        """Construit la requête SQL de recherche à partir des critères extraits"""
+        query = """
+            SELECT 
+                p.player_id,
+                p.name as Player,
+                p.age as Age,
+                p.position as Pos,
+                p.squad as Squad,
+                COALESCE(s.name, '') as style,
+                p.market_value as MarketValue,
+                p.goals as Gls,
+                p.assists as Ast,
+                p.xG,
+                p.xAG,
+                p.tackles as Tkl,
+                p.progressive_passes as PrgP,
+                p.carries as Carries,
+                p.key_passes as KP,
+                COALESCE(p.image_url, '') as image_url
+            FROM players p
+            LEFT JOIN styles s ON p.id_style = s.id_style
+            WHERE p.market_value > 0
+        """
+        
+        params = []
+        
+        # Application des filtres
+        if criteria.get('style'):
+            query += " AND p.id_style = %s"
+            params.append(style_id(criteria['style']))
+        
+        if criteria.get('position'):
+            condition, tokens = position_filter(criteria['position'])
+            query += condition
+            params.extend(tokens)
+        
+        if criteria.get('playerName'):
+            query += " AND p.name LIKE %s"
+            params.append(f"%{criteria['playerName']}%")
+        
+        if criteria.get('minAge'):
+            query += " AND p.age >= %s"
+            params.append(int(criteria['minAge']))
+        
+        if criteria.get('maxAge'):
+            query += " AND p.age <= %s"
+            params.append(int(criteria['maxAge']))
+        
+        if criteria.get('budget'):
+            query += " AND p.market_value <= %s"
+            params.append(float(criteria['budget']))
+        
+        # Filtres de statistiques
+        if criteria.get('goals_min'):
+            query += " AND p.goals >= %s"
+            params.append(int(criteria['goals_min']))
+        
+        if criteria.get('assists_min'):
+            query += " AND p.assists >= %s"
+            params.append(int(criteria['assists_min']))
+        
+        if criteria.get('tackles_min'):
+            query += " AND p.tackles >= %s"
+            params.append(int(criteria['tackles_min']))
+        
+        # Tri et limite
+        sort_direction = "DESC" if criteria.get('sort_order', 'desc') == 'desc' else "ASC"
+        query += f" ORDER BY p.market_value {sort_direction} LIMIT 10"
+        
+        return query, tuple(params)
+
+    def format_players(self, results: Optional[List[Dict]]) -> List[Dict]:
+        """Formate les lignes retournées par la base"""
+        if not results:
+            return []
+        
+        formatted_results = []
+        for player in results:
+            formatted_player = {
+                'player_id': int(player['player_id']),
+                'Player': player['Player'],
+                'Age': int(player['Age']) if player['Age'] else 0,
+                'Pos': player['Pos'] or '',
+                'Squad': player['Squad'] or '',
+                'style': player['style'] or '',
+                'MarketValue': float(player['MarketValue']) if player['MarketValue'] else 0,
+                'Gls': int(player['Gls']) if player['Gls'] else 0,
+                'Ast': int(player['Ast']) if player['Ast'] else 0,
+                'xG': float(player['xG']) if player['xG'] else 0,
+                'xAG': float(player['xAG']) if player['xAG'] else 0,
+                'Tkl': int(player['Tkl']) if player['Tkl'] else 0,
+                'PrgP': int(player['PrgP']) if player['PrgP'] else 0,
+                'Carries': int(player['Carries']) if player['Carries'] else 0,
+                'KP': int(player['KP']) if player['KP'] else 0,
+                'image_url': player['image_url'] or "https://images.pexels.com/photos/114296/pexels-photo-114296.jpeg?auto=compress&cs=tinysrgb&w=400"
+            }
+            formatted_results.append(formatted_player)
+        
+        return formatted_results
+
+    @cache.cached(ttl=180, tags=['players', 'styles'], stale_ttl=300)
+    def fetch_search_results(self, query: str, params: tuple) -> Optional[List[Dict]]:
+        """Lignes d'une recherche (les questions fréquentes ne sollicitent la base qu'une fois)"""
+        return db.execute_query(query, params)
+
+    def search_snapshot(self, snapshot, criteria: Dict) -> List[Dict]:
+        """Mêmes critères que build_search_query, évalués sur le snapshot en mémoire"""
+        # Critères indexés d'abord : intersection de bitmaps sans lire les colonnes
+        mask = snapshot.all()
+        if criteria.get('style'):
+            mask &= snapshot.equals('style', criteria['style'])
+        if criteria.get('position'):
+            mask &= snapshot.positions(*tokens_containing(criteria['position'], snapshot.position_index))
+        
+        mask &= snapshot.range('MarketValue', greater_than=0)
+        if criteria.get('minAge'):
+            mask &= snapshot.range('Age', minimum=int(criteria['minAge']))
+        if criteria.get('maxAge'):
+            mask &= snapshot.range('Age', maximum=int(criteria['maxAge']))
+        if criteria.get('budget'):
+            mask &= snapshot.range('MarketValue', maximum=float(criteria['budget']))
+        
+        # Filtres de statistiques
+        for key, column in (('goals_min', 'Gls'), ('assists_min', 'Ast'), ('tackles_min', 'Tkl')):
+            if criteria.get(key):
+                mask &= snapshot.range(column, minimum=int(criteria[key]))
+        
+        if criteria.get('playerName'):
+            # « comme X » : noms approchants (accents, fautes de frappe), les plus proches d'abord
+            rows, _ = snapshot.name_search(criteria['playerName'], 10, within=mask)
+            return [dict(snapshot.records[row]) for row in rows]
+        
+        sort_order = 'desc' if criteria.get('sort_order', 'desc') == 'desc' else 'asc'
+        return snapshot.top(mask, sort_order, 10)
+
     def search_players(self, criteria: Dict) -> List[Dict]:
         """Recherche les joueurs selon les critères extraits"""
         try:
-            query = """
-                SELECT 
-                    p.player_id,
-                    p.name as Player,
-                    p.age as Age,
-                    p.position as Pos,
-                    p.squad as Squad,
-                    COALESCE(s.name, '') as style,
-                    p.market_value as MarketValue,
-                    p.goals as Gls,
-                    p.assists as Ast,
-                    p.xG,
-                    p.xAG,
-                    p.tackles as Tkl,
-                    p.progressive_passes as PrgP,
-                    p.carries as Carries,
-                    p.key_passes as KP,
-                    COALESCE(p.image_url, '') as image_url
-                FROM players p
-                LEFT JOIN styles s ON p.id_style = s.id_style
-                WHERE p.market_value > 0
-            """
-            
-            params = []
-            
-            # Application des filtres
-            if criteria.get('style'):
-                query += " AND s.name = %s"
-                params.append(criteria['style'])
-            
-            if criteria.get('position'):
-                query += " AND p.position LIKE %s"
-                params.append(f"%{criteria['position']}%")
-            
-            if criteria.get('playerName'):
-                query += " AND p.name LIKE %s"
-                params.append(f"%{criteria['playerName']}%")
-            
-            if criteria.get('minAge'):
-                query += " AND p.age >= %s"
-                params.append(int(criteria['minAge']))
-            
-            if criteria.get('maxAge'):
-                query += " AND p.age <= %s"
-                params.append(int(criteria['maxAge']))
-            
-            if criteria.get('budget'):
-                query += " AND p.market_value <= %s"
-                params.append(float(criteria['budget']))
-            
-            # Filtres de statistiques
-            if criteria.get('goals_min'):
-                query += " AND p.goals >= %s"
-                params.append(int(criteria['goals_min']))
-            
-            if criteria.get('assists_min'):
-                query += " AND p.assists >= %s"
-                params.append(int(criteria['assists_min']))
-            
-            if criteria.get('tackles_min'):
-                query += " AND p.tackles >= %s"
-                params.append(int(criteria['tackles_min']))
-            
-            # Tri et limite
-            sort_direction = "DESC" if criteria.get('sort_order', 'desc') == 'desc' else "ASC"
-            query += f" ORDER BY p.market_value {sort_direction} LIMIT 10"
-            
-            results = db.execute_query(query, tuple(params))
+            snapshot = player_snapshot.current()
+            if snapshot is not None:
+                return self.search_snapshot(snapshot, criteria)
             
-            if results:
-                formatted_results = []
-                for player in results:
-                    formatted_player = {
-                        'player_id': int(player['player_id']),
-                        'Player': player['Player'],
-                        'Age': int(player['Age']) if player['Age'] else 0,
-                        'Pos': player['Pos'] or '',
-                        'Squad': player['Squad'] or '',
-                        'style': player['style'] or '',
-                        'MarketValue': float(player['MarketValue']) if player['MarketValue'] else 0,
-                        'Gls': int(player['Gls']) if player['Gls'] else 0,
-                        'Ast': int(player['Ast']) if player['Ast'] else 0,
-                        'xG': float(player['xG']) if player['xG'] else 0,
-                        'xAG': float(player['xAG']) if player['xAG'] else 0,
-                        'Tkl': int(player['Tkl']) if player['Tkl'] else 0,
-                        'PrgP': int(player['PrgP']) if player['PrgP'] else 0,
-                        'Carries': int(player['Carries']) if player['Carries'] else 0,
-                        'KP': int(player['KP']) if player['KP'] else 0,
-                        'image_url': player['image_url'] or "https://images.pexels.com/photos/114296/pexels-photo-114296.jpeg?auto=compress&cs=tinysrgb&w=400"
-                    }
-                    formatted_results.append(formatted_player)
-                
-                return formatted_results
+            query, params = self.build_search_query(criteria)
+            results = self.fetch_search_results(query, params)
+            return self.format_players(results)
             
+        except Exception as e:
+            print(f"❌ Erreur dans search_players: {e}")
             return []
+
+    async def search_players_async(self, criteria: Dict, adb) -> List[Dict]:
+        """Version asynchrone de search_players (mode ASGI, pool aiomysql)"""
+        try:
+            # Résolution des styles et postes bloquante (cache, MySQL au premier appel) : dans un thread
+            query, params = await asyncio.to_thread(self.build_search_query, criteria)
+            results = await adb.execute_query(query, params)
+            return self.format_players(results)
             
         except Exception as e:
-            print(f"❌ Erreur dans search_players: {e}")
+            print(f"❌ Erreur dans search_players_async: {e}")
             return []
 
-    def search_players_flexible(self, criteria: Dict) -> Tuple[List[Dict], str]:
-        """Recherche souple : relâche les critères si aucun résultat"""
-        # 1. Recherche stricte
-        players = self.search_players(criteria)
-        if players:
-            return players, "exact"
-        # 2. Relâcher le style
+    def _relaxation_steps(self, criteria: Dict) -> List[Tuple[Dict, str]]:
+        """Étapes de relâchement des critères, par ordre de préférence"""
+        steps = [(criteria, "exact")]
+        # Relâcher le style
         relaxed = dict(criteria)
         if relaxed.get('style'):
             del relaxed['style']
-            players = self.search_players(relaxed)
-            if players:
-                return players, "sans style"
-        # 3. Relâcher l'âge
+            steps.append((relaxed, "sans style"))
+        # Relâcher l'âge
         if relaxed.get('minAge') or relaxed.get('maxAge'):
             relaxed2 = dict(relaxed)
             relaxed2.pop('minAge', None)
             relaxed2.pop('maxAge', None)
-            players = self.search_players(relaxed2)
-            if players:
-                return players, "sans age"
-        # 4. Relâcher le budget
+            steps.append((relaxed2, "sans age"))
+        # Relâcher le budget
         if relaxed.get('budget'):
             relaxed3 = dict(relaxed)
             relaxed3.pop('budget', None)
-            players = self.search_players(relaxed3)
-            if players:
-                return players, "sans budget"
-        # 5. Proposer les joueurs les plus chers de la position (ou tous)
+            steps.append((relaxed3, "sans budget"))
+        # Proposer les joueurs les plus chers de la position (ou tous)
         fallback = {}
         if criteria.get('position'):
             fallback['position'] = criteria['position']
         fallback['sort_order'] = 'desc'
-        players = self.search_players(fallback)
-        if players:
-            return players, "fallback"
-        # 6. Dernier recours : tous les joueurs
-        players = self.search_players({'sort_order': 'desc'})
-        return players, "all"
+        steps.append((fallback, "fallback"))
+        # Dernier recours : tous les joueurs
+        steps.append(({'sort_order': 'desc'}, "all"))
+        return steps
+
+    def search_players_flexible(self, criteria: Dict) -> Tuple[List[Dict], str]:
+        """Recherche souple : relâche les critères si aucun résultat"""
+        players = []
+        match_type = "all"
+        for step_criteria, match_type in self._relaxation_steps(criteria):
+            players = self.search_players(step_criteria)
+            if players:
+                break
+        return players, match_type
 
     def generate_response(self, message: str, players: List[Dict], criteria: Dict, match_type: str = "exact") -> str:
         """Génère une réponse naturelle du chatbot"""
@@ -32,7 +32,7 @@ class ComparisonService:
                 LIMIT %s
             """
             
-            results = db.execute_query(query, (user_id, limit))
+            results = db.execute_query(query, (user_id, limit), prepared=True)
             
             if results:
                 comparisons = []
@@ -1,22 +1,42 @@
 # backend/services/data_migrator.py
 import pandas as pd
+from typing import Optional
 from config.database import db
+from services.cache_service import cache
+from services import catalog
+from services.data_version import bump_data_version
+from services.player_snapshot import position_tokens
+
+# Styles de jeu correspondant à l'interface
+STYLES = [
+    'football total', 'jeu de possession', 'jeu positionnel', 
+    'jeu direct', 'pressing intense', 'defensif', 'gardien'
+]
+
+# Postes élémentaires des joueurs, comme dans init_database.py (bases créées avant la table)
+PLAYER_POSITIONS_DDL = """
+    CREATE TABLE IF NOT EXISTS player_positions (
+        player_id INT NOT NULL,
+        position VARCHAR(10) NOT NULL,
+        PRIMARY KEY (position, player_id),
+        FOREIGN KEY (player_id) REFERENCES players(player_id) ON DELETE CASCADE,
+        INDEX idx_player_id (player_id)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+"""
 
 class DataMigrator:
     """Service pour migrer les données CSV vers MySQL"""
     
     def migrate_styles(self):
         """Migre les styles de jeu correspondant à votre interface"""
-        styles = [
-            'football total', 'jeu de possession', 'jeu positionnel', 
-            'jeu direct', 'pressing intense', 'defensif', 'gardien'
-        ]
-        
         query = "INSERT INTO styles (name) VALUES (%s) ON DUPLICATE KEY UPDATE name = VALUES(name)"
-        data = [(style,) for style in styles]
+        data = [(style,) for style in STYLES]
         
         success = db.execute_many(query, data)
         if success:
+            # Script lancé hors de l'application : aucun listener d'écriture n'incrémente la version
+            bump_data_version('styles')
+            cache.invalidate_tags(['styles'])
             print("✅ Styles migrés avec succès")
         return success
     
@@ -81,6 +101,10 @@ class DataMigrator:
             success = db.execute_many(query, players_data)
             if success:
                 print(f"✅ {len(players_data)} joueurs migrés avec succès")
+                success = self.sync_player_positions()
+                # Après les postes : une version plus récente n'est jamais associée à des postes périmés
+                bump_data_version('players')
+                cache.invalidate_tags(['players'])
             return success
             
         except Exception as e:
@@ -88,16 +112,52 @@ class DataMigrator:
             return False
     
     def get_style_id(self, style_name: str) -> Optional[int]:
-        """Récupère l'ID d'un style par son nom"""
+        """Récupère l'ID d'un style par son nom (catalogue en cache, pas une requête par joueur)"""
         if not style_name:
             return None
-            
-        query = "SELECT id_style FROM styles WHERE name = %s"
-        result = db.execute_query(query, (style_name.lower(),))
+        return catalog.style_id(style_name.lower())
+    
+    def sync_player_positions(self) -> bool:
+        """Met player_positions (un poste élémentaire par ligne) en accord avec players.position
+
+        Ajouts puis suppressions ciblés : la table n'est jamais vide pendant
+        la synchronisation, contrairement à un DELETE suivi d'un INSERT.
+        Lectures sur le primaire : appelée juste après l'import des joueurs,
+        une réplique ou la copie locale renverraient des lignes périmées.
+        """
+        players = db.execute_query("SELECT player_id, position FROM players", primary=True)
+        current = db.execute_query("SELECT player_id, position FROM player_positions", primary=True)
+        if players is None or current is None:
+            print("❌ Synchronisation des postes impossible")
+            return False
+        
+        expected = {(row['player_id'], token) for row in players for token in position_tokens(row['position'])}
+        existing = {(row['player_id'], row['position']) for row in current}
+        added = sorted(expected - existing)
+        removed = sorted(existing - expected)
         
-        if result and len(result) > 0:
-            return result[0]['id_style']
-        return None
+        if added and not db.execute_many(
+            "INSERT IGNORE INTO player_positions (player_id, position) VALUES (%s, %s)", added
+        ):
+            return False
+        if removed and not db.execute_many(
+            "DELETE FROM player_positions WHERE player_id = %s AND position = %s", removed
+        ):
+            return False
+        
+        print(f"✅ Postes synchronisés ({len(added)} ajoutés, {len(removed)} supprimés)")
+        return True
+    
+    def migrate_player_positions(self) -> bool:
+        """Crée player_positions si besoin puis la remplit depuis players.position (idempotent)
+
+        Une base existante reçoit la table et ses lignes sans réimport (aussi fait
+        par init_database.py) ; tant qu'elle est vide, les filtres de poste utilisent LIKE.
+        """
+        if db.execute_query(PLAYER_POSITIONS_DDL, fetch=False) is None:
+            print("❌ Création de la table player_positions impossible")
+            return False
+        return self.sync_player_positions()
     
     def run_full_migration(self):
         """Lance la migration complète"""
@@ -106,7 +166,10 @@ class DataMigrator:
         # 1. Migrer les styles
         self.migrate_styles()
         
-        # 2. Migrer les joueurs
+        # 2. Postes élémentaires (table créée si la base la précède)
+        self.migrate_player_positions()
+        
+        # 3. Migrer les joueurs
         csv_path = "../data/players_with_predicted_styles_and_market_value.csv"
         self.migrate_players_from_csv(csv_path)
         
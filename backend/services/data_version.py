@@ -0,0 +1,89 @@
+import hashlib
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+from config.database import db
+from services.cache_service import cache
+from utils.http_cache import make_etag
+
+# Durée pendant laquelle un worker réutilise la version lue (les écritures locales l'invalident aussitôt)
+DATA_VERSION_TTL = 5
+
+# Compteur incrémenté par une écriture sur chaque table (player_positions dérive de players)
+VERSIONED_TABLES = {'players': 'players', 'player_positions': 'players', 'styles': 'styles'}
+
+DATA_VERSION_DDL = """
+    CREATE TABLE IF NOT EXISTS data_version (
+        name VARCHAR(32) PRIMARY KEY,
+        version BIGINT UNSIGNED NOT NULL DEFAULT 0,
+        updated_at TIMESTAMP(6) NOT NULL DEFAULT CURRENT_TIMESTAMP(6) ON UPDATE CURRENT_TIMESTAMP(6)
+    ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci
+"""
+
+BUMP_QUERY = """
+    INSERT INTO data_version (name, version) VALUES (%s, 1)
+    ON DUPLICATE KEY UPDATE version = version + 1
+"""
+
+def ensure_data_version_table() -> bool:
+    """Crée la table des compteurs et ses lignes si besoin (idempotent, appelé au démarrage)"""
+    if db.execute_query(DATA_VERSION_DDL, fetch=False) is None:
+        return False
+    names = sorted(set(VERSIONED_TABLES.values()))
+    return db.execute_many("INSERT IGNORE INTO data_version (name) VALUES (%s)", [(name,) for name in names])
+
+def bump_data_version(*names: str) -> bool:
+    """Incrémente les compteurs : écritures de l'application (listener) et ingestion hors requête"""
+    if not names:
+        return True
+    return db.execute_many(BUMP_QUERY, [(name,) for name in sorted(set(names))])
+
+def _from_epoch(value) -> Optional[datetime]:
+    """UNIX_TIMESTAMP(...) en datetime UTC (un TIMESTAMP MySQL est lu dans le fuseau de la session)"""
+    if value is None:
+        return None
+    return datetime.fromtimestamp(int(value), tz=timezone.utc)
+
+@cache.cached(ttl=DATA_VERSION_TTL, tags=['players', 'styles'])
+def fetch_data_version() -> Optional[Dict]:
+    """Version des données joueurs/styles, dérivée des compteurs monotones de data_version
+
+    Chaque écriture incrémente un compteur : une mise à jour dans la même
+    seconde, en place ou un renommage de style change toujours la version.
+    Le nombre de joueurs et MAX(updated_at) complètent la clé (table des
+    compteurs recréée) et servent à la mise à jour incrémentale du snapshot.
+    """
+    try:
+        with db.cursor(dictionary=True, readonly=True) as cursor:
+            cursor.execute("""
+                SELECT
+                    (SELECT version FROM data_version WHERE name = 'players') as players_version,
+                    (SELECT version FROM data_version WHERE name = 'styles') as styles_version,
+                    (SELECT UNIX_TIMESTAMP(MAX(updated_at)) FROM data_version) as modified_at,
+                    (SELECT COUNT(*) FROM players) as players_count,
+                    (SELECT MAX(updated_at) FROM players) as players_updated
+            """)
+            row = cursor.fetchone()
+    except Exception as e:
+        print(f"⚠️  Version des données indisponible: {e}")
+        return None
+
+    if row['players_version'] is None or row['styles_version'] is None:
+        print("⚠️  Compteurs de version absents (table data_version non initialisée)")
+        return None
+    parts = [row['players_version'], row['styles_version'], row['players_count'], str(row['players_updated'])]
+    return {
+        'version': hashlib.sha1(repr(parts).encode('utf-8')).hexdigest()[:16],
+        'last_modified': _from_epoch(row['modified_at']),
+        'players_version': row['players_version'],
+        'styles_version': row['styles_version'],
+        'players_count': row['players_count'],
+        # Valeur brute (heure de la session MySQL) : comparée telle quelle à players.updated_at
+        'players_updated': row['players_updated']
+    }
+
+def data_validators(*parts: Any) -> Tuple[Optional[str], Optional[datetime]]:
+    """(ETag, Last-Modified) d'une réponse dérivée des joueurs/styles ; (None, None) si la version est inconnue"""
+    version = fetch_data_version()
+    if version is None:
+        return None, None
+    return make_etag(version['version'], *parts), version['last_modified']
@@ -36,7 +36,7 @@ class FavoriteService:
                 ORDER BY f.created_at DESC
             """
             
-            results = db.execute_query(query, (user_id,))
+            results = db.execute_query(query, (user_id,), prepared=True)
             
             if results:
                 favorites = []
@@ -132,7 +132,7 @@ class FavoriteService:
                 WHERE user_id = %s AND player_id = %s
             """
             
-            result = db.execute_query(query, (user_id, player_id))
+            result = db.execute_query(query, (user_id, player_id), prepared=True)
             return len(result) > 0 if result else False
             
         except Exception as e:
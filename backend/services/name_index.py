@@ -0,0 +1,113 @@
+# backend/services/name_index.py
+import re
+from typing import Dict, List, Set, Tuple
+import numpy as np
+
+WORD_RE = re.compile(r'\w+')
+
+# Part minimale des trigrammes de la recherche présents dans le nom (tolérance aux fautes de frappe)
+DEFAULT_THRESHOLD = 0.5
+
+# Score des noms contenant la requête (au-dessus de tout score approché, compris entre 0 et 1)
+CONTAINS_SCORE = 2.0
+
+def trigrams(folded: str) -> Set[str]:
+    """Trigrammes par mot, complétés comme pg_trgm : '  mbappe ' -> '  m', ' mb', 'mba', ..., 'pe '"""
+    grams = set()
+    for word in WORD_RE.findall(folded):
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+def _inner(grams: Set[str]) -> List[str]:
+    """Trigrammes intérieurs à un mot : présents dans tout texte qui contient la recherche"""
+    return [gram for gram in grams if ' ' not in gram]
+
+class NameIndex:
+    """Index inversé de trigrammes sur les noms repliés (casse et accents ignorés)
+
+    Chaque trigramme pointe vers le tableau trié des lignes qui le contiennent.
+    Une recherche additionne les listes des trigrammes de la requête
+    (np.bincount) : le score d'une ligne est la part des trigrammes de la
+    requête présents dans son nom. Les noms qui contiennent la requête telle
+    quelle (l'ancien LIKE '%x%') sont toujours retenus, en tête (score
+    CONTAINS_SCORE).
+    """
+
+    def __init__(self, postings: Dict[str, np.ndarray], folded: np.ndarray):
+        self.postings = postings
+        self.folded = folded
+        self.size = len(folded)
+
+    @classmethod
+    def build(cls, folded: np.ndarray) -> 'NameIndex':
+        lists = {}
+        for row, name in enumerate(folded):
+            for gram in trigrams(str(name)):
+                lists.setdefault(gram, []).append(row)
+        return cls({gram: np.array(rows, dtype=np.int32) for gram, rows in lists.items()}, folded)
+
+    def updated(self, folded: np.ndarray, changes: Dict[int, Tuple[str, str]]) -> 'NameIndex':
+        """Nouvel index après renommages / ajouts {ligne: (ancien nom replié, nouveau)} ;
+        seules les listes des trigrammes touchés sont recalculées"""
+        removed, added = {}, {}
+        for row, (old, new) in changes.items():
+            old_grams, new_grams = trigrams(old), trigrams(new)
+            for gram in old_grams - new_grams:
+                removed.setdefault(gram, []).append(row)
+            for gram in new_grams - old_grams:
+                added.setdefault(gram, []).append(row)
+
+        postings = dict(self.postings)
+        for gram in set(removed) | set(added):
+            rows = postings.get(gram, np.zeros(0, dtype=np.int32))
+            if gram in removed:
+                rows = np.setdiff1d(rows, np.array(removed[gram], dtype=np.int32), assume_unique=True)
+            if gram in added:
+                rows = np.union1d(rows, np.array(added[gram], dtype=np.int32)).astype(np.int32)
+            if len(rows):
+                postings[gram] = rows
+            else:
+                postings.pop(gram, None)
+        return NameIndex(postings, folded)
+
+    def search(self, folded_query: str, threshold: float = DEFAULT_THRESHOLD) -> Tuple[np.ndarray, np.ndarray]:
+        """Lignes correspondantes et leur score (part des trigrammes, CONTAINS_SCORE si le nom contient la requête)"""
+        query = folded_query.strip()
+        if not query:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        grams = trigrams(query)
+        inner = _inner(grams)
+
+        # Contient la requête : lignes ayant tous ses trigrammes intérieurs, vérifiées sur le texte
+        if inner:
+            inner_counts = self._counts(inner)
+            candidates = np.flatnonzero(inner_counts == len(inner))
+            contains = candidates[np.char.find(self.folded[candidates], query) >= 0] if len(candidates) else candidates
+        elif WORD_RE.fullmatch(query):
+            # Une ou deux lettres : union des trigrammes qui les contiennent (exact, sans relire les noms)
+            lists = [rows for gram, rows in self.postings.items() if query in gram]
+            contains = np.unique(np.concatenate(lists)) if lists else np.zeros(0, dtype=np.int64)
+        else:
+            contains = np.flatnonzero(np.char.find(self.folded, query) >= 0)
+
+        # Correspondances approchées
+        score = self._counts(grams) / len(grams) if grams else np.zeros(self.size)
+        fuzzy = np.flatnonzero(score >= threshold)
+
+        rows = np.union1d(contains, fuzzy).astype(np.int64)
+        scores = score[rows] if len(score) else np.zeros(len(rows))
+        scores = np.where(np.isin(rows, contains), CONTAINS_SCORE, scores)
+        return rows, scores
+
+    def _counts(self, grams) -> np.ndarray:
+        lists = [self.postings[gram] for gram in grams if gram in self.postings]
+        if not lists:
+            return np.zeros(self.size, dtype=np.int64)
+        return np.bincount(np.concatenate(lists), minlength=self.size)
+
+    def stats(self) -> Dict:
+        return {
+            'trigrams': len(self.postings),
+            'postings_bytes': sum(rows.nbytes for rows in self.postings.values())
+        }
@@ -0,0 +1,129 @@
+# backend/services/percentile_index.py
+from typing import Dict, Iterable, Optional
+import numpy as np
+from services.bitmap_index import Bitmap
+
+# Statistiques classées par poste (nom dans l'API -> colonne de players)
+PERCENTILE_STATS = {
+    'Gls': 'goals',
+    'Ast': 'assists',
+    'xG': 'xG',
+    'xAG': 'xAG',
+    'Tkl': 'tackles',
+    'PrgP': 'progressive_passes',
+    'Carries': 'carries',
+    'KP': 'key_passes'
+}
+
+def rank_entry(at_most, at_least, total) -> Optional[Dict]:
+    """Rang d'une valeur dans son groupe ; None si la valeur est NULL
+
+    percentile : part du groupe dont la valeur est inférieure ou égale ;
+    top : part du groupe dont la valeur est supérieure ou égale
+    (« top 10 % des milieux » <=> top <= 10). Les ex aequo ont le même rang.
+    """
+    if at_most is None or at_least is None or not total:
+        return None
+    return {
+        'percentile': round(100.0 * int(at_most) / int(total), 1),
+        'top': round(100.0 * int(at_least) / int(total), 1),
+        'of': int(total)
+    }
+
+class GroupRanks:
+    """Rangs des joueurs d'un poste élémentaire pour chaque statistique
+
+    at_most / at_least (une ligne par statistique, une colonne par joueur) :
+    nombre de joueurs du groupe dont la valeur est inférieure / supérieure ou
+    égale (-1 si la valeur est NULL) ; slots donne la colonne de chaque ligne
+    du snapshot, d'où une lecture en O(1).
+    """
+
+    def __init__(self, rows: np.ndarray, slots: np.ndarray, at_most: np.ndarray,
+                 at_least: np.ndarray, totals: np.ndarray):
+        self.rows = rows
+        self.slots = slots
+        self.at_most = at_most
+        self.at_least = at_least
+        self.totals = totals
+
+    @classmethod
+    def build(cls, rows: np.ndarray, numeric: Dict[str, np.ndarray], size: int) -> 'GroupRanks':
+        """Rangs de tout le groupe : un tri par statistique, puis recherches dichotomiques des valeurs triées"""
+        values = np.vstack([numeric[stat][rows] for stat in PERCENTILE_STATS])
+        missing = np.isnan(values)
+        totals = (~missing).sum(axis=1)
+        order = np.argsort(values, axis=1, kind='stable')  # NaN en fin de ligne
+        ordered = np.take_along_axis(values, order, axis=1)
+        at_most = np.empty(values.shape, dtype=np.int32)
+        at_least = np.empty(values.shape, dtype=np.int32)
+        for stat in range(len(values)):
+            present = ordered[stat, :totals[stat]]
+            at_most[stat, order[stat]] = np.searchsorted(present, ordered[stat], side='right')
+            at_least[stat, order[stat]] = totals[stat] - np.searchsorted(present, ordered[stat], side='left')
+        at_most[missing] = -1
+        at_least[missing] = -1
+
+        slots = np.full(size, -1, dtype=np.int32)
+        slots[rows] = np.arange(len(rows), dtype=np.int32)
+        return cls(rows, slots, at_most, at_least, totals.astype(np.int32))
+
+    def lookup(self, row: int) -> Optional[Dict[str, Optional[Dict]]]:
+        """Rangs d'une ligne du snapshot, None si elle n'appartient pas au groupe"""
+        slot = self.slots[row] if row < len(self.slots) else -1
+        if slot < 0:
+            return None
+        at_most, at_least = self.at_most[:, slot], self.at_least[:, slot]
+        return {
+            stat: rank_entry(at_most[index], at_least[index], self.totals[index]) if at_most[index] >= 0 else None
+            for index, stat in enumerate(PERCENTILE_STATS)
+        }
+
+class PercentileIndex:
+    """Rangs centiles par poste élémentaire (FW, MF, DF, GK...) et par statistique
+
+    Calculés une fois pour tous les groupes à la construction du snapshot ;
+    après une mise à jour, seuls les groupes des postes touchés sont
+    recalculés, les autres sont partagés. La lecture d'un joueur ne parcourt
+    jamais son groupe.
+    """
+
+    def __init__(self, groups: Dict[str, GroupRanks]):
+        self.groups = groups
+
+    @classmethod
+    def build(cls, position_index: Dict[str, Bitmap], numeric: Dict[str, np.ndarray],
+              size: int) -> 'PercentileIndex':
+        return cls({
+            token: GroupRanks.build(bitmap.rows(), numeric, size)
+            for token, bitmap in position_index.items()
+        })
+
+    def updated(self, position_index: Dict[str, Bitmap], numeric: Dict[str, np.ndarray],
+                size: int, tokens: Iterable[str]) -> 'PercentileIndex':
+        """Nouvel index où seuls les groupes tokens (postes des lignes modifiées) sont recalculés"""
+        groups = dict(self.groups)
+        for token in set(tokens):
+            bitmap = position_index.get(token)
+            if bitmap is None or not len(bitmap):
+                groups.pop(token, None)
+            else:
+                groups[token] = GroupRanks.build(bitmap.rows(), numeric, size)
+        return PercentileIndex(groups)
+
+    def ranks(self, row: int, tokens: Iterable[str]) -> Dict[str, Dict[str, Optional[Dict]]]:
+        """{poste: {statistique: rang}} d'une ligne pour ses postes élémentaires"""
+        result = {}
+        for token in tokens:
+            group = self.groups.get(token)
+            ranks = group.lookup(row) if group is not None else None
+            if ranks is not None:
+                result[token] = ranks
+        return result
+
+    def stats(self) -> Dict:
+        return {
+            'groups': len(self.groups),
+            'bytes': sum(group.slots.nbytes + group.at_most.nbytes + group.at_least.nbytes
+                         for group in self.groups.values())
+        }
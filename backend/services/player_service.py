@@ -1,6 +1,13 @@
 # backend/services/player_service.py
 from config.database import db
-from typing import List, Dict, Optional
+from services.cache_service import cache
+from services.catalog import position_filter, style_id, tokens_containing
+from services.name_index import CONTAINS_SCORE
+from services.percentile_index import PERCENTILE_STATS, rank_entry
+from services.player_snapshot import player_snapshot
+from typing import List, Dict, Optional, Tuple
+from utils.pagination import decode_cursor, encode_cursor, keyset_condition, keyset_order, split_page
+from utils.validators import ValidationError
 
 class PlayerService:
     """Service pour la gestion des joueurs"""
@@ -8,6 +15,11 @@ class PlayerService:
     def filter_players(self, filters: Dict) -> List[Dict]:
         """Filtre les joueurs selon les critères - Version optimisée"""
         try:
+            # Snapshot en mémoire à jour : filtrage vectorisé sans requête SQL
+            snapshot = player_snapshot.current()
+            if snapshot is not None:
+                return self._filter_snapshot(snapshot, filters)
+            
             # Construction de la requête de base optimisée
             query = """
                 SELECT 
@@ -36,17 +48,14 @@ class PlayerService:
             
             # Application des filtres optimisés
             if filters.get('style') and filters['style'] != "Sélectionner un style":
-                query += " AND s.name = %s"
-                params.append(filters['style'].lower())
+                # Nom résolu une fois via le catalogue en cache : égalité sur idx_style
+                query += " AND p.id_style = %s"
+                params.append(style_id(filters['style']))
             
             if filters.get('position') and filters['position'] != "":
-                position = filters['position'].strip()
-                if position in ['FW', 'MF', 'DF', 'GK']:
-                    query += " AND p.position LIKE %s"
-                    params.append(f"%{position}%")
-                else:
-                    query += " AND p.position LIKE %s"
-                    params.append(f"%{position}%")
+                condition, tokens = position_filter(filters['position'])
+                query += condition
+                params.extend(tokens)
             
             if filters.get('squad') and filters['squad'] != "":
                 query += " AND p.squad LIKE %s"
@@ -129,6 +138,46 @@ class PlayerService:
             print(f"❌ Erreur dans filter_players: {e}")
             return []
     
+    def _filter_snapshot(self, snapshot, filters: Dict) -> List[Dict]:
+        """Mêmes critères que la requête SQL de filter_players, en masques vectorisés"""
+        # Critères indexés d'abord : intersection de bitmaps sans lire les colonnes
+        mask = snapshot.all()
+        
+        if filters.get('style') and filters['style'] != "Sélectionner un style":
+            mask &= snapshot.equals('style', filters['style'].lower())
+        
+        if filters.get('position') and filters['position'] != "":
+            mask &= snapshot.positions(*tokens_containing(filters['position'], snapshot.position_index))
+        
+        if filters.get('squad') and filters['squad'] != "":
+            mask &= snapshot.like('Squad', f"%{filters['squad']}%")
+        
+        mask &= snapshot.range('MarketValue', greater_than=0)
+        
+        if filters.get('player_name') and filters['player_name'] != "":
+            mask &= snapshot.like('Player', f"%{filters['player_name']}%")
+        
+        if filters.get('age_min'):
+            try:
+                mask &= snapshot.range('Age', minimum=int(filters['age_min']))
+            except ValueError:
+                pass
+        
+        if filters.get('age_max'):
+            try:
+                mask &= snapshot.range('Age', maximum=int(filters['age_max']))
+            except ValueError:
+                pass
+        
+        if filters.get('budget_max'):
+            try:
+                mask &= snapshot.range('MarketValue', maximum=float(filters['budget_max']))
+            except ValueError:
+                pass
+        
+        sort_order = 'desc' if filters.get('sort_order', 'desc').lower() == 'desc' else 'asc'
+        return snapshot.top(mask, sort_order, min(filters.get('limit', 50), 100))
+    
     def _get_default_image_url(self, player_name: str, squad: str = "") -> str:
         """Génère une URL d'image par défaut basée sur le nom du joueur"""
         return "https://images.pexels.com/photos/114296/pexels-photo-114296.jpeg?auto=compress&cs=tinysrgb&w=400"
@@ -145,7 +194,7 @@ class PlayerService:
                 WHERE p.player_id = %s
             """
             
-            results = db.execute_query(query, (player_id,))
+            results = db.execute_query(query, (player_id,), prepared=True)
             
             if results and len(results) > 0:
                 player = results[0]
@@ -173,11 +222,100 @@ class PlayerService:
             print(f"Erreur dans get_player_by_id: {e}")
             return None
     
+    def get_player_percentiles(self, player_id: int, position: Optional[str] = None) -> Optional[Dict]:
+        """Rangs centiles d'un joueur parmi chacun de ses postes (« top 10 % des milieux »)
+
+        Lus dans le snapshot (précalculés par poste) ; tant qu'il n'est pas à
+        jour, comptés par MySQL en une requête sur player_positions, mis en
+        cache jusqu'à la prochaine écriture sur les joueurs.
+        """
+        try:
+            snapshot = player_snapshot.current()
+            if snapshot is not None:
+                ranks = snapshot.percentiles(player_id, position)
+                return {'player_id': player_id, 'positions': ranks} if ranks is not None else None
+            
+            results = self.fetch_percentile_counts(player_id, position.strip().upper() if position else None)
+            if results is None:
+                return None
+            if not results and not self.get_player_by_id(player_id):
+                return None
+            
+            return {
+                'player_id': player_id,
+                'positions': {
+                    row['position']: {
+                        stat: rank_entry(row[f"{stat}_at_most"], row[f"{stat}_at_least"], row[f"{stat}_total"])
+                        for stat in PERCENTILE_STATS
+                    }
+                    for row in results
+                }
+            }
+            
+        except Exception as e:
+            print(f"Erreur dans get_player_percentiles: {e}")
+            return None
+    
+    @cache.cached(ttl=300, tags=['players'])
+    def fetch_percentile_counts(self, player_id: int, position: Optional[str] = None) -> Optional[List[Dict]]:
+        """Comptages par poste de la requête de repli (auto-jointure), calculés une fois par version des joueurs"""
+        counts = ",\n".join(
+            f"COUNT(o.{column}) AS {stat}_total, SUM(o.{column} <= t.{column}) AS {stat}_at_most, "
+            f"SUM(o.{column} >= t.{column}) AS {stat}_at_least"
+            for stat, column in PERCENTILE_STATS.items()
+        )
+        query = f"""
+            SELECT tp.position, {counts}
+            FROM players t
+            JOIN player_positions tp ON tp.player_id = t.player_id
+            JOIN player_positions pp ON pp.position = tp.position
+            JOIN players o ON o.player_id = pp.player_id
+            WHERE t.player_id = %s
+        """
+        params = [player_id]
+        if position:
+            query += " AND tp.position = %s"
+            params.append(position)
+        query += " GROUP BY tp.position"
+        
+        return db.execute_query(query, tuple(params))
+    
     def search_players_by_name(self, name_query: str, limit: int = 20) -> List[Dict]:
-        """Recherche de joueurs par nom - Version optimisée"""
+        """Recherche de joueurs par nom - Version optimisée (première page de search_players_page)"""
+        try:
+            return self.search_players_page(name_query, limit)[0]
+        except ValidationError:
+            return []
+    
+    def search_players_page(self, name_query: str, limit: int = 20,
+                            cursor: Optional[str] = None) -> Tuple[List[Dict], Optional[str]]:
+        """Page de résultats d'une recherche par nom et curseur de la page suivante
+
+        Snapshot à jour : recherche approchée par trigrammes (accents et fautes
+        de frappe tolérés). Les noms contenant la recherche viennent d'abord,
+        par valeur marchande, puis les noms approchants par ressemblance.
+        Sinon LIKE côté MySQL (noms contenant la recherche uniquement).
+        Clés du curseur : (pertinence, valeur marchande, player_id).
+        """
+        after = decode_cursor(cursor, 'name_search', 3)
         try:
             if len(name_query) < 2:
-                return []
+                return [], None
+            
+            snapshot = player_snapshot.current()
+            if snapshot is not None:
+                rows, scores = snapshot.name_search(name_query, limit + 1, after=after)
+                next_cursor = None
+                if len(rows) > limit:
+                    rows = rows[:limit]
+                    next_cursor = encode_cursor(
+                        'name_search', [float(scores[limit - 1]), *snapshot.cursor_keys(rows[-1])]
+                    )
+                return [self._search_result(snapshot.records[row]) for row in rows], next_cursor
+            
+            if after is not None and after[0] < CONTAINS_SCORE:
+                # Curseur déjà dans les noms approchants : MySQL ne les connaît pas
+                return [], None
             
             query = """
                 SELECT 
@@ -192,25 +330,89 @@ class PlayerService:
                 FROM players p
                 LEFT JOIN styles s ON p.id_style = s.id_style
                 WHERE p.name LIKE %s
+            """
+            
+            params = [f"%{name_query}%"]
+            if after is not None:
+                condition, keyset_params = keyset_condition(after[1:], [('MarketValue', 'desc')])
+                query += condition
+                params.extend(keyset_params)
+            query += keyset_order([('MarketValue', 'desc')]) + " LIMIT %s"
+            params.append(limit + 1)
+            
+            results = db.execute_query(query, tuple(params), prepared=True) or []
+            results, next_after = split_page(
+                results, limit, lambda player: [CONTAINS_SCORE, player['market_value'], int(player['player_id'])]
+            )
+            
+            # Ajouter des URLs d'images par défaut
+            for player in results:
+                if not player.get('image_url'):
+                    player['image_url'] = self._get_default_image_url(player.get('name', ''), player.get('squad', ''))
+            
+            return results, encode_cursor('name_search', next_after) if next_after else None
+            
+        except Exception as e:
+            print(f"Erreur dans search_players_by_name: {e}")
+            return [], None
+    
+    def autocomplete_players(self, prefix: str, limit: int = 10) -> List[Dict]:
+        """Suggestions pour la saisie en cours : nom ou mot du nom commençant par prefix
+
+        Servies par l'index de préfixes du snapshot (déjà classé par valeur
+        marchande) ; LIKE 'x%' côté MySQL tant que le snapshot n'est pas à jour.
+        """
+        try:
+            if not prefix.strip():
+                return []
+            
+            snapshot = player_snapshot.current()
+            if snapshot is not None:
+                return [self._search_result(record) for record in snapshot.autocomplete(prefix, limit)]
+            
+            query = """
+                SELECT 
+                    p.player_id,
+                    p.name,
+                    p.age,
+                    p.position,
+                    p.squad,
+                    p.market_value,
+                    COALESCE(p.image_url, '') as image_url,
+                    s.name as style
+                FROM players p
+                LEFT JOIN styles s ON p.id_style = s.id_style
+                WHERE p.name LIKE %s OR p.name LIKE %s
                 ORDER BY p.market_value DESC
                 LIMIT %s
             """
             
-            search_term = f"%{name_query}%"
-            results = db.execute_query(query, (search_term, limit))
+            term = prefix.strip()
+            results = db.execute_query(query, (f"{term}%", f"% {term}%", limit), prepared=True)
             
-            # Ajouter des URLs d'images par défaut
-            if results:
-                for player in results:
-                    if not player.get('image_url'):
-                        player['image_url'] = self._get_default_image_url(player.get('name', ''), player.get('squad', ''))
+            for player in results or []:
+                if not player.get('image_url'):
+                    player['image_url'] = self._get_default_image_url(player.get('name', ''), player.get('squad', ''))
             
             return results if results else []
             
         except Exception as e:
-            print(f"Erreur dans search_players_by_name: {e}")
+            print(f"Erreur dans autocomplete_players: {e}")
             return []
     
+    def _search_result(self, record: Dict) -> Dict:
+        """Ligne du snapshot au format de search_players_by_name"""
+        return {
+            'player_id': record['player_id'],
+            'name': record['Player'],
+            'age': record['Age'],
+            'position': record['Pos'],
+            'squad': record['Squad'],
+            'market_value': record['MarketValue'],
+            'image_url': record['image_url'],
+            'style': record['style']
+        }
+    
     def get_player_id_by_name(self, player_name: str) -> Optional[int]:
         """Récupère l'ID d'un joueur par son nom"""
         try:
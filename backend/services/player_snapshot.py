@@ -0,0 +1,577 @@
+# backend/services/player_snapshot.py
+import re
+import threading
+import time
+import unicodedata
+from datetime import timedelta
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from config.database import db
+from config.settings import Config
+from services.bitmap_index import Bitmap, BitmapIndex
+from services.name_index import NameIndex
+from services.percentile_index import PercentileIndex
+from services.prefix_index import PrefixIndex
+from services.data_version import fetch_data_version
+
+DEFAULT_PLAYER_IMAGE = "https://images.pexels.com/photos/114296/pexels-photo-114296.jpeg?auto=compress&cs=tinysrgb&w=400"
+
+PLAYERS_BASE_QUERY = """
+    SELECT
+        p.player_id,
+        p.name as Player,
+        p.age as Age,
+        p.position as Pos,
+        p.squad as Squad,
+        COALESCE(s.name, '') as style,
+        p.market_value as MarketValue,
+        p.goals as Gls,
+        p.assists as Ast,
+        p.xG,
+        p.xAG,
+        p.tackles as Tkl,
+        p.progressive_passes as PrgP,
+        p.carries as Carries,
+        p.key_passes as KP,
+        COALESCE(p.image_url, '') as image_url
+    FROM players p
+    LEFT JOIN styles s ON p.id_style = s.id_style
+"""
+
+# Colonnes du snapshot : numériques (NULL -> NaN), catégorielles (codes) et texte libre
+NUMERIC_COLUMNS = ('Age', 'MarketValue', 'Gls', 'Ast', 'xG', 'xAG', 'Tkl', 'PrgP', 'Carries', 'KP')
+CATEGORY_COLUMNS = ('Pos', 'Squad', 'style')
+TEXT_COLUMNS = ('Player',)
+
+# Marge de relecture incrémentale : lignes écrites par une transaction validée après le dernier MAX(updated_at)
+INCREMENTAL_OVERLAP = timedelta(seconds=60)
+
+# Tri par défaut des pages : valeur marchande décroissante
+DEFAULT_SORT = (('MarketValue', 'desc'),)
+
+def format_player_row(player):
+    """Formate une ligne joueur pour l'API"""
+    return {
+        'player_id': int(player['player_id']),
+        'Player': player['Player'],
+        'Age': int(player['Age']) if player['Age'] else 0,
+        'Pos': player['Pos'] or '',
+        'Squad': player['Squad'] or '',
+        'style': player['style'] or '',
+        'MarketValue': float(player['MarketValue']) if player['MarketValue'] else 0,
+        'Gls': int(player['Gls']) if player['Gls'] else 0,
+        'Ast': int(player['Ast']) if player['Ast'] else 0,
+        'xG': float(player['xG']) if player['xG'] else 0,
+        'xAG': float(player['xAG']) if player['xAG'] else 0,
+        'Tkl': int(player['Tkl']) if player['Tkl'] else 0,
+        'PrgP': int(player['PrgP']) if player['PrgP'] else 0,
+        'Carries': int(player['Carries']) if player['Carries'] else 0,
+        'KP': int(player['KP']) if player['KP'] else 0,
+        'image_url': player['image_url'] or DEFAULT_PLAYER_IMAGE
+    }
+
+def fold(text) -> str:
+    """Forme comparable selon la collation utf8mb4_unicode_ci : casse et accents ignorés"""
+    if text is None:
+        return ''
+    decomposed = unicodedata.normalize('NFKD', str(text))
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+def like_regex(pattern: str):
+    """Motif SQL LIKE (% et _) -> expression régulière sur le texte replié"""
+    parts = []
+    for char in fold(pattern):
+        if char == '%':
+            parts.append('.*')
+        elif char == '_':
+            parts.append('.')
+        else:
+            parts.append(re.escape(char))
+    return re.compile(''.join(parts), re.DOTALL)
+
+def _plain_contains(pattern: str) -> Optional[str]:
+    """'%texte%' sans autre joker -> texte (recherche de sous-chaîne vectorisée)"""
+    if len(pattern) >= 2 and pattern[0] == '%' and pattern[-1] == '%':
+        inner = pattern[1:-1]
+        if '%' not in inner and '_' not in inner:
+            return fold(inner)
+    return None
+
+def _to_float(value) -> float:
+    return float(value) if value is not None else np.nan
+
+def position_tokens(position: str) -> List[str]:
+    """'MF,FW' -> ['MF', 'FW'] (postes élémentaires d'une valeur composite)"""
+    return [token.strip().upper() for token in (position or '').split(',') if token.strip()]
+
+def _sort_key(values: np.ndarray, direction: str) -> np.ndarray:
+    """Clé croissante dans l'ordre de sortie de ORDER BY column direction (NULL placé comme MySQL)"""
+    if direction == 'desc':
+        return np.where(np.isnan(values), np.inf, -values)
+    return np.where(np.isnan(values), -np.inf, values)
+
+def _order_keys(columns: List[np.ndarray], player_ids: np.ndarray, spec) -> List[np.ndarray]:
+    """Clés de ORDER BY spec, player_id (dans le sens de la dernière clé)"""
+    keys = [_sort_key(values, direction) for values, (_, direction) in zip(columns, spec)]
+    player_ids = np.asarray(player_ids, dtype=np.float64)
+    keys.append(-player_ids if spec[-1][1] == 'desc' else player_ids)
+    return keys
+
+def _cursor_bound(after, spec) -> List[np.ndarray]:
+    """Clés d'un curseur [valeurs..., player_id] (NULL -> NaN)"""
+    values = [np.array([np.nan if value is None else float(value)]) for value in after[:-1]]
+    return _order_keys(values, np.array([float(after[-1])]), spec)
+
+def _after(keys: List[np.ndarray], bound: List) -> np.ndarray:
+    """Lignes strictement après bound dans l'ordre lexicographique des clés"""
+    result = np.zeros(len(keys[0]), dtype=bool)
+    equal = np.ones(len(keys[0]), dtype=bool)
+    for key, value in zip(keys, bound):
+        value = float(np.asarray(value).ravel()[0])
+        result |= equal & (key > value)
+        equal &= key == value
+    return result
+
+class PlayerSnapshot:
+    """Copie en colonnes NumPy de players ⨝ styles, immuable une fois construite
+
+    Les filtres SQL des routes se traduisent en opérations vectorisées :
+    - style, poste et club : index bitmap (un bitmap compressé par valeur
+      distincte, plus un par poste élémentaire) ; les prédicats LIKE / = sont
+      évalués une fois par valeur distincte et les critères se combinent par
+      intersection de bitmaps avant de lire la moindre colonne ;
+    - comparaisons numériques en masques booléens (NULL = NaN, donc jamais
+      retenu, comme en SQL) ; recherche de sous-chaîne sur les noms repliés ;
+    - recherche approchée des noms par index de trigrammes et autocomplétion
+      par tableau trié de préfixes (construits au premier usage, puis tenus
+      à jour incrémentalement) ;
+    - rangs centiles par poste élémentaire de chaque statistique, lus en O(1) ;
+    - tri sur une ou plusieurs colonnes numériques avec sélection partielle
+      (seul le top-k est trié), pagination par curseur sur les clés de tri.
+    """
+
+    def __init__(self, rows: List[Dict], version: Optional[Dict] = None):
+        self.version = version['version'] if version else None
+        self.data_version = version
+        self.size = len(rows)
+        self.records = [format_player_row(row) for row in rows]
+        self.player_ids = np.array([int(row['player_id']) for row in rows], dtype=np.int64)
+        self.row_of = {int(player_id): row for row, player_id in enumerate(self.player_ids)}
+        self.numeric = {
+            column: np.array([_to_float(row[column]) for row in rows], dtype=np.float64)
+            for column in NUMERIC_COLUMNS
+        }
+        self.categories = {}
+        self.codes = {}
+        self.indexes = {}
+        for column in CATEGORY_COLUMNS:
+            index = {}
+            self.codes[column] = np.fromiter(
+                (index.setdefault(row[column] or '', len(index)) for row in rows),
+                dtype=np.int32, count=self.size
+            )
+            self.categories[column] = list(index)
+            self.indexes[column] = BitmapIndex.build(self.codes[column], self.categories[column])
+        self._folded_lists = {column: [fold(row[column]) for row in rows] for column in TEXT_COLUMNS}
+        self.folded = {column: np.array(values, dtype=str) for column, values in self._folded_lists.items()}
+        self.position_index = self._build_position_index()
+        self._name_index: Optional[NameIndex] = None
+        self._prefix_index: Optional[PrefixIndex] = None
+        self._percentile_index: Optional[PercentileIndex] = None
+
+    @property
+    def name_index(self) -> NameIndex:
+        if self._name_index is None:
+            self._name_index = NameIndex.build(self.folded['Player'])
+        return self._name_index
+
+    @property
+    def prefix_index(self) -> PrefixIndex:
+        if self._prefix_index is None:
+            self._prefix_index = PrefixIndex.build(self.folded['Player'], self.numeric['MarketValue'])
+        return self._prefix_index
+
+    @property
+    def percentile_index(self) -> PercentileIndex:
+        if self._percentile_index is None:
+            self._percentile_index = PercentileIndex.build(self.position_index, self.numeric, self.size)
+        return self._percentile_index
+
+    def _build_position_index(self) -> Dict[str, Bitmap]:
+        """Un bitmap par poste élémentaire : union des bitmaps des valeurs qui le contiennent"""
+        values_by_token = {}
+        for value in self.indexes['Pos'].bitmaps:
+            for token in position_tokens(value):
+                values_by_token.setdefault(token, []).append(value)
+        return {token: self.indexes['Pos'].union(values) for token, values in values_by_token.items()}
+
+    def updated(self, rows: List[Dict], version: Optional[Dict] = None) -> 'PlayerSnapshot':
+        """Nouveau snapshot intégrant des lignes insérées ou modifiées
+
+        Colonnes copiées puis modifiées en place ; seuls les bitmaps des
+        valeurs touchées (ancienne et nouvelle valeur de chaque ligne) sont
+        recalculés, les autres sont partagés avec ce snapshot.
+        """
+        snapshot = PlayerSnapshot.__new__(PlayerSnapshot)
+        snapshot.version = version['version'] if version else None
+        snapshot.data_version = version
+        snapshot.records = list(self.records)
+        snapshot.row_of = dict(self.row_of)
+        player_ids = list(self.player_ids)
+        numeric = {column: list(values) for column, values in self.numeric.items()}
+        codes = {column: list(values) for column, values in self.codes.items()}
+        categories = {column: list(values) for column, values in self.categories.items()}
+        code_of = {column: {value: code for code, value in enumerate(values)}
+                   for column, values in categories.items()}
+        folded_lists = {column: list(values) for column, values in self._folded_lists.items()}
+        changed = {column: set() for column in CATEGORY_COLUMNS}
+        renamed = {}
+        touched = []
+
+        for row in rows:
+            player_id = int(row['player_id'])
+            position = snapshot.row_of.get(player_id)
+            if position is None:
+                position = snapshot.row_of[player_id] = len(player_ids)
+                player_ids.append(player_id)
+                snapshot.records.append(None)
+                for column in NUMERIC_COLUMNS:
+                    numeric[column].append(np.nan)
+                for column in CATEGORY_COLUMNS:
+                    codes[column].append(-1)
+                for column in TEXT_COLUMNS:
+                    folded_lists[column].append('')
+            touched.append(position)
+            snapshot.records[position] = format_player_row(row)
+            for column in NUMERIC_COLUMNS:
+                numeric[column][position] = _to_float(row[column])
+            for column in CATEGORY_COLUMNS:
+                value = row[column] or ''
+                code = code_of[column].get(value)
+                if code is None:
+                    code = code_of[column][value] = len(categories[column])
+                    categories[column].append(value)
+                previous = codes[column][position]
+                if previous != code:
+                    if previous >= 0:
+                        changed[column].add(categories[column][previous])
+                    changed[column].add(value)
+                    codes[column][position] = code
+            for column in TEXT_COLUMNS:
+                folded = fold(row[column])
+                if column == 'Player' and folded != folded_lists[column][position]:
+                    old = renamed[position][0] if position in renamed else folded_lists[column][position]
+                    renamed[position] = (old, folded)
+                folded_lists[column][position] = folded
+
+        snapshot.size = len(player_ids)
+        snapshot.player_ids = np.array(player_ids, dtype=np.int64)
+        snapshot.numeric = {column: np.array(values, dtype=np.float64) for column, values in numeric.items()}
+        snapshot.categories = categories
+        snapshot.codes = {column: np.array(values, dtype=np.int32) for column, values in codes.items()}
+        snapshot.indexes = {
+            column: self.indexes[column].updated(snapshot.codes[column], categories[column], changed[column])
+            for column in CATEGORY_COLUMNS
+        }
+        snapshot._folded_lists = folded_lists
+        snapshot.folded = {column: np.array(values, dtype=str) for column, values in folded_lists.items()}
+        snapshot.position_index = snapshot._build_position_index()
+        snapshot._name_index = None
+        if self._name_index is not None:
+            snapshot._name_index = self._name_index.updated(snapshot.folded['Player'], renamed)
+        snapshot._prefix_index = None
+        if self._prefix_index is not None:
+            snapshot._prefix_index = self._prefix_index.updated(
+                snapshot.folded['Player'], snapshot.numeric['MarketValue'], touched
+            )
+        snapshot._percentile_index = None
+        if self._percentile_index is not None:
+            # Groupes à reclasser : anciens et nouveaux postes des lignes relues
+            tokens = {token for value in changed['Pos'] for token in position_tokens(value)}
+            tokens.update(token for row in touched
+                          for token in position_tokens(categories['Pos'][snapshot.codes['Pos'][row]]))
+            snapshot._percentile_index = self._percentile_index.updated(
+                snapshot.position_index, snapshot.numeric, snapshot.size, tokens
+            )
+        return snapshot
+
+    def all(self) -> Bitmap:
+        return Bitmap.full(self.size)
+
+    def category_mask(self, column: str, predicate: Callable[[str], bool]) -> Bitmap:
+        """Évalue predicate une fois par valeur distincte ; union des bitmaps retenus"""
+        index = self.indexes[column]
+        return index.union(value for value in index.bitmaps if predicate(value))
+
+    def positions(self, *tokens: str) -> Bitmap:
+        """Joueurs ayant au moins un des postes élémentaires (FW, MF, DF, GK)"""
+        result = Bitmap(np.zeros(0, dtype=np.int64), self.size)
+        for token in tokens:
+            bitmap = self.position_index.get(token.strip().upper())
+            if bitmap is not None:
+                result = result | bitmap
+        return result
+
+    def like(self, column: str, *patterns: str):
+        """column LIKE p1 OR column LIKE p2... (insensible à la casse et aux accents)"""
+        regexes = [like_regex(pattern) for pattern in patterns]
+        if column in CATEGORY_COLUMNS:
+            return self.category_mask(
+                column, lambda value: any(regex.fullmatch(fold(value)) for regex in regexes)
+            )
+
+        values = self.folded[column]
+        mask = np.zeros(self.size, dtype=bool)
+        for pattern, regex in zip(patterns, regexes):
+            literal = _plain_contains(pattern)
+            if literal is not None:
+                mask |= np.char.find(values, literal) >= 0
+            else:
+                mask |= np.fromiter((bool(regex.fullmatch(value)) for value in values),
+                                    dtype=bool, count=self.size)
+        return mask
+
+    def name_search(self, query: str, limit: Optional[int] = None, within=None, after=None):
+        """Recherche approchée sur les noms : (lignes, scores) par pertinence, valeur marchande puis player_id
+
+        within restreint les résultats (bitmap ou masque d'autres filtres) ;
+        after = [score, valeur, player_id] de la dernière ligne déjà servie.
+        """
+        rows, scores = self.name_index.search(fold(query))
+        if within is not None and len(rows):
+            keep = within.contains(rows) if isinstance(within, Bitmap) else within[rows]
+            rows, scores = rows[keep], scores[keep]
+        spec = [('MarketValue', 'desc')]
+        keys = [-scores, *_order_keys([self.numeric['MarketValue'][rows]], self.player_ids[rows], spec)]
+        if after is not None:
+            bound = [-float(after[0]), *_cursor_bound(after[1:], spec)]
+            keep = _after(keys, bound)
+            rows, scores, keys = rows[keep], scores[keep], [key[keep] for key in keys]
+        order = np.lexsort(keys[::-1])
+        if limit is not None:
+            order = order[:limit]
+        return rows[order], scores[order]
+
+    def autocomplete(self, prefix: str, limit: int = 10) -> List[Dict]:
+        """Joueurs dont le nom ou un de ses mots commence par prefix, par valeur marchande décroissante"""
+        return [self.records[row] for row in self.prefix_index.complete(fold(prefix), limit)]
+
+    def percentiles(self, player_id: int, position: Optional[str] = None) -> Optional[Dict]:
+        """{poste: {statistique: rang}} d'un joueur parmi chacun de ses postes, None s'il est inconnu"""
+        row = self.row_of.get(int(player_id))
+        if row is None:
+            return None
+        tokens = position_tokens(self.records[row]['Pos'])
+        if position:
+            tokens = [token for token in tokens if token == position.strip().upper()]
+        return self.percentile_index.ranks(row, tokens)
+
+    def equals(self, column: str, value: str) -> Bitmap:
+        """column = value selon la collation (casse, accents et espaces finaux ignorés)"""
+        expected = fold(value).rstrip()
+        return self.category_mask(column, lambda candidate: fold(candidate).rstrip() == expected)
+
+    def range(self, column: str, minimum=None, maximum=None, greater_than=None) -> np.ndarray:
+        """minimum <= column <= maximum (et column > greater_than) ; NULL jamais retenu"""
+        values = self.numeric[column]
+        mask = ~np.isnan(values)
+        if minimum is not None:
+            mask &= values >= minimum
+        if maximum is not None:
+            mask &= values <= maximum
+        if greater_than is not None:
+            mask &= values > greater_than
+        return mask
+
+    @staticmethod
+    def count(mask) -> int:
+        """Nombre de lignes retenues (gratuit pour un bitmap)"""
+        return len(mask) if isinstance(mask, Bitmap) else int(np.count_nonzero(mask))
+
+    def page(self, mask, spec=DEFAULT_SORT, limit: int = 100, after=None) -> Tuple[List[Dict], Optional[List]]:
+        """ORDER BY spec, player_id LIMIT limit, à partir du curseur after = [valeurs..., player_id]
+
+        spec : [(colonne numérique, 'asc' | 'desc'), ...] ; NULL en dernier en
+        DESC, en premier en ASC (comme MySQL) ; player_id départage dans le
+        sens de la dernière clé.
+        Retourne (joueurs, clés de la dernière ligne s'il reste des résultats).
+        Coût indépendant de la profondeur : seules les lignes après le curseur
+        sont départagées, et seul le top-k est trié (sélection partielle sur
+        la première clé, puis tri des seuls candidats).
+        """
+        rows = mask.rows() if isinstance(mask, Bitmap) else np.flatnonzero(mask)
+        if limit <= 0 or not len(rows):
+            return [], None
+        keys = _order_keys([self.numeric[column][rows] for column, _ in spec], self.player_ids[rows], spec)
+        if after is not None:
+            keep = _after(keys, _cursor_bound(after, spec))
+            rows, keys = rows[keep], [key[keep] for key in keys]
+        wanted = limit + 1
+        if len(rows) > wanted:
+            # Sélection partielle ; les ex aequo de la k-ième valeur sont gardés pour le départage
+            kth = np.partition(keys[0], wanted - 1)[wanted - 1]
+            keep = keys[0] <= kth
+            rows, keys = rows[keep], [key[keep] for key in keys]
+        rows = rows[np.lexsort(keys[::-1])[:wanted]]
+
+        next_after = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_after = self.cursor_keys(rows[-1], spec)
+        return [dict(self.records[row]) for row in rows], next_after
+
+    def cursor_keys(self, row: int, spec=DEFAULT_SORT) -> List:
+        """[valeurs des clés de tri..., player_id] d'une ligne pour un curseur (NULL -> None)"""
+        values = [self.numeric[column][row] for column, _ in spec]
+        return [None if np.isnan(value) else float(value) for value in values] + [int(self.player_ids[row])]
+
+    def top(self, mask, sort_order: str = 'desc', limit: int = 100,
+            column: str = 'MarketValue') -> List[Dict]:
+        """ORDER BY column, player_id LIMIT limit (première page de page())"""
+        return self.page(mask, [(column, sort_order)], limit)[0]
+
+    def index_stats(self) -> Dict:
+        stats = {column: index.stats() for column, index in self.indexes.items()}
+        stats['position_tokens'] = {
+            'keys': len(self.position_index),
+            'bytes': sum(bitmap.nbytes for bitmap in self.position_index.values())
+        }
+        stats['names'] = self._name_index.stats() if self._name_index is not None else None
+        stats['prefixes'] = self._prefix_index.stats() if self._prefix_index is not None else None
+        stats['percentiles'] = self._percentile_index.stats() if self._percentile_index is not None else None
+        return stats
+
+class PlayerSnapshotStore:
+    """Snapshot courant : chargé en arrière-plan, reconstruit quand la version des données change
+
+    MySQL reste la source de vérité : tant que le snapshot ne correspond pas
+    à la version courante (démarrage, écriture récente), current() retourne
+    None et les appelants interrogent la base.
+    """
+
+    def __init__(self, enabled: bool = True, retry_interval: float = 5):
+        self.enabled = enabled
+        self.retry_interval = retry_interval
+        self._snapshot: Optional[PlayerSnapshot] = None
+        self._lock = threading.Lock()
+        self._thread = None
+        self._last_attempt = 0.0
+        self.hits = 0
+        self.fallbacks = 0
+        self.rebuilds = 0
+        self.built_at = None
+        self.build_ms = None
+        self.last_error = None
+        self.last_mode = None
+
+    def current(self) -> Optional[PlayerSnapshot]:
+        """Snapshot à jour, ou None (reconstruction demandée en arrière-plan)"""
+        if not self.enabled:
+            return None
+        snapshot = self._snapshot
+        version = fetch_data_version()
+        if snapshot is None or version is None or snapshot.version != version['version']:
+            self.fallbacks += 1
+            if version is not None:
+                self.request_rebuild()
+            return None
+        self.hits += 1
+        return snapshot
+
+    def start(self):
+        """Chargement initial en arrière-plan"""
+        if self.enabled:
+            self.request_rebuild()
+
+    def request_rebuild(self):
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if self.last_error is not None and time.monotonic() - self._last_attempt < self.retry_interval:
+                return
+            self._last_attempt = time.monotonic()
+            self._thread = threading.Thread(target=self.rebuild, name='player-snapshot', daemon=True)
+            self._thread.start()
+
+    def rebuild(self, full: bool = False) -> bool:
+        """Met à jour le snapshot (version relevée avant la lecture des lignes)
+
+        La fraîcheur suit les compteurs d'écriture de data_version. Incrémental
+        quand seuls des joueurs ont été ajoutés ou modifiés : les lignes dont
+        updated_at dépasse le dernier MAX(updated_at), moins une marge, sont
+        relues. Rechargement complet au démarrage, si les styles ont changé
+        ou si des joueurs ont été supprimés (nombre de joueurs en baisse, ou
+        taille du snapshot différente du nombre de lignes après relecture).
+        """
+        start = time.monotonic()
+        try:
+            version = fetch_data_version()
+            current = self._snapshot
+            snapshot = None
+            if not full and current is not None and self._can_update(current, version):
+                since = current.data_version['players_updated'] - INCREMENTAL_OVERLAP
+                rows = self._read_rows(PLAYERS_BASE_QUERY + " WHERE p.updated_at >= %s", (since,))
+                snapshot = current.updated(rows, version)
+                if snapshot.size != version['players_count']:
+                    # Suppression compensée par un ajout : l'incrémental ne la voit pas
+                    snapshot = None
+                else:
+                    mode = f"incrémental, {len(rows)} lignes relues"
+            if snapshot is None:
+                snapshot = PlayerSnapshot(self._read_rows(PLAYERS_BASE_QUERY), version)
+                mode = 'complet'
+            # Index des noms et rangs centiles construits ici, hors requête (puis tenus à jour par updated())
+            snapshot.name_index
+            snapshot.prefix_index
+            snapshot.percentile_index
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"⚠️  Snapshot joueurs non reconstruit: {e}")
+            return False
+
+        self._snapshot = snapshot
+        self.rebuilds += 1
+        self.last_error = None
+        self.built_at = time.time()
+        self.build_ms = round((time.monotonic() - start) * 1000, 1)
+        self.last_mode = mode
+        print(f"✅ Snapshot joueurs à jour ({snapshot.size} lignes, {mode}) en {self.build_ms} ms")
+        return True
+
+    @staticmethod
+    def _can_update(current: PlayerSnapshot, version: Optional[Dict]) -> bool:
+        """Mise à jour incrémentale possible : mêmes styles, aucun joueur en moins"""
+        previous = current.data_version
+        return bool(
+            version and previous and previous['players_updated'] is not None
+            and previous['styles_version'] == version['styles_version']
+            and version['players_version'] >= previous['players_version']
+            and version['players_count'] >= previous['players_count']
+        )
+
+    @staticmethod
+    def _read_rows(query: str, params: tuple = None) -> List[Dict]:
+        rows = []
+        for batch in db.stream_query(query, params, batch_size=1000):
+            rows.extend(batch)
+        return rows
+
+    def stats(self) -> Dict:
+        snapshot = self._snapshot
+        return {
+            'enabled': self.enabled,
+            'loaded': snapshot is not None,
+            'rows': snapshot.size if snapshot else 0,
+            'version': snapshot.version if snapshot else None,
+            'built_at': self.built_at,
+            'build_ms': self.build_ms,
+            'rebuilds': self.rebuilds,
+            'last_mode': self.last_mode,
+            'hits': self.hits,
+            'fallbacks': self.fallbacks,
+            'last_error': self.last_error,
+            'indexes': snapshot.index_stats() if snapshot else None
+        }
+
+# Instance globale (PLAYER_SNAPSHOT=0 pour toujours interroger MySQL)
+player_snapshot = PlayerSnapshotStore(enabled=Config.PLAYER_SNAPSHOT)
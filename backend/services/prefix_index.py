@@ -0,0 +1,122 @@
+# backend/services/prefix_index.py
+from typing import Dict, Iterable, List, Tuple
+import numpy as np
+from services.name_index import WORD_RE
+
+# Préfixes courts (1-2 lettres) : leurs meilleurs résultats sont précalculés
+SHORT_PREFIX = 2
+TOP_K = 20
+
+def name_keys(folded: str) -> List[str]:
+    """'kylian mbappe lottin' -> ['kylian mbappe lottin', 'mbappe lottin', 'lottin']"""
+    words = WORD_RE.findall(folded)
+    return [' '.join(words[start:]) for start in range(len(words))]
+
+def normalize_prefix(folded: str) -> str:
+    """Mots séparés par une espace ; l'espace finale (mot terminé) est conservée"""
+    prefix = ' '.join(WORD_RE.findall(folded))
+    if prefix and folded[-1:].isspace():
+        prefix += ' '
+    return prefix
+
+class PrefixIndex:
+    """Autocomplétion : tableau trié des noms repliés et de leurs fins (nom de famille...)
+
+    Un préfixe correspond à une plage contiguë du tableau (deux recherches
+    dichotomiques) ; les lignes de la plage sont classées par valeur
+    marchande. Pour les préfixes d'une ou deux lettres, dont les plages sont
+    longues, le classement est précalculé.
+    """
+
+    def __init__(self, keys: np.ndarray, rows: np.ndarray, values: np.ndarray, tops: Dict[str, np.ndarray]):
+        self.keys = keys
+        self.rows = rows
+        self.values = values
+        self.tops = tops
+
+    @staticmethod
+    def _entries(folded_names: Iterable[Tuple[int, str]]) -> Tuple[np.ndarray, np.ndarray]:
+        keys, rows = [], []
+        for row, name in folded_names:
+            for key in name_keys(name):
+                keys.append(key)
+                rows.append(row)
+        keys = np.array(keys, dtype=str)
+        rows = np.array(rows, dtype=np.int64)
+        order = np.argsort(keys, kind='stable')
+        return keys[order], rows[order]
+
+    @classmethod
+    def build(cls, folded: np.ndarray, market_values: np.ndarray) -> 'PrefixIndex':
+        keys, rows = cls._entries(enumerate(str(name) for name in folded))
+        index = cls(keys, rows, _ranking_values(market_values), {})
+        index.tops = {prefix: index._rank_range(prefix, TOP_K) for prefix in index._short_prefixes(keys)}
+        return index
+
+    def updated(self, folded: np.ndarray, market_values: np.ndarray, changed: Iterable[int]) -> 'PrefixIndex':
+        """Nouvel index après modification des lignes changed (nom ou valeur marchande)
+
+        Les entrées de ces lignes sont retirées puis réinsérées à leur place
+        (fusion de tableaux triés) ; seuls les préfixes courts qu'elles
+        touchent sont reclassés.
+        """
+        changed = np.array(sorted(set(changed)), dtype=np.int64)
+        stale = np.isin(self.rows, changed)
+        new_keys, new_rows = self._entries((int(row), str(folded[row])) for row in changed)
+        keys = self.keys[~stale].astype(np.result_type(self.keys, new_keys))
+        positions = np.searchsorted(keys, new_keys, side='right')
+        keys = np.insert(keys, positions, new_keys)
+        rows = np.insert(self.rows[~stale], positions, new_rows)
+
+        index = PrefixIndex(keys, rows, _ranking_values(market_values), dict(self.tops))
+        for prefix in self._short_prefixes(self.keys[stale]) | self._short_prefixes(new_keys):
+            ranked = index._rank_range(prefix, TOP_K)
+            if len(ranked):
+                index.tops[prefix] = ranked
+            else:
+                index.tops.pop(prefix, None)
+        return index
+
+    @staticmethod
+    def _short_prefixes(keys: np.ndarray) -> set:
+        prefixes = set()
+        for length in range(1, SHORT_PREFIX + 1):
+            prefixes.update(str(prefix) for prefix in np.unique(keys.astype(f'U{length}')))
+        return {prefix for prefix in prefixes if prefix.strip()}
+
+    def _range(self, prefix: str) -> np.ndarray:
+        start = np.searchsorted(self.keys, prefix, side='left')
+        end = np.searchsorted(self.keys, prefix + '\U0010ffff', side='left')
+        return self.rows[start:end]
+
+    def _rank_range(self, prefix: str, limit: int) -> np.ndarray:
+        # Une ligne peut apparaître sous plusieurs clés (nom complet, nom de famille...) :
+        # dédoublonnage par tri, bien plus rapide que np.unique sur ces petits tableaux
+        rows = np.sort(self._range(prefix))
+        rows = rows[np.concatenate(([True], rows[1:] != rows[:-1]))] if len(rows) else rows
+        if len(rows) > limit:
+            # Sélection partielle ; les ex aequo de la k-ième valeur sont gardés pour le départage
+            kth = np.partition(self.values[rows], limit - 1)[limit - 1]
+            rows = rows[self.values[rows] <= kth]
+        # Valeur marchande décroissante ; ex aequo : ordre de la table
+        return rows[np.lexsort((rows, self.values[rows]))][:limit]
+
+    def complete(self, folded_prefix: str, limit: int = 10) -> np.ndarray:
+        """Lignes dont le nom, ou un de ses mots, commence par le préfixe"""
+        prefix = normalize_prefix(folded_prefix)
+        if not prefix.strip() or limit <= 0:
+            return np.zeros(0, dtype=np.int64)
+        if len(prefix) <= SHORT_PREFIX and limit <= TOP_K:
+            return self.tops.get(prefix, np.zeros(0, dtype=np.int64))[:limit]
+        return self._rank_range(prefix, limit)
+
+    def stats(self) -> Dict:
+        return {
+            'entries': len(self.keys),
+            'bytes': self.keys.nbytes + self.rows.nbytes,
+            'short_prefixes': len(self.tops)
+        }
+
+def _ranking_values(market_values: np.ndarray) -> np.ndarray:
+    """Clé de tri croissante : -valeur marchande, NULL en dernier"""
+    return -np.where(np.isnan(market_values), -np.inf, market_values)
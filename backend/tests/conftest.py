@@ -0,0 +1,46 @@
+# backend/tests/conftest.py
+"""
+Configuration commune des tests unitaires
+Lancement depuis backend/ : python -m pytest tests
+"""
+
+import os
+import random
+import sys
+import pytest
+
+# Imports du projet (config, services, utils) comme depuis app.py
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+NAMES = ['Kylian Mbappé', 'Luka Modrić', 'Erling Haaland', 'Pedri', 'Jude Bellingham', 'Martin Ødegaard',
+         'Vinícius Júnior', 'Rodri', 'Bukayo Saka', 'Florian Wirtz', 'Jamal Musiala', 'Declan Rice']
+POSITIONS = ['FW', 'MF', 'DF', 'GK', 'MF,FW', 'DF,MF', 'FW,MF']
+SQUADS = ['Real Madrid', 'Manchester City', 'Arsenal', 'Barcelona', 'Bayern Munich']
+STYLES = ['football total', 'jeu de possession', 'jeu direct', 'pressing intense', '']
+
+def player_row(player_id: int, rng: random.Random, **overrides):
+    """Ligne au format de PLAYERS_BASE_QUERY, avec des NULL et des ex aequo"""
+    def stat(maximum):
+        return None if rng.random() < 0.1 else rng.randint(0, maximum)
+    row = {
+        'player_id': player_id,
+        'Player': f"{rng.choice(NAMES)} {player_id}",
+        'Age': rng.randint(17, 38),
+        'Pos': rng.choice(POSITIONS),
+        'Squad': rng.choice(SQUADS),
+        'style': rng.choice(STYLES),
+        'MarketValue': None if rng.random() < 0.05 else rng.choice([1, 5, 10, 25, 50, 80]) * 1_000_000,
+        'Gls': stat(30), 'Ast': stat(15), 'xG': stat(25), 'xAG': stat(12),
+        'Tkl': stat(90), 'PrgP': stat(200), 'Carries': stat(150), 'KP': stat(60),
+        'image_url': ''
+    }
+    row.update(overrides)
+    return row
+
+@pytest.fixture
+def make_players():
+    """make_players(count, seed=0, first_id=1) -> lignes joueurs reproductibles"""
+    def make(count, seed=0, first_id=1):
+        rng = random.Random(seed)
+        return [player_row(player_id, rng) for player_id in range(first_id, first_id + count)]
+    return make
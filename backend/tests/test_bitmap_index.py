@@ -0,0 +1,68 @@
+# backend/tests/test_bitmap_index.py
+import numpy as np
+import pytest
+from services.bitmap_index import Bitmap, BitmapIndex
+
+SIZE = 1000
+
+def bitmap(rows):
+    return Bitmap(np.array(sorted(rows), dtype=np.int64), SIZE)
+
+@pytest.fixture
+def sets():
+    rng = np.random.default_rng(0)
+    return {
+        'empty': set(),
+        'sparse': set(rng.choice(SIZE, 20, replace=False).tolist()),
+        'other_sparse': set(rng.choice(SIZE, 25, replace=False).tolist()),
+        'dense': set(rng.choice(SIZE, 600, replace=False).tolist()),
+        'other_dense': set(rng.choice(SIZE, 400, replace=False).tolist()),
+    }
+
+def test_container_follows_density(sets):
+    assert bitmap(sets['sparse'])._rows is not None
+    assert bitmap(sets['dense'])._bits is not None
+    for rows in sets.values():
+        assert len(bitmap(rows)) == len(rows)
+        assert set(bitmap(rows).rows().tolist()) == rows
+
+@pytest.mark.parametrize('left', ['empty', 'sparse', 'dense'])
+@pytest.mark.parametrize('right', ['empty', 'other_sparse', 'other_dense'])
+def test_and_or_match_set_operations(sets, left, right):
+    a, b = bitmap(sets[left]), bitmap(sets[right])
+    assert set((a & b).rows().tolist()) == sets[left] & sets[right]
+    assert set((a | b).rows().tolist()) == sets[left] | sets[right]
+    assert len(a | b) == len(sets[left] | sets[right])
+
+def test_and_with_numeric_mask_returns_mask(sets):
+    mask = np.zeros(SIZE, dtype=bool)
+    mask[:500] = True
+    for rows in (sets['sparse'], sets['dense']):
+        result = bitmap(rows) & mask
+        assert isinstance(result, np.ndarray)
+        assert set(np.flatnonzero(result).tolist()) == {row for row in rows if row < 500}
+        assert set(np.flatnonzero(mask & bitmap(rows)).tolist()) == {row for row in rows if row < 500}
+
+def test_contains(sets):
+    probe = np.arange(SIZE)
+    for rows in (sets['sparse'], sets['dense']):
+        assert set(probe[bitmap(rows).contains(probe)].tolist()) == rows
+
+def test_index_build_and_incremental_update():
+    categories = ['Arsenal', 'Barcelona', 'Real Madrid']
+    codes = np.array([0, 1, 2, 0, 0, 1, 2, 2, 2, 0], dtype=np.int32)
+    index = BitmapIndex.build(codes, categories)
+    assert index.get('Arsenal').rows().tolist() == [0, 3, 4, 9]
+    assert len(index.get('Inconnu')) == 0
+    assert index.union(['Barcelona', 'Real Madrid']).rows().tolist() == [1, 2, 5, 6, 7, 8]
+
+    # Ligne 1 : Barcelona -> Arsenal ; ligne ajoutée (10) : nouveau club
+    codes = np.append(codes, 3).astype(np.int32)
+    codes[1] = 0
+    categories = categories + ['Bayern']
+    updated = index.updated(codes, categories, ['Barcelona', 'Arsenal', 'Bayern'])
+    rebuilt = BitmapIndex.build(codes, categories)
+    assert set(updated.bitmaps) == set(rebuilt.bitmaps)
+    for value, expected in rebuilt.bitmaps.items():
+        assert updated.get(value).rows().tolist() == expected.rows().tolist()
+        assert updated.get(value).size == 11
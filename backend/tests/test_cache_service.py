@@ -0,0 +1,293 @@
+# backend/tests/test_cache_service.py
+import gzip
+import json
+import threading
+import time
+from datetime import date, datetime
+from decimal import Decimal
+import pytest
+from services.cache_backends import InMemoryBackend
+from services.cache_service import (
+    GZIP_MIN_SIZE, CacheService, EncodedBody, decode_value, encode_value, estimate_size, make_key
+)
+
+def test_lru_evicts_least_recently_used():
+    cache = CacheService(max_entries=3)
+    for key in ('a', 'b', 'c'):
+        cache.set(key, key)
+    # 'a' relu : c'est 'b' la moins récemment utilisée
+    assert cache.get('a') == 'a'
+    cache.set('d', 'd')
+    assert cache.get('b') is None
+    assert [cache.get(key) for key in ('a', 'c', 'd')] == ['a', 'c', 'd']
+    assert cache.stats()['evictions'] == 1
+
+def test_size_bound_evicts_until_under_max_bytes():
+    value = 'x' * 1000
+    cache = CacheService(max_entries=100, max_bytes=estimate_size(value) * 3)
+    for index in range(5):
+        cache.set(f"k{index}", value)
+    stats = cache.stats()
+    assert stats['entries'] == 3
+    assert stats['bytes'] <= stats['max_bytes']
+    assert stats['evictions'] == 2
+    assert cache.get('k0') is None and cache.get('k4') == value
+
+def test_value_larger_than_cache_is_rejected():
+    cache = CacheService(max_bytes=100)
+    cache.set('big', 'x' * 1000)
+    assert cache.get('big') is None
+    assert cache.stats()['rejected'] == 1
+
+def test_expired_entries_are_purged_on_stats():
+    cache = CacheService()
+    cache.set('short', 1, ttl=0.01)
+    cache.set('long', 2, ttl=60)
+    time.sleep(0.02)
+    stats = cache.stats()
+    assert stats['entries'] == 1
+    assert stats['expirations'] == 1
+
+def test_set_purges_every_expired_entry():
+    cache = CacheService()
+    for i in range(3):
+        cache.set(f"short{i}", i, ttl=0.01)
+    time.sleep(0.02)
+    cache.set('fresh', 1)
+    assert cache.expirations == 3
+    assert len(cache._cache) == 1
+
+def test_sweeper_frees_expired_entries_without_traffic():
+    cache = CacheService()
+    cache.set('short', 1, ttl=0.01)
+    cache.start_sweeper(0.02)
+    deadline = time.time() + 2
+    while cache.expirations == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    assert cache.expirations == 1
+    assert len(cache._cache) == 0
+
+def test_invalidate_tags_removes_dependent_entries():
+    cache = CacheService()
+    cache.set('players_list', [1, 2], tags=['players'])
+    cache.set('players_styles', [3], tags=['players', 'styles'])
+    cache.set('favorites', [4], tags=['favorites:1'])
+    assert cache.invalidate_tags(['players']) == 2
+    assert cache.get('players_list') is None and cache.get('players_styles') is None
+    assert cache.get('favorites') == [4]
+    assert cache.stats()['tags'] == 1
+
+def test_value_computed_before_invalidation_is_not_stored():
+    cache = CacheService()
+    versions = cache.tag_versions(['players'])
+    # Écriture pendant le calcul : le résultat est déjà périmé
+    cache.invalidate_tags(['players'])
+    cache.set('players_list', [1], tags=versions)
+    assert cache.get('players_list') is None
+
+def test_cached_decorator_recomputes_after_invalidation():
+    cache = CacheService()
+    calls = []
+
+    @cache.cached(ttl=60, tags=['players'])
+    def count_players(position):
+        calls.append(position)
+        return len(calls)
+
+    assert count_players('MF') == 1
+    assert count_players('MF') == 1
+    cache.invalidate_tags(['players'])
+    assert count_players('MF') == 2
+    assert calls == ['MF', 'MF']
+
+def test_tag_invalidation_reaches_other_workers_through_shared_backend():
+    backend = InMemoryBackend()
+    worker_a = CacheService(backend=backend)
+    worker_b = CacheService(backend=backend)
+    worker_a.set('players_list', [1, 2], tags=['players'])
+    assert worker_b.get('players_list') == [1, 2]
+    worker_a.invalidate_tags(['players'])
+    assert worker_b.get('players_list') is None
+    assert worker_a.get('players_list') is None
+
+def test_concurrent_misses_compute_once():
+    cache = CacheService()
+    calls = []
+    release = threading.Event()
+
+    @cache.cached(ttl=60)
+    def slow_lookup(player_id):
+        calls.append(player_id)
+        release.wait(2)
+        return {'player_id': player_id}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(slow_lookup(7))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    while not calls:
+        time.sleep(0.001)
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert calls == [7]
+    assert results == [{'player_id': 7}] * 5
+    counters = cache.function_stats()[f"{slow_lookup.__module__}.{slow_lookup.__qualname__}"]
+    assert counters['misses'] == 5 and counters['coalesced'] == 4
+
+def test_waiters_receive_the_leader_error():
+    cache = CacheService()
+    started = threading.Event()
+    release = threading.Event()
+
+    @cache.cached(ttl=60)
+    def failing_lookup():
+        started.set()
+        release.wait(2)
+        raise RuntimeError("base indisponible")
+
+    errors = []
+
+    def call():
+        try:
+            failing_lookup()
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(2)
+    waiter = threading.Thread(target=call)
+    waiter.start()
+    time.sleep(0.05)
+    release.set()
+    leader.join()
+    waiter.join()
+    assert errors == ["base indisponible"] * 2
+    assert cache.stats()['in_flight'] == 0
+
+def test_waiter_computes_itself_after_wait_timeout():
+    cache = CacheService(wait_timeout=0.01)
+    release = threading.Event()
+    calls = []
+
+    @cache.cached(ttl=60)
+    def lookup():
+        calls.append(threading.current_thread().name)
+        if len(calls) == 1:
+            release.wait(2)
+        return len(calls)
+
+    leader = threading.Thread(target=lookup, name='leader')
+    leader.start()
+    while not calls:
+        time.sleep(0.001)
+    assert lookup() == 2
+    release.set()
+    leader.join()
+    assert cache.stats()['wait_timeouts'] == 1
+
+def test_stale_value_is_served_while_refreshing_in_background():
+    cache = CacheService()
+    calls = []
+
+    @cache.cached(ttl=0.05, stale_ttl=60)
+    def dashboard():
+        calls.append(time.time())
+        return len(calls)
+
+    assert dashboard() == 1
+    time.sleep(0.06)
+    # Valeur expirée servie immédiatement ; le rafraîchissement tourne en arrière-plan
+    assert dashboard() == 1
+    deadline = time.time() + 2
+    while cache.stats()['refreshes'] == 0 and time.time() < deadline:
+        time.sleep(0.01)
+    assert dashboard() == 2
+    assert cache.stats()['stale_served'] == 1
+
+def test_namespace_stats_group_entries_and_calls_by_function():
+    cache = CacheService(max_entries=2)
+
+    @cache.cached(ttl=60)
+    def player(player_id):
+        return {'player_id': player_id}
+
+    namespace = f"{player.__module__}.{player.__qualname__}"
+    for player_id in (1, 2, 1, 3):
+        player(player_id)
+    cache.set('raw-key', 'x')
+    stats = cache.namespace_stats()
+    assert stats[namespace]['entries'] == 1 and stats[namespace]['evictions'] == 2
+    assert stats[namespace]['calls']['hits'] == 1 and stats[namespace]['calls']['misses'] == 3
+    assert stats[namespace]['age_distribution']['<10s'] == 1 and stats[namespace]['bytes'] > 0
+    assert stats['raw-key']['entries'] == 1 and stats['raw-key']['calls'] is None
+
+def test_invalidate_prefix_removes_one_function_only():
+    cache = CacheService()
+    for position in ('MF', 'FW'):
+        cache.set(make_key('app.fetch_filtered_players', position), [position])
+    cache.set(make_key('app.fetch_all_players', 1), [1])
+    assert cache.invalidate_prefix('app.fetch_filtered_players') == 2
+    assert cache.get(make_key('app.fetch_all_players', 1)) == [1]
+    with pytest.raises(ValueError):
+        cache.invalidate_prefix('')
+
+def test_invalidate_tag_prefix_reaches_every_matching_tag():
+    backend = InMemoryBackend()
+    worker_a = CacheService(backend=backend)
+    worker_b = CacheService(backend=backend)
+    worker_a.set('favorites_1', [1], tags=['favorites:1'])
+    worker_b.set('favorites_2', [2], tags=['favorites:2'])
+    worker_b.set('players', [3], tags=['players'])
+    worker_a.invalidate_tag_prefix('favorites:')
+    assert worker_b.get('favorites_2') is None and worker_a.get('favorites_1') is None
+    assert worker_b.get('players') == [3]
+
+def test_encoded_body_compresses_large_bodies_deterministically():
+    players = [{'player_id': i, 'Player': f"Joueur {i}"} for i in range(200)]
+    body = EncodedBody.from_json(players, total=500)
+    assert json.loads(body.body) == players
+    assert gzip.decompress(body.gzipped) == body.body
+    assert EncodedBody.from_json(players).gzipped == body.gzipped
+    assert (body.count, body.total) == (200, 500)
+    small = EncodedBody.from_json({'ok': True})
+    assert len(small.body) < GZIP_MIN_SIZE and small.gzipped is None
+    assert EncodedBody.from_json(players, compress=False).gzipped is None
+    # Corps et version gzip comptent dans la limite en octets du cache
+    assert estimate_size(body) > len(body.body) + len(body.gzipped)
+
+def test_cached_json_serves_the_same_encoded_bytes():
+    cache = CacheService()
+    calls = []
+
+    @cache.cached_json(ttl=60)
+    def players(position):
+        calls.append(position)
+        return [{'position': position}] if position else None
+
+    first = players('MF')
+    assert isinstance(first, EncodedBody) and first.body == b'[{"position":"MF"}]'
+    assert players('MF') is first
+    assert players(None) is None and players(None) is None
+    assert calls == ['MF', None, None]
+
+def test_shared_backend_round_trips_values_without_pickle():
+    value = {
+        'body': EncodedBody.from_json(list(range(500)), next_cursor='abc'),
+        'values': (Decimal('12.50'), datetime(2026, 1, 15, 12, 30), date(2026, 1, 15), b'\x00\x01'),
+        1: 'clé entière'
+    }
+    restored = decode_value(json.loads(json.dumps(encode_value(value))))
+    body = restored['body']
+    assert (body.body, body.gzipped, body.etag) == (value['body'].body, value['body'].gzipped, value['body'].etag)
+    assert (body.count, body.next_cursor) == (500, 'abc')
+    assert restored['values'] == value['values'] and restored[1] == 'clé entière'
+    with pytest.raises(TypeError):
+        encode_value(object())
+
+    backend = InMemoryBackend()
+    CacheService(backend=backend).set('players', value['body'])
+    shared = CacheService(backend=backend).get('players')
+    assert shared.body == value['body'].body and shared.gzipped == value['body'].gzipped
@@ -0,0 +1,53 @@
+# backend/tests/test_cache_warmer.py
+import threading
+import time
+from services.cache_warmer import CacheWarmer
+
+def test_run_reports_progress_and_failures():
+    warmer = CacheWarmer(max_workers=2)
+    warmer.register('dashboard', lambda: {'players': 10})
+    warmer.register('players/all', lambda: [1, 2])
+    warmer.register('chatbot', lambda: 1 / 0)
+    status = warmer.run()
+    assert status['state'] == 'finished'
+    assert (status['total'], status['done'], status['failed'], status['runs']) == (3, 3, 1, 1)
+    assert status['tasks']['dashboard'].startswith('ok') and status['tasks']['chatbot'] == 'failed'
+    assert 'division by zero' in status['errors']['chatbot']
+    assert status['registered'] == ['dashboard', 'players/all', 'chatbot']
+    assert status['elapsed_ms'] is not None
+
+def test_concurrency_is_bounded():
+    warmer = CacheWarmer(max_workers=2)
+    lock = threading.Lock()
+    running = [0, 0]  # en cours, maximum observé
+
+    def task():
+        with lock:
+            running[0] += 1
+            running[1] = max(running[1], running[0])
+        time.sleep(0.02)
+        with lock:
+            running[0] -= 1
+
+    for index in range(6):
+        warmer.register(f"task{index}", task)
+    assert warmer.run()['max_workers'] == 2
+    assert running[1] == 2
+    assert warmer.run(max_workers=1)['max_workers'] == 1
+
+def test_start_runs_in_background_once_at_a_time():
+    warmer = CacheWarmer()
+    release = threading.Event()
+    warmer.register('slow', lambda: release.wait(2))
+    assert warmer.start()
+    assert not warmer.start()
+    deadline = time.time() + 2
+    while warmer.status()['state'] != 'running' and time.time() < deadline:
+        time.sleep(0.001)
+    assert warmer.status()['total'] == 1 and warmer.status()['done'] == 0
+    release.set()
+    warmer._thread.join(2)
+    assert warmer.status()['state'] == 'finished'
+    assert warmer.start()
+    warmer._thread.join(2)
+    assert warmer.status()['runs'] == 2
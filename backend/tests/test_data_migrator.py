@@ -0,0 +1,72 @@
+# backend/tests/test_data_migrator.py
+from contextlib import contextmanager
+import pytest
+from config.database import DatabaseConnection
+from services import data_migrator
+from services.data_migrator import DataMigrator
+
+class FakeDb:
+    """Base en mémoire : execute_query / execute_many enregistrent leurs appels"""
+
+    def __init__(self, players, positions):
+        self.tables = {'players': players, 'player_positions': positions}
+        self.reads = []
+        self.writes = []
+
+    def execute_query(self, query, params=None, fetch=True, prepared=False, primary=False):
+        self.reads.append((query, primary))
+        table = query.split('FROM ')[1].split()[0]
+        return [dict(row) for row in self.tables[table]]
+
+    def execute_many(self, query, data):
+        self.writes.append((query.split()[0], list(data)))
+        return True
+
+@pytest.fixture
+def fake_db(monkeypatch):
+    fake = FakeDb(
+        players=[{'player_id': 1, 'position': 'MF,FW'}, {'player_id': 2, 'position': 'DF'}],
+        positions=[{'player_id': 1, 'position': 'MF'}, {'player_id': 2, 'position': 'GK'}]
+    )
+    monkeypatch.setattr(data_migrator, 'db', fake)
+    return fake
+
+def test_sync_player_positions_reads_from_primary(fake_db):
+    assert DataMigrator().sync_player_positions()
+    assert len(fake_db.reads) == 2
+    assert all(primary for _, primary in fake_db.reads)
+
+def test_sync_player_positions_applies_targeted_diff(fake_db):
+    assert DataMigrator().sync_player_positions()
+    assert fake_db.writes == [
+        ('INSERT', [(1, 'FW'), (2, 'DF')]),
+        ('DELETE', [(2, 'GK')])
+    ]
+
+def test_sync_player_positions_fails_when_a_read_fails(fake_db, monkeypatch):
+    monkeypatch.setattr(fake_db, 'execute_query', lambda *args, **kwargs: None)
+    assert not DataMigrator().sync_player_positions()
+    assert fake_db.writes == []
+
+def test_execute_query_primary_skips_replicas_and_embedded_copy(monkeypatch):
+    connection = DatabaseConnection()
+    routed = []
+
+    class Cursor:
+        def execute(self, query, params):
+            pass
+
+        def fetchall(self):
+            return []
+
+    @contextmanager
+    def cursor(dictionary=False, readonly=False):
+        routed.append(readonly)
+        yield Cursor()
+
+    monkeypatch.setattr(connection, 'cursor', cursor)
+    monkeypatch.setattr(connection, 'fetch_prepared', lambda *args: pytest.fail("lecture préparée routée"))
+    connection.execute_query("SELECT player_id FROM players")
+    connection.execute_query("SELECT player_id FROM players", primary=True)
+    connection.execute_query("SELECT player_id FROM players", prepared=True, primary=True)
+    assert routed == [True, False, False]
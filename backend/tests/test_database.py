@@ -0,0 +1,214 @@
+# backend/tests/test_database.py
+import threading
+import time
+import pytest
+from flask import Flask, g, session
+from mysql.connector.errors import ProgrammingError
+from config.database import (
+    ConnectionPool, DatabaseConnection, PoolTimeoutError, PreparedStatementCache, ReplicaNode, ReplicaRouter,
+    is_read_statement, is_write_statement, written_table
+)
+
+class FakeCursor:
+    """Curseur préparé : compte les exécutions et retourne une ligne par requête"""
+
+    def __init__(self):
+        self.executed = []
+        self.closed = False
+        self.with_rows = True
+        self.column_names = ('query',)
+
+    def execute(self, query, params=()):
+        self.executed.append((query, params))
+
+    def fetchall(self):
+        return [(self.executed[-1][0],)]
+
+    def close(self):
+        self.closed = True
+
+class FakeRaw:
+    """Connexion MySQL minimale pour le pool"""
+
+    def __init__(self, connection_id=1):
+        self.connection_id = connection_id
+        self.server_host = 'localhost'
+        self.server_port = 3307
+        self.in_transaction = False
+        self.cursors = []
+
+    def cursor(self, prepared=False, **kwargs):
+        cursor = FakeCursor()
+        self.cursors.append(cursor)
+        return cursor
+
+    def is_connected(self):
+        return True
+
+    def close(self):
+        pass
+
+def new_statement_cache(max_size=2):
+    stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+    return PreparedStatementCache(max_size, stats, threading.Lock()), stats
+
+def test_statement_cache_reuses_cursor_and_evicts_least_recently_used():
+    statements, stats = new_statement_cache(max_size=2)
+    raw = FakeRaw()
+    first, _ = statements.get(raw, "SELECT 1")
+    statements.get(raw, "SELECT 2")
+    assert statements.get(raw, "SELECT 1")[0] is first
+    statements.get(raw, "SELECT 3")
+    assert len(statements) == 2
+    assert stats == {'hits': 1, 'misses': 3, 'evictions': 1}
+    # SELECT 2, le moins récemment utilisé, est évincé et son curseur fermé
+    assert raw.cursors[1].closed and not first.closed
+    assert statements.get(raw, "SELECT 1")[0] is first
+
+def test_statement_cache_is_cleared_after_reconnection():
+    statements, stats = new_statement_cache()
+    raw = FakeRaw(connection_id=1)
+    first, _ = statements.get(raw, "SELECT 1")
+    raw.connection_id = 2
+    second, _ = statements.get(raw, "SELECT 1")
+    assert second is not first and first.closed
+    assert stats['misses'] == 2 and stats['hits'] == 0
+
+def test_pool_counts_prepared_statements_across_connections():
+    pool = ConnectionPool(FakeRaw, pool_size=2, max_overflow=0, statement_cache_size=1)
+    conns = [pool.checkout(), pool.checkout()]
+    for conn in conns:
+        assert conn.execute_prepared("SELECT 1") == [{'query': "SELECT 1"}]
+        conn.execute_prepared("SELECT 1")
+    conns[0].execute_prepared("SELECT 2")
+    for conn in conns:
+        conn.close()
+    stats = pool.stats()['prepared_statements']
+    assert (stats['hits'], stats['misses'], stats['evictions']) == (2, 3, 1)
+    assert stats['cached'] == 2 and stats['cache_size'] == 1
+
+@pytest.fixture
+def routed_db():
+    """DatabaseConnection avec un primaire et une réplique saine, sur des connexions factices"""
+    connection = DatabaseConnection()
+    connection.replica_hosts = [('replica', 3306)]
+    connection.sticky_seconds = 5
+    connection._pool = ConnectionPool(FakeRaw)
+    replica = ReplicaNode('replica', 3306, ConnectionPool(FakeRaw))
+    replica.checked_at = time.monotonic()
+    connection._router = ReplicaRouter([replica], max_lag=5, check_interval=3600)
+    return connection
+
+@pytest.fixture
+def flask_app():
+    app = Flask(__name__)
+    app.secret_key = 'test'
+    return app
+
+def checkout_target(connection, readonly):
+    conn = connection._checkout(readonly)
+    conn.close()
+    return 'primary' if conn._pool is connection._pool else 'replica'
+
+def test_statement_classification():
+    for query in ("SELECT 1", "  with t AS (SELECT 1) SELECT * FROM t", "(SELECT 1) UNION (SELECT 2)",
+                  "SHOW TABLES", "explain SELECT 1"):
+        assert is_read_statement(query) and not is_write_statement(query)
+    for query in ("INSERT INTO players VALUES (1)", "update styles SET name = 'x'", "DELETE FROM favorites"):
+        assert is_write_statement(query) and not is_read_statement(query)
+    assert written_table("INSERT IGNORE INTO `player_positions` (player_id) VALUES (1)") == 'player_positions'
+    assert written_table("TRUNCATE TABLE Players") == 'players'
+    assert written_table("SELECT * FROM players") is None
+
+def test_reads_go_to_replica_outside_requests(routed_db):
+    assert checkout_target(routed_db, readonly=True) == 'replica'
+    assert checkout_target(routed_db, readonly=False) == 'primary'
+    stats = routed_db.replication_stats()
+    assert stats['replicas'][0]['reads'] == 1 and stats['primary_reads'] == 0
+
+def test_reads_stick_to_primary_after_a_write(routed_db, flask_app):
+    with flask_app.test_request_context():
+        assert checkout_target(routed_db, readonly=True) == 'replica'
+        routed_db._before_statement("UPDATE players SET age = 30 WHERE player_id = 1")
+        assert g.db_sticky_primary
+        assert checkout_target(routed_db, readonly=True) == 'primary'
+        last_write = session['_db_last_write']
+    # Requête suivante du même client : collante tant que sticky_seconds n'est pas écoulé
+    with flask_app.test_request_context():
+        session['_db_last_write'] = last_write
+        assert checkout_target(routed_db, readonly=True) == 'primary'
+        session['_db_last_write'] = time.time() - routed_db.sticky_seconds - 1
+        assert checkout_target(routed_db, readonly=True) == 'replica'
+    assert routed_db.replication_stats()['primary_reads'] == 2
+
+def test_unhealthy_replica_falls_back_to_primary(routed_db):
+    routed_db.router.replicas[0].healthy = False
+    assert checkout_target(routed_db, readonly=True) == 'primary'
+    assert routed_db.replication_stats()['primary_reads'] == 1
+
+class StreamCursor(FakeCursor):
+    """Curseur non bufferisé : trois lots de deux lignes, ou une erreur SQL à l'exécution"""
+
+    def __init__(self, error=None):
+        super().__init__()
+        self.error = error
+        self.rowcount = -1
+        self._rows = [{'player_id': i} for i in range(6)]
+
+    def execute(self, query, params=()):
+        if self.error is not None:
+            raise self.error
+        super().execute(query, params)
+
+    def fetchmany(self, size):
+        batch, self._rows = self._rows[:size], self._rows[size:]
+        return batch
+
+@pytest.fixture
+def streaming_db(monkeypatch):
+    """DatabaseConnection dont les KILL QUERY sont enregistrés au lieu d'être envoyés"""
+    connection = DatabaseConnection()
+    connection._pool = ConnectionPool(FakeRaw, pool_size=1, max_overflow=0, timeout=0.05)
+    connection.kills = []
+    monkeypatch.setattr(connection, 'kill_query', lambda *target: connection.kills.append(target))
+    return connection
+
+def stream_with(connection, monkeypatch, cursor):
+    monkeypatch.setattr(FakeRaw, 'cursor', lambda raw, **kwargs: cursor)
+    return connection.stream_query("SELECT player_id FROM players", batch_size=2)
+
+def test_pool_timeout_does_not_count_as_a_database_failure(streaming_db):
+    held = streaming_db._checkout(readonly=False)
+    with pytest.raises(PoolTimeoutError):
+        streaming_db._checkout(readonly=False)
+    held.close()
+    assert streaming_db.breaker.stats()['failures'] == 0
+
+def test_stream_query_sql_error_discards_connection_without_kill(streaming_db, monkeypatch):
+    stream = stream_with(streaming_db, monkeypatch, StreamCursor(ProgrammingError(msg="Syntax error", errno=1064)))
+    with pytest.raises(ProgrammingError):
+        next(stream)
+    assert streaming_db.kills == []
+    assert streaming_db.pool_stats()['discarded'] == 1
+
+def test_stream_query_kills_abandoned_stream_only_past_budget(streaming_db, monkeypatch, flask_app):
+    with flask_app.test_request_context():
+        g.db_budget_ms = 1000
+        stream = stream_with(streaming_db, monkeypatch, StreamCursor())
+        assert next(stream) == [{'player_id': 0}, {'player_id': 1}]
+        stream.close()
+        assert streaming_db.kills == []
+
+        g.db_budget_ms = 10
+        stream = stream_with(streaming_db, monkeypatch, StreamCursor())
+        next(stream)
+        time.sleep(0.02)
+        stream.close()
+        assert streaming_db.kills == [(1, 'localhost', 3307)]
+    assert streaming_db.pool_stats()['discarded'] == 2
+
+def test_stream_query_returns_connection_once_exhausted(streaming_db, monkeypatch):
+    stream = stream_with(streaming_db, monkeypatch, StreamCursor())
+    assert [row['player_id'] for rows in stream for row in rows] == list(range(6))
+    assert streaming_db.kills == []
+    assert streaming_db.pool_stats()['idle'] == 1
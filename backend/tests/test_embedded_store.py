@@ -0,0 +1,89 @@
+# backend/tests/test_embedded_store.py
+import os
+from contextlib import contextmanager
+from decimal import Decimal
+import pytest
+from mysql.connector import FieldType
+from config.embedded_store import EmbeddedReadStore
+
+class FakeCursor:
+    """Curseur non bufferisé sur une table de FakeSource"""
+
+    def __init__(self, tables):
+        self._tables = tables
+        self._rows = []
+        self.description = None
+
+    def execute(self, query):
+        columns, rows = self._tables[query.split('FROM ')[1].strip()]
+        self.description = [(name, type_code) for name, type_code in columns]
+        self._rows = list(rows)
+
+    def fetchmany(self, size):
+        batch, self._rows = self._rows[:size], self._rows[size:]
+        return batch
+
+    def close(self):
+        pass
+
+class FakeSource:
+    """Remplace DatabaseConnection comme source MySQL du rafraîchissement"""
+
+    def __init__(self, players):
+        self.tables = {
+            'players': (
+                [('player_id', FieldType.LONG), ('name', FieldType.VAR_STRING),
+                 ('position', FieldType.VAR_STRING), ('market_value', FieldType.NEWDECIMAL)],
+                players
+            ),
+            'styles': ([('id_style', FieldType.LONG), ('name', FieldType.VAR_STRING)], [(1, 'jeu direct')]),
+            'player_positions': (
+                [('player_id', FieldType.LONG), ('position', FieldType.VAR_STRING)],
+                [(player_id, position) for player_id, _, position, _ in players]
+            ),
+        }
+
+    @contextmanager
+    def connection(self, readonly=False):
+        class Conn:
+            def cursor(conn, buffered=True):
+                return FakeCursor(self.tables)
+        yield Conn()
+
+PLAYERS = [(1, 'Pedri', 'MF', Decimal('80.5')), (2, 'Rodri', 'MF', Decimal('110')), (3, 'Saka', 'FW', None)]
+
+@pytest.fixture
+def store(tmp_path):
+    store = EmbeddedReadStore(str(tmp_path / 'players.sqlite3'))
+    assert store.refresh(FakeSource(PLAYERS))
+    return store
+
+def test_handles_only_plain_reads_of_copied_tables(store):
+    assert store.handles("SELECT * FROM players p JOIN styles s ON s.id_style = p.id_style")
+    assert store.handles("SELECT player_id FROM `player_positions` WHERE position = %s")
+    assert not store.handles("SELECT * FROM players p JOIN favorites f ON f.player_id = p.player_id")
+    assert not store.handles("SELECT * FROM players WHERE player_id = 1 FOR UPDATE")
+    assert not store.handles("UPDATE players SET age = 30")
+    assert not store.handles("SELECT 1")
+    assert not EmbeddedReadStore('').handles("SELECT * FROM players")
+
+def test_refresh_copies_tables_with_mysql_semantics(store):
+    assert store.row_counts == {'players': 3, 'styles': 1, 'player_positions': 3}
+    rows = store.fetch_all("SELECT name, market_value FROM players WHERE position = %s ORDER BY name", ('mf',))
+    assert rows == [{'name': 'Pedri', 'market_value': 80.5}, {'name': 'Rodri', 'market_value': 110.0}]
+    assert store.fetch_all("SELECT COUNT(*) AS n FROM players WHERE name LIKE '100%%'") == [{'n': 0}]
+
+def test_readers_see_the_replaced_file_after_a_refresh(store):
+    assert len(store.fetch_all("SELECT * FROM players")) == 3
+    assert store.refresh(FakeSource(PLAYERS[:1]))
+    assert store.fetch_all("SELECT name FROM players") == [{'name': 'Pedri'}]
+    assert not [name for name in os.listdir(os.path.dirname(store.path)) if name.endswith('.tmp')]
+
+def test_stale_or_unsupported_reads_fall_back_to_mysql(store):
+    query = "SELECT GROUP_CONCAT(name SEPARATOR ', ') AS names FROM players"
+    assert store.fetch_all(query) is None
+    assert not store.handles(query)
+    assert store.fallbacks == 1
+    store.max_age = 0
+    os.utime(store.path, (0, 0))
+    assert store.fetch_all("SELECT * FROM players") is None
@@ -0,0 +1,63 @@
+# backend/tests/test_http_cache.py
+from datetime import datetime, timezone
+import pytest
+from flask import Flask
+from services import data_version
+from services.cache_service import EncodedBody
+from utils.http_cache import encoded_response, make_etag
+
+LAST_MODIFIED = datetime(2026, 1, 15, 12, 0, tzinfo=timezone.utc)
+PLAYERS = [{'player_id': i, 'Player': f"Joueur {i}", 'Squad': 'Arsenal'} for i in range(100)]
+
+@pytest.fixture
+def client():
+    app = Flask(__name__)
+    body = EncodedBody.from_json(PLAYERS)
+
+    @app.route('/players', methods=['GET', 'POST'])
+    def players():
+        return encoded_response(body, make_etag('v1', 'players'), LAST_MODIFIED)
+
+    return app.test_client()
+
+def test_etag_depends_on_version_and_parameters():
+    assert make_etag('v1', {'b': 1, 'a': 2}) == make_etag('v1', {'a': 2, 'b': 1})
+    assert make_etag('v1', 'players') != make_etag('v2', 'players')
+    assert make_etag('v1', 'players', 1) != make_etag('v1', 'players', 2)
+
+def test_gzip_and_identity_share_a_weak_etag(client):
+    identity = client.get('/players')
+    gzipped = client.get('/players', headers={'Accept-Encoding': 'gzip'})
+    assert identity.headers.get('Content-Encoding') is None
+    assert gzipped.headers['Content-Encoding'] == 'gzip'
+    assert identity.headers['ETag'] == gzipped.headers['ETag']
+    assert identity.headers['ETag'].startswith('W/')
+    assert 'Accept-Encoding' in identity.headers['Vary']
+    assert identity.headers['Cache-Control'] == 'no-cache'
+
+def test_conditional_get_answers_304_without_body(client):
+    etag = client.get('/players').headers['ETag']
+    response = client.get('/players', headers={'If-None-Match': etag, 'Accept-Encoding': 'gzip'})
+    assert response.status_code == 304 and response.data == b''
+    assert response.headers['ETag'] == etag
+    assert client.head('/players', headers={'If-None-Match': etag}).status_code == 304
+    assert client.get('/players', headers={'If-None-Match': 'W/"autre"'}).status_code == 200
+
+def test_if_modified_since_is_used_without_if_none_match(client):
+    assert client.get('/players', headers={'If-Modified-Since': 'Thu, 15 Jan 2026 12:00:00 GMT'}).status_code == 304
+    assert client.get('/players', headers={'If-Modified-Since': 'Wed, 14 Jan 2026 12:00:00 GMT'}).status_code == 200
+
+def test_post_is_never_answered_with_304(client):
+    etag = client.get('/players').headers['ETag']
+    response = client.post('/players', headers={'If-None-Match': etag})
+    assert response.status_code == 200 and len(response.data) > 0
+
+def test_data_validators_follow_the_data_version(monkeypatch):
+    version = {'version': 'abc', 'last_modified': LAST_MODIFIED}
+    monkeypatch.setattr(data_version, 'fetch_data_version', lambda: version)
+    etag, last_modified = data_version.data_validators('players/all', 1)
+    assert etag == make_etag('abc', 'players/all', 1) and last_modified == LAST_MODIFIED
+    version['version'] = 'abd'
+    assert data_version.data_validators('players/all', 1)[0] != etag
+    monkeypatch.setattr(data_version, 'fetch_data_version', lambda: None)
+    assert data_version.data_validators('players/all', 1) == (None, None)
@@ -0,0 +1,57 @@
+# backend/tests/test_name_index.py
+import numpy as np
+from services.name_index import CONTAINS_SCORE, NameIndex, trigrams
+from services.player_snapshot import PlayerSnapshot, fold
+
+NAMES = ['Kylian Mbappé', 'Erling Haaland', 'Luka Modrić', 'Jude Bellingham', 'Pedri', 'Martin Ødegaard']
+
+def index_of(names):
+    return NameIndex.build(np.array([fold(name) for name in names], dtype=str))
+
+def test_trigrams_are_padded_per_word():
+    assert trigrams('ab cd') == {'  a', ' ab', 'ab ', '  c', ' cd', 'cd '}
+
+def test_contains_matches_rank_first_and_ignore_accents():
+    rows, scores = index_of(NAMES).search(fold('MBAPPE'))
+    assert rows.tolist() == [0]
+    assert scores.tolist() == [CONTAINS_SCORE]
+
+def test_typo_is_tolerated_with_lower_score():
+    rows, scores = index_of(NAMES).search(fold('Halaand'))
+    assert 1 in rows.tolist()
+    assert 0 < scores[rows.tolist().index(1)] < CONTAINS_SCORE
+
+def test_short_and_non_word_queries_are_exact_substrings():
+    index = index_of(NAMES)
+    expected = {row for row, name in enumerate(NAMES) if 'ed' in fold(name)}
+    rows, scores = index.search('ed')
+    assert set(rows.tolist()) == expected
+    assert set(scores.tolist()) == {CONTAINS_SCORE}
+    rows, _ = index.search('a m')
+    assert set(rows.tolist()) == {row for row, name in enumerate(NAMES) if 'a m' in fold(name)}
+
+def test_updated_matches_build_after_renames_and_additions():
+    index = index_of(NAMES)
+    renamed = list(NAMES) + ['Florian Wirtz']
+    renamed[2] = 'Luka Modric Jr'
+    folded = np.array([fold(name) for name in renamed], dtype=str)
+    changes = {2: (fold(NAMES[2]), folded[2]), 6: ('', folded[6])}
+    updated = index.updated(folded, changes)
+    rebuilt = NameIndex.build(folded)
+    assert set(updated.postings) == set(rebuilt.postings)
+    for gram, rows in rebuilt.postings.items():
+        assert updated.postings[gram].tolist() == rows.tolist()
+
+def test_snapshot_name_search_orders_by_relevance_then_value(make_players):
+    rows = make_players(200)
+    snapshot = PlayerSnapshot(rows, {'version': '1'})
+    found, scores = snapshot.name_search('haaland')
+    assert len(found)
+    values = snapshot.numeric['MarketValue'][found]
+    contains = scores == CONTAINS_SCORE
+    # Noms contenant la recherche d'abord, par valeur marchande décroissante
+    assert contains[:contains.sum()].all()
+    assert (np.diff(np.nan_to_num(values[contains], nan=-1)) <= 0).all()
+    within = snapshot.positions('GK')
+    found, _ = snapshot.name_search('haaland', within=within)
+    assert within.contains(found).all()
@@ -0,0 +1,185 @@
+# backend/tests/test_pagination.py
+import random
+import sqlite3
+from decimal import Decimal
+import pytest
+from services.player_snapshot import PlayerSnapshot
+from utils.pagination import (
+    SORT_COLUMNS, decode_cursor, encode_cursor, keyset_condition, keyset_order, parse_sort, row_keys,
+    sort_name, split_page
+)
+from utils.validators import ValidationError
+
+SORTS = ['MarketValue', 'xG:asc', 'age,gls:asc', 'xG:desc,KP:asc,tackles', 'Ast:asc,xAG:desc', ['PrgP', 'carries:asc']]
+
+def test_parse_sort_accepts_aliases_and_rejects_unknown_columns():
+    assert parse_sort(None) == [('MarketValue', 'desc')]
+    assert parse_sort('xg:asc,key_passes') == [('xG', 'asc'), ('KP', 'desc')]
+    assert parse_sort([['Tkl', 'asc'], 'value']) == [('Tkl', 'asc'), ('MarketValue', 'desc')]
+    for invalid in ('foo', 'xG:up', 'Gls,Ast,xG,KP'):
+        with pytest.raises(ValidationError):
+            parse_sort(invalid)
+
+def test_cursor_round_trip_keeps_exact_values_and_nulls():
+    keys = [None, 0.1, Decimal('12.345'), 42]
+    order = sort_name(parse_sort('xG,KP:asc,Gls'))
+    decoded = decode_cursor(encode_cursor(order, keys), order, len(keys))
+    assert decoded == [None, Decimal('0.1'), Decimal('12.345'), 42]
+    assert decode_cursor(None, order, len(keys)) is None
+
+def test_cursor_is_rejected_for_another_sort_or_when_tampered():
+    token = encode_cursor('xG:desc', [1.5, 7])
+    with pytest.raises(ValidationError):
+        decode_cursor(token, 'KP:desc', 2)
+    with pytest.raises(ValidationError):
+        decode_cursor(token, 'xG:desc', 3)
+    with pytest.raises(ValidationError):
+        decode_cursor('pas-un-curseur', 'xG:desc', 2)
+
+def test_split_page_returns_keys_of_last_served_row():
+    rows = [{'player_id': i, 'xG': i / 10} for i in range(6)]
+    spec = [('xG', 'desc')]
+    page, after = split_page(rows, 5, lambda row: row_keys(row, spec))
+    assert len(page) == 5 and after == [0.4, 4]
+    assert split_page(rows, 6, lambda row: row_keys(row, spec)) == (rows, None)
+
+@pytest.fixture
+def players():
+    """Joueurs avec beaucoup d'ex aequo et de NULL sur les clés de tri"""
+    rng = random.Random(5)
+    def value():
+        return rng.choice([None, 0, 1, 2, 3, rng.randint(0, 100) / 10])
+    rows = [{
+        'player_id': index * 3 + 1, 'Player': 'Joueur', 'Age': rng.choice([None, 20, 21, 22]), 'Pos': 'MF',
+        'Squad': 'Club', 'style': 'jeu direct', 'MarketValue': rng.choice([None, 1e6, 2e6]),
+        'Gls': value(), 'Ast': value(), 'xG': value(), 'xAG': value(), 'Tkl': value(), 'PrgP': value(),
+        'Carries': value(), 'KP': value(), 'image_url': ''
+    } for index in range(600)]
+    rng.shuffle(rows)
+    return rows
+
+@pytest.fixture
+def sql(players):
+    """Table players en SQLite : mêmes places des NULL que MySQL (premiers en ASC, derniers en DESC)"""
+    connection = sqlite3.connect(':memory:')
+    columns = [SORT_COLUMNS[column].split('.')[1] for column in SORT_COLUMNS]
+    connection.execute(f"CREATE TABLE players (player_id INTEGER, {', '.join(columns)})")
+    connection.executemany(
+        f"INSERT INTO players VALUES ({', '.join(['?'] * (len(columns) + 1))})",
+        [(row['player_id'], *[row[column] for column in SORT_COLUMNS]) for row in players]
+    )
+    select = "SELECT p.player_id AS player_id, " + ", ".join(
+        f"{sql_column} AS {column}" for column, sql_column in SORT_COLUMNS.items()
+    ) + " FROM players p WHERE 1=1"
+
+    def page(spec, limit, after):
+        query, params = select, []
+        if after is not None:
+            condition, params = keyset_condition(after, spec)
+            query += condition
+        query += keyset_order(spec) + " LIMIT ?"
+        params = [float(value) if isinstance(value, Decimal) else value for value in params]
+        cursor = connection.execute(query.replace('%s', '?'), params + [limit + 1])
+        names = [description[0] for description in cursor.description]
+        rows = [dict(zip(names, values)) for values in cursor]
+        return split_page(rows, limit, lambda row: row_keys(row, spec))
+    return page
+
+def walk(fetch_page, spec, limit):
+    """Parcourt toutes les pages en repassant par un curseur encodé"""
+    order, seen, after = sort_name(spec), [], None
+    while True:
+        page, next_keys = fetch_page(spec, limit, after)
+        seen += [row['player_id'] for row in page]
+        if next_keys is None:
+            return seen
+        after = decode_cursor(encode_cursor(order, next_keys), order, len(spec) + 1)
+
+@pytest.mark.parametrize('sort_by', SORTS)
+@pytest.mark.parametrize('limit', [1, 37, 1000])
+def test_keyset_pages_cover_sql_order_without_gaps(sql, sort_by, limit):
+    spec = parse_sort(sort_by)
+    expected = walk(sql, spec, 10_000)
+    assert len(expected) == 600
+    assert walk(sql, spec, limit) == expected
+
+@pytest.mark.parametrize('sort_by', SORTS)
+@pytest.mark.parametrize('limit', [1, 37, 1000])
+def test_snapshot_page_matches_sql_order(players, sql, sort_by, limit):
+    snapshot = PlayerSnapshot(players, {'version': '1'})
+    mask = snapshot.all()
+    spec = parse_sort(sort_by)
+    assert walk(lambda spec, limit, after: snapshot.page(mask, spec, limit, after), spec, limit) == \
+        walk(sql, spec, 10_000)
+
+def test_keyset_condition_after_null_desc_key_skips_to_next_key():
+    spec = [('xG', 'desc'), ('KP', 'asc')]
+    condition, params = keyset_condition([None, None, 10], spec)
+    # xG NULL (dernier en DESC) : seuls les KP non NULL, puis les player_id plus grands
+    assert 'p.xG < %s' not in condition
+    assert 'p.key_passes IS NOT NULL' in condition
+    assert params == [10]
+
+@pytest.fixture
+def filter_db(make_players, monkeypatch):
+    """Base SQLite au schéma de PLAYERS_BASE_QUERY pour le chemin SQL de /api/filter_players"""
+    import app
+    rows = make_players(1000, seed=3)
+    styles = sorted({row['style'] for row in rows if row['style']})
+    connection = sqlite3.connect(':memory:')
+    connection.execute("CREATE TABLE styles (id_style INTEGER, name TEXT)")
+    connection.executemany("INSERT INTO styles VALUES (?, ?)", list(enumerate(styles, 1)))
+    connection.execute(
+        "CREATE TABLE players (player_id INTEGER, name TEXT, age INTEGER, position TEXT, squad TEXT, "
+        "id_style INTEGER, market_value REAL, goals REAL, assists REAL, xG REAL, xAG REAL, tackles REAL, "
+        "progressive_passes REAL, carries REAL, key_passes REAL, image_url TEXT)"
+    )
+    connection.executemany("INSERT INTO players VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", [(
+        row['player_id'], row['Player'], row['Age'], row['Pos'], row['Squad'],
+        styles.index(row['style']) + 1 if row['style'] else None, row['MarketValue'], row['Gls'], row['Ast'],
+        row['xG'], row['xAG'], row['Tkl'], row['PrgP'], row['Carries'], row['KP'], row['image_url']
+    ) for row in rows])
+    # Résolution du style sur le catalogue remplacée par l'identifiant SQLite
+    monkeypatch.setattr(app, 'style_filter', lambda style: (" AND p.id_style IN (%s)", [styles.index(style) + 1]))
+
+    def fetch(data):
+        query, params = app.build_filter_query(data)
+        params = [float(value) if isinstance(value, Decimal) else value for value in params]
+        cursor = connection.execute(query.replace('%s', '?'), params)
+        names = [description[0] for description in cursor.description]
+        return [dict(zip(names, values)) for values in cursor]
+    return app, rows, fetch
+
+@pytest.mark.parametrize('sort_by', SORTS)
+@pytest.mark.parametrize('limit', [1, 37, 100])
+def test_filter_query_cursor_walks_sql_results_like_the_snapshot(filter_db, sort_by, limit):
+    app, rows, fetch = filter_db
+    spec = parse_sort(sort_by)
+    data = {'style': 'jeu direct', 'Squad': 'a', 'sort_by': sort_by, 'limit': limit}
+    seen, cursor = [], None
+    while True:
+        page, next_after = split_page(fetch({**data, 'cursor': cursor}), limit, lambda row: row_keys(row, spec))
+        seen += [row['player_id'] for row in page]
+        cursor = app.cursor_of(next_after, spec)
+        if cursor is None:
+            break
+    expected = [row for row in rows if row['style'] == 'jeu direct' and 'a' in row['Squad'].lower()]
+    snapshot = PlayerSnapshot(expected, {'version': '1'})
+    assert seen == walk(lambda spec, limit, after: snapshot.page(snapshot.all(), spec, limit, after), spec, 10_000)
+    assert len(seen) == len(expected) > limit
+
+def test_filter_query_limits_pages_and_rejects_foreign_cursors(filter_db):
+    app, _, fetch = filter_db
+    data = {'style': 'jeu direct', 'sort_by': 'xG:desc', 'limit': 10}
+    first = fetch(data)
+    assert len(first) == 11
+    page, next_after = split_page(first, 10, lambda row: row_keys(row, parse_sort('xG:desc')))
+    token = app.cursor_of(next_after, parse_sort('xG:desc'))
+    second = fetch({**data, 'cursor': token})
+    assert not {row['player_id'] for row in page} & {row['player_id'] for row in second}
+    with pytest.raises(ValidationError):
+        app.build_filter_query({**data, 'sort_by': 'KP:desc', 'cursor': token})
+    with pytest.raises(ValidationError):
+        app.build_filter_query({**data, 'cursor': token[:-4]})
+    with pytest.raises(ValidationError):
+        app.build_filter_query({'sort_by': 'xG:desc', 'cursor': token})
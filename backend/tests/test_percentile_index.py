@@ -0,0 +1,102 @@
+# backend/tests/test_percentile_index.py
+import sqlite3
+import pytest
+from services import player_service
+from services.cache_service import cache
+from services.percentile_index import PERCENTILE_STATS, rank_entry
+from services.player_snapshot import PlayerSnapshot, position_tokens
+
+def reference(rows, player_id):
+    """Rangs par comptage direct sur chaque groupe de poste"""
+    player = next(row for row in rows if row['player_id'] == player_id)
+    result = {}
+    for token in position_tokens(player['Pos']):
+        group = [row for row in rows if token in position_tokens(row['Pos'])]
+        result[token] = {}
+        for stat in PERCENTILE_STATS:
+            values = [row[stat] for row in group if row[stat] is not None]
+            value = player[stat]
+            result[token][stat] = None if value is None else rank_entry(
+                sum(other <= value for other in values), sum(other >= value for other in values), len(values)
+            )
+    return result
+
+def test_rank_entry():
+    assert rank_entry(9, 2, 10) == {'percentile': 90.0, 'top': 20.0, 'of': 10}
+    assert rank_entry(None, None, 10) is None
+    assert rank_entry(1, 1, 0) is None
+
+def test_percentiles_match_direct_counts(make_players):
+    rows = make_players(400)
+    snapshot = PlayerSnapshot(rows, {'version': '1'})
+    for player_id in range(1, 401, 7):
+        assert snapshot.percentiles(player_id) == reference(rows, player_id)
+    assert snapshot.percentiles(99_999) is None
+
+def test_percentiles_for_one_position(make_players):
+    rows = make_players(100)
+    snapshot = PlayerSnapshot(rows, {'version': '1'})
+    player = next(row for row in rows if row['Pos'] == 'MF,FW')
+    assert list(snapshot.percentiles(player['player_id'], 'fw')) == ['FW']
+    assert snapshot.percentiles(player['player_id'], 'GK') == {}
+
+def test_incremental_update_matches_full_build(make_players):
+    rows = make_players(300)
+    snapshot = PlayerSnapshot(rows, {'version': '1'})
+    snapshot.percentile_index
+    # Changements de statistiques et de poste, plus des joueurs ajoutés
+    changes = [dict(row, Pos='GK', Gls=99) for row in rows[:15]] + make_players(10, seed=4, first_id=301)
+    merged = {row['player_id']: row for row in rows}
+    merged.update({row['player_id']: row for row in changes})
+    updated = snapshot.updated(changes, {'version': '2'})
+    full = PlayerSnapshot(list(merged.values()), {'version': '2'})
+    for player_id in merged:
+        assert updated.percentiles(player_id) == full.percentiles(player_id)
+
+@pytest.fixture
+def sql_fallback(monkeypatch, make_players):
+    """PlayerService sans snapshot, sur une base SQLite (players + player_positions)"""
+    rows = make_players(200)
+    connection = sqlite3.connect(':memory:')
+    connection.row_factory = sqlite3.Row
+    columns = list(PERCENTILE_STATS.values())
+    connection.execute(f"CREATE TABLE players (player_id INTEGER, {', '.join(columns)})")
+    connection.execute("CREATE TABLE player_positions (position TEXT, player_id INTEGER)")
+    for row in rows:
+        connection.execute(f"INSERT INTO players VALUES ({', '.join(['?'] * (len(columns) + 1))})",
+                           [row['player_id'], *[row[stat] for stat in PERCENTILE_STATS]])
+        connection.executemany("INSERT INTO player_positions VALUES (?, ?)",
+                               [(token, row['player_id']) for token in position_tokens(row['Pos'])])
+
+    class SQLiteDB:
+        queries = 0
+
+        def execute_query(self, query, params=None, **kwargs):
+            SQLiteDB.queries += 1
+            return [dict(row) for row in connection.execute(query.replace('%s', '?'), params or ())]
+
+    class NoSnapshot:
+        def current(self):
+            return None
+
+    monkeypatch.setattr(player_service, 'db', SQLiteDB())
+    monkeypatch.setattr(player_service, 'player_snapshot', NoSnapshot())
+    cache.invalidate_tags(['players'])
+    return rows, player_service.PlayerService(), SQLiteDB
+
+def test_sql_fallback_matches_snapshot_and_is_cached(sql_fallback):
+    rows, service, database = sql_fallback
+    snapshot = PlayerSnapshot(rows, {'version': '1'})
+    for player_id in range(1, 201, 9):
+        assert service.get_player_percentiles(player_id)['positions'] == snapshot.percentiles(player_id)
+
+    midfielder = next(row['player_id'] for row in rows if 'MF' in position_tokens(row['Pos']))
+    queries = database.queries
+    first = service.get_player_percentiles(midfielder, 'mf')
+    assert service.get_player_percentiles(midfielder, 'MF') == first
+    assert list(first['positions']) == ['MF']
+    assert database.queries == queries + 1
+    # Écriture sur players : comptages recalculés
+    cache.invalidate_tags(['players'])
+    service.get_player_percentiles(midfielder, 'MF')
+    assert database.queries == queries + 2
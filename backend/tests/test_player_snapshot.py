@@ -0,0 +1,126 @@
+# backend/tests/test_player_snapshot.py
+import random
+from datetime import datetime
+import numpy as np
+from services import player_snapshot as snapshot_module
+from services.player_snapshot import PlayerSnapshot, PlayerSnapshotStore, fold, position_tokens
+
+def matching_ids(snapshot, mask):
+    rows = mask.rows() if hasattr(mask, 'rows') else np.flatnonzero(mask)
+    return set(int(snapshot.player_ids[row]) for row in rows)
+
+def test_like_is_case_and_accent_insensitive_substring(make_players):
+    rows = make_players(300)
+    snapshot = PlayerSnapshot(rows, {'version': '1'})
+    expected = {row['player_id'] for row in rows if 'mbappe' in fold(row['Player'])}
+    assert expected
+    assert matching_ids(snapshot, snapshot.like('Player', '%MBAPPE%')) == expected
+    # Joker _ : un caractère quelconque, comme en SQL
+    expected = {row['player_id'] for row in rows if row['Squad'].startswith('Ar')}
+    assert matching_ids(snapshot, snapshot.like('Squad', 'a_sen%')) == expected
+
+def test_range_never_keeps_null(make_players):
+    rows = make_players(300)
+    snapshot = PlayerSnapshot(rows, {'version': '1'})
+    expected = {row['player_id'] for row in rows
+                if row['MarketValue'] is not None and 5_000_000 <= row['MarketValue'] <= 25_000_000}
+    assert matching_ids(snapshot, snapshot.range('MarketValue', minimum=5_000_000, maximum=25_000_000)) == expected
+
+def test_positions_and_equals_use_bitmaps(make_players):
+    rows = make_players(300)
+    snapshot = PlayerSnapshot(rows, {'version': '1'})
+    expected = {row['player_id'] for row in rows if 'MF' in position_tokens(row['Pos'])}
+    assert matching_ids(snapshot, snapshot.positions('mf')) == expected
+    expected = {row['player_id'] for row in rows if row['style'] == 'jeu direct'}
+    assert matching_ids(snapshot, snapshot.equals('style', 'JEU DIRECT ')) == expected
+    mask = snapshot.positions('FW') & snapshot.equals('style', 'jeu direct')
+    assert snapshot.count(mask) == len({row['player_id'] for row in rows
+                                        if 'FW' in position_tokens(row['Pos']) and row['style'] == 'jeu direct'})
+
+def test_top_orders_like_mysql_with_nulls_last(make_players):
+    rows = make_players(200)
+    snapshot = PlayerSnapshot(rows, {'version': '1'})
+    players = snapshot.top(snapshot.all(), 'desc', limit=200)
+    # ORDER BY market_value DESC, player_id DESC : NULL en dernier
+    expected = sorted(rows, key=lambda row: (row['MarketValue'] is None, -(row['MarketValue'] or 0),
+                                             -row['player_id']))
+    assert [player['player_id'] for player in players] == [row['player_id'] for row in expected]
+
+def test_updated_matches_full_rebuild(make_players):
+    rows = make_players(300)
+    snapshot = PlayerSnapshot(rows, {'version': '1'})
+    snapshot.name_index, snapshot.prefix_index, snapshot.percentile_index
+    rng = random.Random(3)
+    changes = make_players(40, seed=9, first_id=1)
+    changes = [rng.choice(changes) for _ in range(20)] + make_players(10, seed=5, first_id=301)
+    merged = {row['player_id']: row for row in rows}
+    merged.update({row['player_id']: row for row in changes})
+
+    incremental = snapshot.updated(changes, {'version': '2'})
+    full = PlayerSnapshot(list(merged.values()), {'version': '2'})
+    assert incremental.size == full.size == 310
+    for mask_of in (lambda s: s.positions('MF'), lambda s: s.equals('Squad', 'arsenal'),
+                    lambda s: s.like('Player', '%haaland%'), lambda s: s.range('Age', maximum=21)):
+        assert matching_ids(incremental, mask_of(incremental)) == matching_ids(full, mask_of(full))
+    for player_id in merged:
+        assert incremental.percentiles(player_id) == full.percentiles(player_id)
+
+class FakeSource:
+    """Version des données et lignes lues par PlayerSnapshotStore.rebuild"""
+
+    def __init__(self, rows):
+        self.rows = {row['player_id']: row for row in rows}
+        self.version = {'version': 'v1', 'players_version': 1, 'styles_version': 1,
+                        'players_count': len(rows), 'players_updated': datetime(2026, 1, 1)}
+        self.queries = []
+
+    def write(self, **changes):
+        self.version = dict(self.version, players_count=len(self.rows),
+                            version=f"v{self.version['players_version'] + 1}",
+                            players_version=self.version['players_version'] + 1, **changes)
+
+    def read_rows(self, query, params=None):
+        self.queries.append(params)
+        return list(self.rows.values())
+
+def make_store(monkeypatch, source):
+    monkeypatch.setattr(snapshot_module, 'fetch_data_version', lambda: dict(source.version))
+    store = PlayerSnapshotStore()
+    monkeypatch.setattr(store, '_read_rows', source.read_rows)
+    assert store.rebuild()
+    return store
+
+def test_store_rebuilds_incrementally_after_updates(monkeypatch, make_players):
+    source = FakeSource(make_players(50))
+    store = make_store(monkeypatch, source)
+    source.rows[7] = dict(source.rows[7], Age=40)
+    source.write()
+    assert store.rebuild()
+    assert store.last_mode.startswith('incrémental')
+    # Relecture avec une marge avant le dernier MAX(updated_at)
+    assert source.queries[-1][0] < datetime(2026, 1, 1)
+    assert store.current().records[store.current().row_of[7]]['Age'] == 40
+
+def test_store_rebuilds_fully_when_players_are_deleted(monkeypatch, make_players):
+    source = FakeSource(make_players(50))
+    store = make_store(monkeypatch, source)
+    del source.rows[7]
+    source.write()
+    assert store.rebuild()
+    assert store.last_mode == 'complet'
+    assert 7 not in store.current().row_of
+
+def test_store_rebuilds_fully_when_styles_change(monkeypatch, make_players):
+    source = FakeSource(make_players(50))
+    store = make_store(monkeypatch, source)
+    source.write(styles_version=2)
+    assert store.rebuild()
+    assert store.last_mode == 'complet'
+
+def test_current_is_none_until_snapshot_matches_version(monkeypatch, make_players):
+    source = FakeSource(make_players(10))
+    store = make_store(monkeypatch, source)
+    assert store.current() is not None
+    monkeypatch.setattr(store, 'request_rebuild', lambda: None)
+    source.write()
+    assert store.current() is None
@@ -0,0 +1,51 @@
+# backend/tests/test_prefix_index.py
+import numpy as np
+import pytest
+from services.prefix_index import PrefixIndex, name_keys, normalize_prefix
+from services.player_snapshot import PlayerSnapshot, fold
+
+def test_name_keys_and_prefix_normalization():
+    assert name_keys('kylian mbappe lottin') == ['kylian mbappe lottin', 'mbappe lottin', 'lottin']
+    assert normalize_prefix('  kylian   mb') == 'kylian mb'
+    assert normalize_prefix('kylian ') == 'kylian '
+
+def expected_completion(folded, values, prefix, limit):
+    """Référence : noms dont le nom complet ou une de ses fins commence par le préfixe"""
+    prefix = normalize_prefix(prefix)
+    rows = [row for row, name in enumerate(folded) if any(key.startswith(prefix) for key in name_keys(name))]
+    rows.sort(key=lambda row: (np.isnan(values[row]), -np.nan_to_num(values[row]), row))
+    return rows[:limit]
+
+@pytest.fixture
+def names(make_players):
+    rows = make_players(400)
+    folded = np.array([fold(row['Player']) for row in rows], dtype=str)
+    values = np.array([np.nan if row['MarketValue'] is None else row['MarketValue'] for row in rows])
+    return folded, values
+
+@pytest.mark.parametrize('prefix', ['k', 'mb', 'kyl', 'mbappe', 'luka mod', 'haaland 1', 'zz', 'ø'])
+def test_complete_matches_reference(names, prefix):
+    folded, values = names
+    index = PrefixIndex.build(folded, values)
+    assert index.complete(prefix, 10).tolist() == expected_completion(folded, values, prefix, 10)
+
+def test_updated_matches_build(names):
+    folded, values = names
+    index = PrefixIndex.build(folded, values)
+    folded, values = folded.copy().astype('U64'), values.copy()
+    folded[3] = 'zinedine zidane'
+    values[3] = 150_000_000
+    values[10] = np.nan
+    folded = np.append(folded, 'kylian mbappe lottin')
+    values = np.append(values, 1.0)
+    updated = index.updated(folded, values, [3, 10, len(folded) - 1])
+    rebuilt = PrefixIndex.build(folded, values)
+    for prefix in ['z', 'zi', 'zid', 'k', 'ky', 'lottin', 'mb', 'e']:
+        assert updated.complete(prefix, 10).tolist() == rebuilt.complete(prefix, 10).tolist()
+
+def test_snapshot_autocomplete_returns_ranked_players(make_players):
+    snapshot = PlayerSnapshot(make_players(200), {'version': '1'})
+    players = snapshot.autocomplete('Mbappé', 5)
+    assert players and all('mbappe' in fold(player['Player']) for player in players)
+    values = [player['MarketValue'] for player in players]
+    assert values == sorted(values, reverse=True)
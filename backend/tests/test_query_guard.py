@@ -0,0 +1,68 @@
+# backend/tests/test_query_guard.py
+import time
+import pytest
+from mysql.connector.errors import OperationalError, ProgrammingError
+from config.database import PoolTimeoutError
+from config.query_guard import (
+    CircuitBreaker, CircuitOpenError, QueryWatchdog, add_execution_time_hint, is_unavailable_error
+)
+
+def test_execution_time_hint_only_rewrites_selects():
+    assert add_execution_time_hint("  select * FROM players", 500) == \
+        "  SELECT /*+ MAX_EXECUTION_TIME(500) */ * FROM players"
+    assert add_execution_time_hint("SELECT a FROM t WHERE b IN (SELECT c FROM u)", 100).count('MAX_EXECUTION_TIME') == 1
+    for query in ("UPDATE players SET age = 1", "WITH t AS (SELECT 1) SELECT * FROM t", "SHOW TABLES"):
+        assert add_execution_time_hint(query, 500) == query
+
+def test_only_unavailability_errors_count_as_failures():
+    assert is_unavailable_error(OperationalError(msg="Lost connection", errno=2013))
+    assert is_unavailable_error(ProgrammingError(msg="Query execution was interrupted", errno=3024))
+    assert not is_unavailable_error(ProgrammingError(msg="Syntax error", errno=1064))
+    assert not is_unavailable_error(PoolTimeoutError(msg="Pool épuisé"))
+    assert not is_unavailable_error(CircuitOpenError(msg="ouvert"))
+
+def test_breaker_opens_after_consecutive_failures_and_rejects_calls():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    breaker.record_failure(OperationalError(msg="down", errno=2003))
+    breaker.record_success(0.001)
+    breaker.record_failure(OperationalError(msg="down", errno=2003))
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record_failure(OperationalError(msg="down", errno=2003))
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    assert breaker.stats()['rejected'] == 1 and breaker.stats()['times_opened'] == 1
+
+def test_breaker_half_open_trial_closes_or_reopens_the_circuit():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.01)
+    breaker.record_failure(OperationalError(msg="down", errno=2003))
+    time.sleep(0.02)
+    breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Une seule requête d'essai à la fois
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    breaker.record_failure(OperationalError(msg="down", errno=2003))
+    assert breaker.state == CircuitBreaker.OPEN
+    time.sleep(0.02)
+    breaker.allow()
+    breaker.record_success(0.001)
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.allow()
+
+def test_slow_calls_count_as_failures():
+    breaker = CircuitBreaker(failure_threshold=2, slow_call_ms=50)
+    breaker.record_success(0.1)
+    breaker.record_success(0.1)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.stats()['slow_calls'] == 2 and breaker.stats()['successes'] == 0
+
+def test_watchdog_kills_only_queries_past_their_budget():
+    killed = []
+    watchdog = QueryWatchdog(lambda *target: killed.append(target))
+    fast = watchdog.watch((1, 'primary', 3306), timeout_ms=1000)
+    assert not watchdog.done(fast)
+    slow = watchdog.watch((2, 'primary', 3306), timeout_ms=10)
+    time.sleep(0.1)
+    assert watchdog.done(slow)
+    assert killed == [(2, 'primary', 3306)]
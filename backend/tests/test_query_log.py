@@ -0,0 +1,65 @@
+# backend/tests/test_query_log.py
+import time
+from config.query_log import QueryLog, fingerprint
+
+def wait_for_plan(log, deadline=2.0):
+    end = time.time() + deadline
+    while time.time() < end:
+        slow = log.report()['slow_queries']
+        if slow and slow[0]['plan'] is not None:
+            return slow[0]['plan']
+        time.sleep(0.01)
+    return None
+
+def test_fingerprint_ignores_values_lists_and_formatting():
+    assert fingerprint("SELECT * FROM players WHERE age > 25 AND name = 'Pedri'") == \
+        fingerprint("select *  from players\n WHERE age > %s AND name = \"Rodri\"")
+    assert fingerprint("SELECT * FROM players WHERE player_id IN (1, 2, 3)") == \
+        fingerprint("SELECT * FROM players WHERE player_id IN (%s)")
+    assert fingerprint("INSERT INTO favorites (user_id, player_id) VALUES (1, 2), (3, 4)") == \
+        "insert into favorites (user_id, player_id) values (...)"
+    assert fingerprint("SELECT /*+ MAX_EXECUTION_TIME(500) */ name FROM players") == "select name from players"
+    assert fingerprint("SELECT name FROM players") != fingerprint("SELECT name FROM styles")
+
+def test_statistics_are_grouped_by_fingerprint():
+    log = QueryLog(lambda query, params: None, slow_threshold_ms=1000)
+    log.record("SELECT * FROM players WHERE player_id = %s", (1,), 0.002, rows=1, endpoint='get_player')
+    log.record("SELECT * FROM players WHERE player_id = %s", (2,), 0.004, rows=1, backend='sqlite')
+    log.record("SELECT * FROM styles", None, 0.001, rows=-1)
+    report = log.report()
+    assert report['slow_queries'] == []
+    top = report['fingerprints'][0]
+    assert top['calls'] == 2 and top['avg_ms'] == 3.0 and top['max_ms'] == 4.0 and top['rows_total'] == 2
+    assert top['backends'] == {'mysql': 1, 'sqlite': 1} and top['endpoints'] == {'get_player': 1}
+    assert report['fingerprints'][1]['rows_total'] == 0
+
+def test_slow_queries_are_kept_with_their_plan():
+    explained = []
+    log = QueryLog(lambda query, params: explained.append(params) or {'query_block': {}}, slow_threshold_ms=50,
+                   capacity=2)
+    log.record("SELECT * FROM players WHERE name LIKE %s", ('%a%',), 0.01)
+    for elapsed in (0.06, 0.07, 0.08):
+        log.record("SELECT * FROM players WHERE name LIKE %s", ('%' + 'x' * 200,), elapsed)
+    report = log.report()
+    assert [entry['elapsed_ms'] for entry in report['slow_queries']] == [80.0, 70.0]
+    assert len(report['slow_queries'][0]['params'][0]) == 100
+    assert report['fingerprints'][0]['slow_calls'] == 3
+    assert wait_for_plan(log) == {'query_block': {}}
+    # Un seul EXPLAIN par empreinte et par intervalle
+    assert len(explained) == 1
+
+def test_writes_and_sqlite_reads_are_not_explained():
+    explained = []
+    log = QueryLog(lambda query, params: explained.append(query), slow_threshold_ms=0)
+    log.record("INSERT INTO favorites (user_id, player_id) VALUES (%s, %s)", (1, 2), 0.5)
+    log.record("SELECT * FROM players", None, 0.5, backend='sqlite')
+    time.sleep(0.05)
+    assert explained == []
+    assert len(log.report()['slow_queries']) == 2
+
+def test_fingerprint_table_is_bounded():
+    log = QueryLog(lambda query, params: None, slow_threshold_ms=1000, max_fingerprints=2)
+    for table in ('players', 'styles', 'favorites'):
+        log.record(f"SELECT * FROM {table}", None, 0.001)
+    report = log.report()
+    assert len(report['fingerprints']) == 2 and report['dropped_fingerprints'] == 1
@@ -0,0 +1,60 @@
+import hashlib
+import json
+from datetime import datetime
+from typing import Any, Optional
+from flask import Response, request
+from utils.pagination import NEXT_CURSOR_HEADER
+
+def make_etag(*parts: Any) -> str:
+    """ETag déterministe à partir de la version des données et des paramètres de la réponse"""
+    canonical = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha1(canonical.encode('utf-8')).hexdigest()[:32]
+
+def is_not_modified(etag: str, last_modified: Optional[datetime] = None) -> bool:
+    """Le client possède déjà cette version (If-None-Match prioritaire sur If-Modified-Since)
+
+    Uniquement pour GET / HEAD : un POST est toujours traité.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    if request.if_none_match:
+        return request.if_none_match.contains_weak(etag)
+    if last_modified is not None and request.if_modified_since is not None:
+        return last_modified <= request.if_modified_since
+    return False
+
+def add_validators(response: Response, etag: str, last_modified: Optional[datetime] = None,
+                   private: bool = False) -> Response:
+    """ETag / Last-Modified ; le client doit revalider avant de réutiliser sa copie
+
+    ETag faible : il identifie la version des données, pas les octets, et
+    les variantes gzip et non compressée d'une réponse le partagent.
+    """
+    response.set_etag(etag, weak=True)
+    response.vary.add('Accept-Encoding')
+    if last_modified is not None:
+        response.last_modified = last_modified
+    response.headers['Cache-Control'] = 'private, no-cache' if private else 'no-cache'
+    return response
+
+def not_modified_response(etag: str, last_modified: Optional[datetime] = None,
+                          private: bool = False) -> Response:
+    """304 sans corps : ni requête SQL ni encodage JSON"""
+    return add_validators(Response(status=304), etag, last_modified, private)
+
+def encoded_response(body, etag: Optional[str] = None, last_modified: Optional[datetime] = None,
+                     private: bool = False) -> Response:
+    """Sert un EncodedBody tel quel (version gzip si le client l'accepte), ou 304"""
+    etag = etag or body.etag
+    if is_not_modified(etag, last_modified):
+        return not_modified_response(etag, last_modified, private)
+    
+    use_gzip = body.gzipped is not None and request.accept_encodings.quality('gzip') > 0
+    response = Response(body.gzipped if use_gzip else body.body, content_type=body.content_type)
+    if use_gzip:
+        response.headers['Content-Encoding'] = 'gzip'
+    if getattr(body, 'total', None) is not None:
+        response.headers['X-Total-Count'] = str(body.total)
+    if getattr(body, 'next_cursor', None):
+        response.headers[NEXT_CURSOR_HEADER] = body.next_cursor
+    return add_validators(response, etag, last_modified, private)
@@ -0,0 +1,150 @@
+import base64
+import json
+from decimal import Decimal, InvalidOperation
+from typing import Any, Dict, List, Optional, Tuple
+from utils.validators import ValidationError
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 100
+
+# Colonnes triables : nom dans l'API (alias de PLAYERS_BASE_QUERY) -> colonne SQL
+SORT_COLUMNS = {
+    'MarketValue': 'p.market_value',
+    'Age': 'p.age',
+    'Gls': 'p.goals',
+    'Ast': 'p.assists',
+    'xG': 'p.xG',
+    'xAG': 'p.xAG',
+    'Tkl': 'p.tackles',
+    'PrgP': 'p.progressive_passes',
+    'Carries': 'p.carries',
+    'KP': 'p.key_passes'
+}
+SORT_ALIASES = {
+    **{column.lower(): column for column in SORT_COLUMNS},
+    **{sql.split('.')[1].lower(): column for column, sql in SORT_COLUMNS.items()},
+    'value': 'MarketValue'
+}
+MAX_SORT_KEYS = 3
+
+# En-tête portant le curseur de la page suivante (absent sur la dernière page)
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+
+def page_size(value, default: int = DEFAULT_PAGE_SIZE, maximum: int = MAX_PAGE_SIZE) -> int:
+    """Taille de page demandée, bornée à [1, maximum]"""
+    try:
+        return min(max(int(value), 1), maximum) if value not in (None, '') else default
+    except (TypeError, ValueError):
+        raise ValidationError("Paramètre limit invalide")
+
+def parse_sort(value, default_direction: str = 'desc') -> List[Tuple[str, str]]:
+    """'xG:desc,KP' ou ['xG', 'KP:asc'] -> [('xG', 'desc'), ('KP', 'desc')] ; valeur marchande par défaut"""
+    if not value:
+        return [('MarketValue', default_direction)]
+    items = value.split(',') if isinstance(value, str) else value
+    if not isinstance(items, (list, tuple)):
+        raise ValidationError("Paramètre sort_by invalide")
+    
+    spec = []
+    for item in items:
+        if isinstance(item, (list, tuple)) and len(item) == 2:
+            name, direction = item
+        else:
+            name, _, direction = str(item).partition(':')
+        column = SORT_ALIASES.get(str(name).strip().lower())
+        direction = str(direction).strip().lower() or default_direction
+        if column is None:
+            raise ValidationError(f"Tri impossible sur '{name}' (colonnes : {', '.join(SORT_COLUMNS)})")
+        if direction not in ('asc', 'desc'):
+            raise ValidationError(f"Sens de tri invalide: {direction}")
+        if column not in [existing for existing, _ in spec]:
+            spec.append((column, direction))
+    
+    if len(spec) > MAX_SORT_KEYS:
+        raise ValidationError(f"Au plus {MAX_SORT_KEYS} clés de tri")
+    return spec
+
+def sort_name(spec: List[Tuple[str, str]]) -> str:
+    """'xG:desc,KP:desc' : identifie l'ordre d'un curseur"""
+    return ','.join(f"{column}:{direction}" for column, direction in spec)
+
+def _key_text(value):
+    """Valeur de tri en texte décimal exact (un float issu d'un DECIMAL retrouve ses chiffres)"""
+    if value is None or isinstance(value, (int, str)):
+        return value
+    return repr(value) if isinstance(value, float) else str(value)
+
+def encode_cursor(order: str, keys: List[Any]) -> str:
+    """Curseur opaque : clés de tri de la dernière ligne servie (et l'ordre qui les a produites)"""
+    payload = json.dumps({'o': order, 'k': [_key_text(key) for key in keys]}, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(token: Optional[str], order: str, size: int) -> Optional[List[Any]]:
+    """Clés du curseur ; ValidationError s'il est illisible ou émis pour un autre tri"""
+    if not token:
+        return None
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+        keys = payload['k']
+    except (ValueError, TypeError, KeyError):
+        raise ValidationError("Curseur de pagination invalide")
+    if payload.get('o') != order or not isinstance(keys, list) or len(keys) != size:
+        raise ValidationError("Curseur de pagination invalide pour ce tri")
+    try:
+        # Comparaisons exactes côté MySQL (DECIMAL contre DECIMAL)
+        return [Decimal(key) if isinstance(key, str) else key for key in keys]
+    except InvalidOperation:
+        raise ValidationError("Curseur de pagination invalide")
+
+def keyset_condition(after: List[Any], spec: List[Tuple[str, str]],
+                     id_column: str = 'p.player_id') -> Tuple[str, list]:
+    """Lignes strictement après after = [valeurs des clés..., player_id] dans keyset_order(spec)
+
+    Même place des NULL que MySQL : en dernier en DESC, en premier en ASC.
+    Forme développée (pas de constructeur de ligne, qui n'accepte pas des
+    sens de tri mélangés) : (k1 après) OU (k1 égal ET k2 après) OU ...
+    """
+    columns = [(SORT_COLUMNS[column], direction) for column, direction in spec] + [(id_column, spec[-1][1])]
+    branches, params = [], []
+    for index, (column, direction) in enumerate(columns):
+        parts, branch_params = [], []
+        for (previous, _), value in zip(columns[:index], after):
+            if value is None:
+                parts.append(f"{previous} IS NULL")
+            else:
+                parts.append(f"{previous} = %s")
+                branch_params.append(value)
+        value = after[index]
+        nullable = index < len(spec)
+        if direction == 'desc':
+            if value is None:
+                # NULL en dernier : rien après sur cette colonne
+                continue
+            parts.append(f"({column} < %s OR {column} IS NULL)" if nullable else f"{column} < %s")
+            branch_params.append(value)
+        elif value is None:
+            parts.append(f"{column} IS NOT NULL")
+        else:
+            parts.append(f"{column} > %s")
+            branch_params.append(value)
+        branches.append(" AND ".join(parts))
+        params.extend(branch_params)
+    if not branches:
+        return " AND 1=0", []
+    return " AND (" + " OR ".join(f"({branch})" for branch in branches) + ")", params
+
+def keyset_order(spec: List[Tuple[str, str]], id_column: str = 'p.player_id') -> str:
+    """ORDER BY des clés de tri, départagées par player_id dans le sens de la dernière clé"""
+    columns = [(SORT_COLUMNS[column], direction) for column, direction in spec] + [(id_column, spec[-1][1])]
+    return " ORDER BY " + ", ".join(f"{column} {direction.upper()}" for column, direction in columns)
+
+def row_keys(row: Dict, spec: List[Tuple[str, str]]) -> List[Any]:
+    """Clés de pagination d'une ligne SQL brute (alias de PLAYERS_BASE_QUERY, NULL conservé)"""
+    return [row[column] for column, _ in spec] + [int(row['player_id'])]
+
+def split_page(rows: list, limit: int, key_of) -> Tuple[list, Optional[List[Any]]]:
+    """Lignes lues avec LIMIT limit + 1 -> (page, clés de la dernière ligne s'il reste une page)"""
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, key_of(page[-1])
@@ -54,6 +54,30 @@ export class ApiService {
     }
   }
 
+  static async autocompletePlayers(query: string, limit: number = 10): Promise<Player[]> {
+    try {
+      const response = await axios.get(`${API_BASE_URL}/players/autocomplete`, {
+        params: { q: query, limit }
+      });
+      return response.data;
+    } catch (error: any) {
+      console.error('❌ Error autocompleting players:', error);
+      throw new Error(error.response?.data?.error || 'Erreur lors de la recherche.');
+    }
+  }
+
+  static async getPlayerPercentiles(playerId: number, position?: string): Promise<any> {
+    try {
+      const response = await axios.get(`${API_BASE_URL}/players/${playerId}/percentiles`, {
+        params: position ? { position } : {}
+      });
+      return response.data;
+    } catch (error: any) {
+      console.error('❌ Error fetching percentiles:', error);
+      throw new Error(error.response?.data?.error || 'Erreur lors de la récupération des rangs centiles.');
+    }
+  }
+
   static async getAllPlayers(): Promise<Player[]> {
     try {
       const response = await axios.get(`${API_BASE_URL}/players/all`);
@@ -25,6 +25,7 @@ export interface FilterParams {
   maxAge: string;
   playerName?: string;
   sort_order: 'asc' | 'desc';
+  sort_by?: string; // ex. 'xG:desc,KP:desc'
 }
 
 export interface RadarDataPoint {